@@ -12,12 +12,20 @@ import re
 import random
 import urllib
 import stat
-from collections import namedtuple, defaultdict
-from os.path import getatime, getctime, getmtime, getsize, splitext
+import time
+import threading
+import heapq
+import json
+import shlex
+from collections import namedtuple, defaultdict, deque
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+    as_completed, wait, FIRST_COMPLETED)
+from os.path import splitext
 from enum import Enum
 from shutil import copyfile
+import subprocess
 from subprocess import check_output, CalledProcessError
-from typing import Dict, Any, Union, List  # , Callable
+from typing import Dict, Any, Union, List, Tuple  # , Callable
 
 # Libraries for particular file "formats":
 import codecs
@@ -53,14 +61,14 @@ except ImportError:
 #     import bz2
 # except ImportError:
 #     warning(0, "Cannot import module 'bz2'.")
-# try:
-#     import zlib
-# except ImportError:
-#     warning(0, "Cannot import module 'zlib'.")  # supports gzip
-# try:
-#     import zipfile
-# except ImportError:
-#     warning(0, "Cannot import module 'zipfile'.")
+try:
+    import zlib
+except ImportError:
+    warning(0, "Cannot import module 'zlib'.")  # supports gzip
+try:
+    import zipfile
+except ImportError:
+    warning(0, "Cannot import module 'zipfile'.")
 
 
 __metadata__ = {
@@ -149,6 +157,14 @@ you specify `--quiet`.
 
 * `--fileTypeFlag` -- Append a flag-character like "ls -F".
 
+* `--jobs` N -- Run the `--copyTo` and `--exec` actions for up to N items at
+once, on a pool of threads (or processes, with `--jobProcesses`). This is much
+faster when each is small, such as copying many little files to slow storage.
+The traversal pauses while `--maxPendingJobs` are unfinished or not yet
+reported. Output and failures are reported in traversal order, unless
+`--jobsUnordered` is set. The "jobs", "jobFailures", "jobMsec", "jobMsecMax",
+and "jobWaits" statistics (see `--stats`) count the jobs and their times.
+
 * `--serialize` -- put a serial number on each file with `--copyTo`
 (use `--serializeFormat` to set the format (default "_%04d")).
 
@@ -159,6 +175,19 @@ or 'sexp' (LISP s-expressions).
 Setting this to other than "plain" (the default), overrides specific
 delimiter options described below.
 
+`--oformat ndjson` instead writes one JSON object per line for each item
+(except container closes), and `--oformat jsonArray` writes the same
+objects as the members of one JSON array. Each record is written and flushed
+as soon as the traversal reaches its item, so other tools can read them
+while the walk goes on, and memory use doesn't grow with the tree.
+
+* `--fields` -- With ndjson or jsonArray, what to put in each record, as a
+comma-separated list. "path", "name", "what" (the PWType name, such as
+"OPEN" or "LEAF"), and "depth" are available, as are the fields of
+`os.lstat()` (such as "size", "mtime", or "st_mode"; the "st_" is optional).
+Stat fields are null for items that can't be statted, such as archive
+members. Default: "path,what,depth,size,mtime".
+
 * `--openQuote "x"` and `--closeQuote "y"` -- set delimiters to be put
 before and after each name (typically both would be set to '"' or "'").
 `--quote` may be used as shorthand to set both to "'", or
@@ -270,6 +299,8 @@ files, each passed back with its full path and an open file handle, do this:
     PWType.IGNORE -- Issued (only if requested), for items ignored.
     PWType.CLOSE  -- Issued when a container (tar, directory, etc.) closes.
     PWType.MISSING -- Issued when a file cannot be found (or opened).
+    PWType.ADDED, PWType.MODIFIED, PWType.REMOVED -- Issued instead of LEAF
+        by an incremental rescan (see the `manifest` and `rescan` options).
 
 You can pass a list of paths as the first argument if desired.
 Or you can pass one or a list of paths to `pw.traverse()`, which will use
@@ -425,7 +456,8 @@ The statistics include the number of files of each of these kinds:
     * hiddenFile: files that were skipped
     * regular
     * tar
-    * tarSubdir: subdirectories inside tar files
+    * tarSubdir: subdirectories inside tar and zip files
+    * zip
 
 The statistics also include:
 
@@ -469,6 +501,13 @@ They are described in the full list of options at the end of this help.
 
 ===File selection options===
 
+From code, the regex options (other than "hidden" and "backups") can also
+be given a list of strings. For extensions and names, a list means an exact
+match to any of them (tested by set lookup); for the others, a match to any
+of the regexes. A regex that only matches some exact strings, like
+"^(py|pl|pm)$", is also tested by set lookup. `getStats()` reports how many
+items each filter tested and matched.
+
 ''Note'': Regexes given for these options (where applicable), do not
 automatically have "^" and "$" added. They match if they match anywhere
 in the string. You can of course add one or both of those metacharacters
@@ -515,6 +554,13 @@ about the file. For example, some versions of `file` return descriptions like:
 with CRLF, CR, LF line terminators, with escape sequences, with overstriking
     ** Debian binary package (format 2.0), with control.tar.gz, data compression xz
 
+`file` is run once for (up to 256 of) the regular files in each directory,
+rather than once per file, and the results are kept for the traversal.
+
+* "fileInfoCache": A path at which to keep the results of `file` across runs,
+keyed by device, inode, modification time, and size, so that unchanged files
+need not be examined again. Default: "" (don't keep them).
+
 * "includeNames": Regex for (only) item basenames to allow. Default: "".
 This matches against the names ''without'' any extension.
 See also ''excludeNames''.
@@ -526,18 +572,41 @@ See also ''excludeNames''.
 links: IGNORE, RETURN, or FOLLOW.
 This does not include Mac "aliases", Windows "shortcuts", weblocs, etc.
 
+Directories are identified by (st_dev, st_ino), and one that is
+already open higher up the current branch is skipped (and counted in the
+`cycles` statistic), so following links can't loop.
+
+* "visitOnce": Also skip any directory that was already traversed anywhere
+else in this traversal, such as via another link or a bind mount (counted
+in `ignoredRevisits`). This keeps a set of every directory opened.
+
 * "followWeblocs": How to treat MacOS .webloc files (which basically just
 encapsulate a URL): IGNORE, RETURN, or FOLLOW. For FOLLOW, the file will
 be fetched, saved in the directory specified by the `--tempFileDir` option,
 and returned as if it had been local.
 
-* "openGzip": If True (the default), `gzip` files are opened as if they were
-directories, and the individual items within them are returned.
+* "openGzip": If True, `gzip` files are opened as if they were
+directories, containing one file (named like the gzip file without ".gz").
 
-* "openTar": If True (the default), `tar` files are opened as containers
+* "openTar": If True, `tar` files (including compressed ones such as
+.tgz and .tar.bz2) are opened as containers
 (optionally generating PWType.OPEN and PWType.CLOSE events),
 and the individual items within them are returned.
 
+* "openZip": If True, `zip` (and `jar`) files are opened like tar files.
+
+Archives are recognized by their extensions. Each is traversed as a virtual
+directory, whose members have the archive's path plus "/" plus their name
+within it, and pass through the same filters (and sampling) as other files.
+Directories inside it get their own OPEN and CLOSE events (even if they only
+appear as parts of member names), and each directory's members are brought
+together even if the archive lists them apart. Otherwise members come in
+archive order (not sorted), and `maxDepth` counts the levels inside archives.
+Members are read as the traversal reaches them, and are never extracted to
+disk. Only the headers of a tar file are kept in memory, not its data.
+Links and other non-regular members are ignorable, and archives inside
+archives are not opened. With `rescan`, archives are treated as plain files.
+
 
 ===Reading options===
 
@@ -566,6 +635,35 @@ for each container (such as a directory, gzip, or tar file) that is entered.
 The third member of the returned tuple (`what`) is PWType.OPEN and
 PWType.CLOSE, respectively.
 
+* `engine`: How to list directories. "scandir" (the default) uses
+`os.scandir()`, and reuses its file types, inodes, and cached `stat()`
+results for all the filters and sort keys, so most items take no extra
+system calls. "listdir" uses `os.listdir()` and stats every item.
+
+* `threads` (default 0): If set, list (and sort) directories on this many
+worker threads, ahead of when the traversal reaches them. Events still come
+out in the same order as without threads, unless `unordered` is also set.
+
+* `manifest`: Path to a SQLite database in which to record each directory
+traversed: its mtime, and the stat fields of each of its children.
+
+* `rescan`: With `manifest`, report only what changed since the manifest was
+last updated: PWType.ADDED, PWType.MODIFIED, and PWType.REMOVED events
+take the place of LEAF events, and unchanged leafs are not reported
+(containers still are, so the events nest as usual).
+Directories whose mtime hasn't changed are not listed again; their children
+are taken from the manifest. With "dirs", files in such directories are
+assumed unchanged (a directory's mtime changes when entries are added,
+removed, or renamed, but not when a file is rewritten in place); with
+"files", each of them is statted, to catch such modifications.
+Subdirectories are always statted, since changes deep in a tree do not
+change the mtimes of its ancestors.
+A new or removed directory is reported as a single ADDED or REMOVED event.
+
+* `unordered` (default False): With `threads`, after a directory's other
+children, descend into its subdirectories in whatever order their listings
+finish, rather than in listing (or `sort`) order. Containers still nest properly.
+
 * `dirsSeparate`: "dirs": sort directories before files;
 "files": sort files before directories; "mix": leave them intermixed (default).
 
@@ -615,6 +713,14 @@ Default: "none" (just use whatever `os.listdir` returns). Other choices:
 ** `size`: File length in bytes
 ** `ext`: Extension as returned by `os.path.splitext`
 
+Sort keys are computed once per item, using the stat information already
+gathered by the traversal.
+
+* `topK` (default 0, unlimited): Only return the first N files (non-directories)
+of each directory, in `sort` order (or listing order if there is none).
+For example, `--sort size --reverseSort --topK 100` gets the 100 largest
+files in each directory. This uses a heap, so is faster than a full sort.
+
 ==traverse(self)==
 
 Generate a sequence of chosen files (and if requested, pseudo-files,
@@ -689,9 +795,6 @@ separate PowerWalk instances in such cases, you should be fine.
 that take regexes. These options do not apply to directories (ideally, they
 should be separately settable for directories and files (and maybe other containers).
 
-* The protection against circular links is unfinished.
-
-
 =To do=
 
 ==Most wanted==
@@ -704,8 +807,6 @@ make sure we get all it's children. *******
 
 * Option to not report dirs (probably just apply `--type` f to main.
 
-* Protect against circular links.
-
 * Be able to accept/return Path objects.
 
 * Add move/link/cat similar to `--copyTo`, and support setting
@@ -771,8 +872,8 @@ See discussion of Python `fnmatch` in
     ** newer/old cre/mod/acc time vs. specified file
     ** date, age, and file size (chars, bytes, blocks, kmgtp), file count.
     *** including MIME "Date:" for email files
-* Is under git or other version-control (and maybe, is committed/pushed?)
-See getGitStatus().  Not yet integrated.
+* Is under other version-control (and maybe, is committed/pushed?)
+For git, see `--gitStatus` and GitStatusCache.
 * Add specific support for .gitignore and cvs equivalent.
 
 What do various *nix utilities do for <=> tests in options?
@@ -875,6 +976,29 @@ against circular symlinks.
 * 2023-11-27: Refactor main, OutputFormatter. Drop ItemFmt.
 Rename --filetype to --fileTypeFlag and alias -F. Add alias -R for recursive.
 * 2023-12-01: Let --type and --gitStatus take multiple letters.
+* 2026-10-16: Add `--engine`, with an `os.scandir()`-based traversal (PWEntry
+for items without a DirEntry). Make setOption() actually store non-regex
+option values, and fix option-name prefix stripping and the --type and
+--gitStatus checks in applyOptionsFromArgparse().
+Add `--threads` and `--unordered`, to list directories ahead on worker
+threads (see DirPrefetcher).
+Detect cycles with a set of open (st_dev, st_ino) pairs instead of searching
+the stack, and add `--visitOnce`.
+Make `--gitStatus` run one `git status` per repository (GitStatusCache),
+and fix parsing of its output.
+Run `file` in batches per directory for `--*FileInfos`, keeping results in a
+FileInfoCache (optionally saved, via `--fileInfoCache`).
+Add `--manifest` and `--rescan`, for incremental traversals reporting
+PWType.ADDED, MODIFIED, and REMOVED.
+Compile the include/exclude options into a FilterSet per traversal, with set
+lookups where possible and test/hit counts per filter. Let them take lists.
+Sort via decorated tuples, and add `--topK`.
+Traverse tar, zip, and gzip files as virtual directories, reading members
+as streams (see ArchiveReader). Add `--openZip`.
+Add `--oformat ndjson` and `jsonArray`, streamed by JsonEventWriter, and
+`--fields`.
+Add `--jobs` etc., to run `--copyTo` and `--exec` on a JobPool. Fix
+`--serialize` (it was always applied, and failed), and quote paths for `--exec`.
 
 =Rights=
 
@@ -902,14 +1026,15 @@ def isStreamable(x) -> bool:
         io.BufferedReader,             # subclass of IOBase
         io.BufferedWriter,             # subclass of IOBase
         codecs.StreamReaderWriter,     # KNOPE
+        codecs.StreamReader,           # KNOPE
         tarfile.TarFile,               # KNOPE
         gzip.GzipFile,                 # subclass of IOBase
+        zipfile.ZipExtFile,            # subclass of IOBase
         io.StringIO,                   # subclass of IOBase
         #
         # UUencode
         # bz2
         # zlib  # like gzip
-        # zipfile
         #
         # DMG (.dmg, .mg, .smi
         # UDIF,
@@ -955,6 +1080,9 @@ class PWType(Enum):
     CLOSE   = 2          # The end of a directory, tar file, etc.
     IGNORE  = 3          # Notification of a filtered-out object
     LEAF    = 4          # An actual readable/writable object
+    ADDED   = 5          # With "rescan": an item not in the manifest
+    MODIFIED = 6         # With "rescan": a leaf whose stat has changed
+    REMOVED = 7          # With "rescan": an item in the manifest, now gone
     ERROR   = -1         # Generic error
     MISSING = -2         # Specific error, item not found
 
@@ -1000,6 +1128,485 @@ def isPWFrameOK(ts:PWFrame) -> bool:
     return True
 
 
+###############################################################################
+# The "scandir" engine (the default) hands each child of a directory down the
+# traversal as the os.DirEntry that os.scandir() made for it. That knows the
+# name, the file type (from d_type on most *nix systems), and the inode, and
+# caches stat() results, so most items never need a separate stat call.
+# PWEntry provides the same interface for items that didn't come from
+# os.scandir(): top-level items, link targets, and the "listdir" engine.
+#
+class PWEntry:
+    """Stand-in for os.DirEntry, for an item known only by path.
+    Like DirEntry, it caches the results of stat() and lstat().
+    """
+    def __init__(self, path:str):
+        self.path = path
+        self.name = os.path.basename(path)
+        self._stat = None
+        self._lstat = None
+
+    def __repr__(self) -> str:
+        return "<PWEntry '%s'>" % (self.path)
+
+    def stat(self, follow_symlinks:bool=True) -> os.stat_result:
+        if (not follow_symlinks):
+            if (self._lstat is None): self._lstat = os.lstat(self.path)
+            return self._lstat
+        if (self._stat is None): self._stat = os.stat(self.path)
+        return self._stat
+
+    def inode(self) -> int:
+        return self.stat(follow_symlinks=False).st_ino
+
+    def is_dir(self, follow_symlinks:bool=True) -> bool:
+        try:
+            return stat.S_ISDIR(self.stat(follow_symlinks).st_mode)
+        except OSError:
+            return False
+
+    def is_file(self, follow_symlinks:bool=True) -> bool:
+        try:
+            return stat.S_ISREG(self.stat(follow_symlinks).st_mode)
+        except OSError:
+            return False
+
+    def is_symlink(self) -> bool:
+        try:
+            return stat.S_ISLNK(self.stat(follow_symlinks=False).st_mode)
+        except OSError:
+            return False
+
+def getDirKey(entry) -> Tuple[int, int]:
+    """Return (st_dev, st_ino) for the directory an entry refers to (following
+    symlinks), which identifies it no matter what path reached it.
+    """
+    st = entry.stat()
+    return (st.st_dev, st.st_ino)
+
+
+###############################################################################
+# With the "manifest" option, each directory listed is recorded in a SQLite
+# database: its mtime, and the stat fields of each of its children. With
+# "rescan" as well, a directory whose mtime is unchanged is not listed again
+# (its children come from the manifest as ManifestEntry objects), and only
+# children that were added, modified, or removed produce events.
+#
+class ManifestEntry:
+    """Stand-in for os.DirEntry, for a child known from a Manifest.
+    stat() returns the recorded stat fields (following links if possible).
+    """
+    def __init__(self, path:str, st:os.stat_result, isLink:bool=False):
+        self.path = path
+        self.name = os.path.basename(path)
+        self._stat = st
+        self.isLink = isLink
+
+    def __repr__(self) -> str:
+        return "<ManifestEntry '%s'>" % (self.path)
+
+    def stat(self, follow_symlinks:bool=True) -> os.stat_result:
+        return self._stat
+
+    def inode(self) -> int:
+        return self._stat.st_ino
+
+    def is_dir(self, follow_symlinks:bool=True) -> bool:
+        return stat.S_ISDIR(self._stat.st_mode)
+
+    def is_file(self, follow_symlinks:bool=True) -> bool:
+        return stat.S_ISREG(self._stat.st_mode)
+
+    def is_symlink(self) -> bool:
+        return self.isLink
+
+class Manifest:
+    """The persistent record of a traversal, in a SQLite database: a "dirs"
+    table of (path, mtime_ns), and an "entries" table with a row of stat
+    fields for each child of each of those dirs. Paths are absolute.
+    """
+    statFields = [ "st_mode", "st_ino", "st_dev", "st_nlink", "st_uid", "st_gid",
+        "st_size", "st_atime_ns", "st_mtime_ns", "st_ctime_ns" ]
+    commitEvery = 1000  # putDir() calls
+
+    def __init__(self, dbPath:str):
+        import sqlite3
+        self.dbPath = dbPath
+        self.conn = sqlite3.connect(dbPath)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY, mtime_ns INTEGER);
+            CREATE TABLE IF NOT EXISTS entries (
+                dir TEXT, name TEXT, link INTEGER,
+                mode INTEGER, ino INTEGER, dev INTEGER, nlink INTEGER,
+                uid INTEGER, gid INTEGER, size INTEGER,
+                atime_ns INTEGER, mtime_ns INTEGER, ctime_ns INTEGER,
+                PRIMARY KEY (dir, name)) WITHOUT ROWID;
+        """)
+        self.nPuts = 0
+
+    @staticmethod
+    def statToRow(st:os.stat_result) -> Tuple:
+        return tuple(getattr(st, f) for f in Manifest.statFields)
+
+    @staticmethod
+    def rowToStat(row:Tuple) -> os.stat_result:
+        mode, ino, dev, nlink, uid, gid, size, atime, mtime, ctime = row
+        return os.stat_result(
+            (mode, ino, dev, nlink, uid, gid, size,
+                atime // 10**9, mtime // 10**9, ctime // 10**9),
+            { "st_atime": atime / 1e9, "st_mtime": mtime / 1e9,
+                "st_ctime": ctime / 1e9, "st_atime_ns": atime,
+                "st_mtime_ns": mtime, "st_ctime_ns": ctime })
+
+    def getDir(self, path:str) -> Union[Tuple[int, Dict], None]:
+        """Return the recorded mtime_ns of the directory, and a dict from
+        each child's name to (os.stat_result, isLink); or None if unknown.
+        """
+        row = self.conn.execute(
+            "SELECT mtime_ns FROM dirs WHERE path=?", (path,)).fetchone()
+        if (row is None): return None
+        children = {}
+        for name, link, *st in self.conn.execute(
+            "SELECT name, link, mode, ino, dev, nlink, uid, gid, size,"
+            " atime_ns, mtime_ns, ctime_ns FROM entries WHERE dir=?", (path,)):
+            children[name] = (self.rowToStat(st), bool(link))
+        return row[0], children
+
+    def putDir(self, path:str, mtime_ns:int, children:Dict) -> None:
+        """Replace what's recorded for a directory (see getDir()).
+        """
+        self.conn.execute("DELETE FROM entries WHERE dir=?", (path,))
+        self.conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?)",
+            (path, mtime_ns))
+        self.conn.executemany(
+            "INSERT INTO entries VALUES (?,?,?, ?,?,?,?, ?,?,?, ?,?,?)",
+            [ (path, name, int(isLink)) + self.statToRow(st)
+                for name, (st, isLink) in children.items() ])
+        self.nPuts += 1
+        if (self.nPuts % self.commitEvery == 0): self.conn.commit()
+
+    def removeTree(self, path:str) -> None:
+        """Forget a directory and everything under it.
+        """
+        lo, hi = path + "/", path + "0"  # "0" sorts right after "/"
+        self.conn.execute("DELETE FROM dirs WHERE path=? OR (path>=? AND path<?)",
+            (path, lo, hi))
+        self.conn.execute("DELETE FROM entries WHERE dir=? OR (dir>=? AND dir<?)",
+            (path, lo, hi))
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+###############################################################################
+# With the "openTar", "openZip", and "openGzip" options, archives are
+# traversed as virtual directories, with the same container types as
+# ReadAny.OpenItem ("TAR", "ZIP", "GZIP"). Members are read straight from the
+# archive as the traversal reaches them, and nothing is extracted to disk.
+# Tar files are opened for random access (tarfile mode "r:*"), so that
+# members listed apart can still be read grouped by directory; only their
+# headers are kept in memory.
+#
+class ArchiveEntry:
+    """Stand-in for os.DirEntry, for a member of an archive (or a directory
+    only implied by member names). stat() returns fields made from the
+    member's header; st_dev and st_ino are 0.
+    """
+    def __init__(self, path:str, st:os.stat_result,
+        reader:'ArchiveReader'=None, info:Any=None, relPath:str=""):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.relPath = relPath  # Path within the archive
+        self._stat = st
+        self.reader = reader
+        self.info = info        # The TarInfo or ZipInfo, if any
+        self.fh = None
+
+    def __repr__(self) -> str:
+        return "<ArchiveEntry '%s'>" % (self.path)
+
+    def stat(self, follow_symlinks:bool=True) -> os.stat_result:
+        return self._stat
+
+    def inode(self) -> int:
+        return 0
+
+    def is_dir(self, follow_symlinks:bool=True) -> bool:
+        return stat.S_ISDIR(self._stat.st_mode)
+
+    def is_file(self, follow_symlinks:bool=True) -> bool:
+        return stat.S_ISREG(self._stat.st_mode)
+
+    def is_symlink(self) -> bool:
+        return stat.S_ISLNK(self._stat.st_mode)
+
+    def open(self) -> io.BufferedIOBase:
+        """Open the member (once) for binary reading.
+        """
+        if (self.fh is None): self.fh = self.reader.openMember(self.info)
+        return self.fh
+
+    def peek(self, n:int=512) -> bytes:
+        """Return up to n bytes from the start of the member, without using
+        them up (such as to ask `file` about it).
+        """
+        return self.open().peek(n)[:n]
+
+class ArchiveReader:
+    """Read the members of a "TAR", "ZIP", or "GZIP" file.
+    members() generates an ArchiveEntry for each, whose path is the archive's
+    path plus "/" plus the member name. They come in archive order, except
+    that each directory's contents are brought together (see groupByDir()),
+    since archives needn't store them that way.
+    That means reading a tar file's headers before any data (which for a
+    compressed one, decompresses it an extra time).
+    A GZIP file has just one member, named like the file without ".gz".
+    """
+    def __init__(self, path:str, kind:str, st:os.stat_result):
+        self.path = path
+        self.type = kind
+        self.st = st
+        self.fh = None
+        if (kind == "TAR"):
+            self.fh = tarfile.open(path, "r:*")
+        elif (kind == "ZIP"):
+            self.fh = zipfile.ZipFile(path, "r")
+        elif (kind != "GZIP"):
+            raise ValueError("Unknown archive type '%s'." % (kind))
+        self.dirStat = os.stat_result((stat.S_IFDIR | 0o755, 0, 0, 1,
+            st.st_uid, st.st_gid, 0, st.st_atime, st.st_mtime, st.st_ctime))
+
+    def members(self):
+        if (self.type == "TAR"):
+            infos = self.fh.getmembers()
+            for i in self.groupByDir([ ti.name for ti in infos ]):
+                yield self.makeEntry(infos[i].name, self.tarStat(infos[i]), infos[i])
+        elif (self.type == "ZIP"):
+            infos = self.fh.infolist()
+            for i in self.groupByDir([ zi.filename for zi in infos ]):
+                yield self.makeEntry(infos[i].filename, self.zipStat(infos[i]), infos[i])
+        else:
+            st = self.st
+            name = os.path.basename(self.path)[:-3]
+            yield self.makeEntry(name, os.stat_result((st.st_mode, 0, 0, 1,
+                st.st_uid, st.st_gid, st.st_size,
+                st.st_atime, st.st_mtime, st.st_ctime)))
+
+    @staticmethod
+    def nameParts(name:str) -> List[str]:
+        """Split a member name, dropping any leading "/", "./", etc.
+        """
+        return [ p for p in name.split("/") if p not in ("", ".") ]
+
+    @staticmethod
+    def groupByDir(names:List[str]) -> List[int]:
+        """Return the indexes of the member names, ordered so that everything
+        under any given directory is together. Otherwise archive order holds:
+        each item or directory goes where (something in) it first appeared.
+        """
+        firstSeen = {}  # Tuple of name parts -> index it first appeared at
+        keys = []
+        for i, name in enumerate(names):
+            parts = ArchiveReader.nameParts(name)
+            keys.append(([ firstSeen.setdefault(tuple(parts[0:j+1]), i)
+                for j in range(len(parts)) ], i))
+        return sorted(range(len(names)), key=lambda i: keys[i])
+
+    def makeEntry(self, name:str, st:os.stat_result, info:Any=None) -> ArchiveEntry:
+        """"relPath" is the member name without any leading "/", "./", etc.,
+        which is "" for the archive's own top directory.
+        """
+        relPath = "/".join(self.nameParts(name))
+        return ArchiveEntry(self.path + "/" + relPath, st, self, info, relPath)
+
+    @staticmethod
+    def tarStat(ti:tarfile.TarInfo) -> os.stat_result:
+        if (ti.isreg()): fmt = stat.S_IFREG
+        elif (ti.isdir()): fmt = stat.S_IFDIR
+        elif (ti.issym()): fmt = stat.S_IFLNK
+        elif (ti.ischr()): fmt = stat.S_IFCHR
+        elif (ti.isblk()): fmt = stat.S_IFBLK
+        elif (ti.isfifo()): fmt = stat.S_IFIFO
+        else: fmt = 0  # Hard links, etc.
+        return os.stat_result((fmt | stat.S_IMODE(ti.mode), 0, 0, 1,
+            ti.uid, ti.gid, ti.size, ti.mtime, ti.mtime, ti.mtime))
+
+    @staticmethod
+    def zipStat(zi:zipfile.ZipInfo) -> os.stat_result:
+        mode = zi.external_attr >> 16  # Unix mode, if the zipper recorded it
+        if (zi.is_dir()): mode = stat.S_IFDIR | (stat.S_IMODE(mode) or 0o755)
+        elif (not stat.S_IFMT(mode)): mode = stat.S_IFREG | (mode or 0o644)
+        mtime = time.mktime(zi.date_time + (0, 0, -1))
+        return os.stat_result((mode, 0, 0, 1, 0, 0, zi.file_size,
+            mtime, mtime, mtime))
+
+    def openMember(self, info:Any) -> io.BufferedIOBase:
+        if (self.type == "TAR"):
+            return self.fh.extractfile(info)
+        elif (self.type == "ZIP"):
+            return self.fh.open(info)
+        return gzip.open(self.path, "rb")
+
+    def close(self) -> None:
+        if (self.fh is not None): self.fh.close()
+        self.fh = None
+
+
+###############################################################################
+# With the "threads" option, directories are listed (and sorted) by a pool
+# of worker threads, ahead of the traversal that will need them. This overlaps
+# the latency of listing and statting (large on network filesystems).
+#
+class DirPrefetcher:
+    """Keep a bounded set of pending directory listings for one traversal.
+    The traversal itself (filtering, events, statistics, the stack) stays on
+    the consumer's thread; workers only run PowerWalk.getChildren().
+    """
+    def __init__(self, pw:'PowerWalk', trav:'TraversalState', nThreads:int,
+        maxPending:int=0, sortListings:bool=True):
+        self.pw = pw
+        self.trav = trav
+        self.sortListings = sortListings  # Else the caller sorts (for Manifest)
+        self.maxPending = maxPending or 64 * nThreads
+        self.pending = {}  # path -> Future for its (sorted) children
+        self.pool = ThreadPoolExecutor(max_workers=nThreads,
+            thread_name_prefix="PowerWalk")
+
+    def listDir(self, path:str) -> List:
+        children = self.pw.getChildren(path, sort=self.sortListings)
+        self.trav.bump("dirsPrefetched")
+        return children
+
+    def prefetch(self, entries:List) -> None:
+        """Start listing any of these entries the traversal may descend into.
+        """
+        for ch in entries:
+            if (len(self.pending) >= self.maxPending): break
+            if (ch.path in self.pending or not self.pw.mightDescend(ch)): continue
+            self.pending[ch.path] = self.pool.submit(self.listDir, ch.path)
+
+    def get(self, path:str) -> List:
+        """Return the children of path, waiting for its listing if it was
+        prefetched (or listing it right here if not).
+        """
+        fut = self.pending.pop(path, None)
+        if (fut is None):
+            return self.pw.getChildren(path, sort=self.sortListings)
+        if (not fut.done()):
+            self.trav.bump("prefetchWaits")
+        return fut.result()
+
+    def inCompletionOrder(self, entries:List):
+        """For the "unordered" option: generate the entries that are not
+        waiting on a listing first, then the rest as their listings finish.
+        """
+        waiting = {}
+        for ch in entries:
+            fut = self.pending.get(ch.path)
+            if (fut is None or fut.done()): yield ch
+            else: waiting[fut] = ch
+        for fut in as_completed(waiting):
+            yield waiting[fut]
+
+    def discard(self, entries:List) -> None:
+        """Drop listings nobody will ask for (e.g. for filtered-out dirs).
+        """
+        for ch in entries:
+            fut = self.pending.pop(ch.path, None)
+            if (fut is not None): fut.cancel()
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pending = {}
+
+
+###############################################################################
+# The include/exclude options are compiled into a FilterSet when a traversal
+# starts. Each becomes a PWMatcher, which tests by set membership when the
+# option is a list of literal extensions or names (or a regex that just
+# matches one of several literal strings, like "^(py|pl)$"), and otherwise
+# by one regex (lists of regexes are joined into one alternation).
+# Each matcher counts its tests and hits, for tuning (see getStats()).
+#
+class PWMatcher:
+    """One compiled include or exclude filter. Call it with a string.
+    """
+    __slots__ = ("name", "literals", "regex", "tests", "hits")
+
+    def __init__(self, name:str, literals:set=None, regex:re.Pattern=None):
+        self.name = name
+        self.literals = literals
+        self.regex = regex
+        self.tests = 0
+        self.hits = 0
+
+    def __call__(self, s:str) -> bool:
+        self.tests += 1
+        if (self.literals is not None):
+            found = s in self.literals
+        else:
+            found = self.regex.search(s) is not None
+        if (found): self.hits += 1
+        return found
+
+    def __repr__(self) -> str:
+        return "<PWMatcher %s: %s>" % (self.name,
+            "set of %d" % (len(self.literals)) if (self.literals is not None)
+            else "r'%s'" % (self.regex.pattern))
+
+class FilterSet:
+    """The compiled form of all the include/exclude options, for one
+    traversal. Each is available as an attribute (a PWMatcher, or None
+    if the option is not set).
+    """
+    filterNames = [
+        "excludeExtensions", "includeExtensions",
+        "excludeNames",      "includeNames",
+        "excludePaths",      "includePaths",
+        "excludeFileInfos",  "includeFileInfos",
+        "excludeDir",        "includeDir",
+    ]
+    literalOK = [ "excludeExtensions", "includeExtensions",
+        "excludeNames", "includeNames" ]
+
+    # A regex that just matches any of some literal strings (dots escaped).
+    literalsExpr = re.compile(
+        r"\^(?:(?P<one>(?:[-\w]|\\\.)+)|\((?:\?:)?(?P<alts>(?:[-\w]|\\\.)+"
+        r"(?:\|(?:[-\w]|\\\.)+)*)\))\$")
+
+    def __init__(self, options:Dict):
+        self.matchers = []
+        for name in self.filterNames:
+            matcher = self.compileOne(name, options.get(name))
+            setattr(self, name, matcher)
+            if (matcher is not None): self.matchers.append(matcher)
+
+    @staticmethod
+    def compileOne(name:str, value:Any) -> Union[PWMatcher, None]:
+        if (not value): return None
+        if (isinstance(value, (list, tuple, set, frozenset))):
+            if (name in FilterSet.literalOK):
+                return PWMatcher(name, literals=set(value))
+            return PWMatcher(name, regex=re.compile(
+                "|".join("(?:%s)" % (v) for v in value)))
+        if (isinstance(value, str)): value = re.compile(value)
+        if (name in FilterSet.literalOK and not value.flags & ~re.UNICODE):
+            mat = FilterSet.literalsExpr.fullmatch(value.pattern)
+            if (mat):
+                lits = mat.group("one") or mat.group("alts")
+                return PWMatcher(name,
+                    literals=set(lit.replace("\\.", ".") for lit in lits.split("|")))
+        return PWMatcher(name, regex=value)
+
+    def getStats(self) -> str:
+        buf = "\nFilters:%23s %8s %8s\n" % ("", "tests", "hits")
+        for m in self.matchers:
+            buf += "    %-30s %8d %8d\n" % (m.name, m.tests, m.hits)
+        return buf
+
+
 ###############################################################################
 #
 class TraversalState(list):
@@ -1017,6 +1624,17 @@ class TraversalState(list):
         self.depth = 0
         self.iString = "    "
         self.options = options
+        self.prefetcher = None  # A DirPrefetcher, if the "threads" option is set
+        self.lock = threading.Lock()  # Workers may bump() stats, too
+        self.dirKeys = []       # (st_dev, st_ino) or None, parallel to the stack
+        self.activeDirs = set() # The non-None dirKeys, for isActive()
+        self.visitedDirs = set() # Every dirKey opened (see "visitOnce")
+        self.gitCache = None    # A GitStatusCache, if "gitStatus" is set
+        self.fileInfos = None   # A FileInfoCache, if *FileInfos are set
+        self.manifest = None    # A Manifest, if the "manifest" option is set
+        self.filters = FilterSet(options)
+        self.changes = None     # With "rescan", path -> PWType for changed leafs
+        self.entry = None       # Entry for the latest OPEN, LEAF, or change event
         self.stats = {
             "nodesTried"                 : 0,  # +
             "containersOpened"           : 0,  # +
@@ -1024,10 +1642,25 @@ class TraversalState(list):
             "ignored"                    : 0,
             "errors"                     : 0,  # +
             "maxDepthReached"            : 0,
+            "cycles"                     : 0,
+            "dirsPrefetched"             : 0,
+            "prefetchWaits"              : 0,
+            "fileCommandRuns"            : 0,
+            "dirsUnchanged"              : 0,
+            "added"                      : 0,
+            "modified"                   : 0,
+            "removed"                    : 0,
+            "unchanged"                  : 0,
+            "jobs"                       : 0,  # See JobPool
+            "jobFailures"                : 0,
+            "jobMsec"                    : 0,
+            "jobMsecMax"                 : 0,
+            "jobWaits"                   : 0,
 
             "regular"                    : 0,
             "directory"                  : 0,
             "tar"                        : 0,
+            "zip"                        : 0,
             "gzip"                       : 0,
             "hiddenDir"                  : 0,
             "hiddenFile"                 : 0,
@@ -1049,6 +1682,7 @@ class TraversalState(list):
             "ignoredByIncludeDir"        : 0,
 
             "ignoredByMinDepth"          : 0,
+            "ignoredRevisits"            : 0,
             "ignoredByPerm"              : 0,
             "ignoredByType"              : 0,
         }
@@ -1060,6 +1694,7 @@ class TraversalState(list):
         for k in sorted(self.stats.keys()):
             if (showZeroes or self.stats[k]>0):
                 buf += "    %-30s %8d\n" % (k, self.stats[k])
+        if (self.filters.matchers): buf += self.filters.getStats()
         return buf
 
     def getStat(self, name:str) -> int:
@@ -1070,7 +1705,18 @@ class TraversalState(list):
         """
         if (name not in self.stats):
             raise ValueError("No stat named '%s'." % (name))
-        self.stats[name] += n
+        with self.lock:
+            self.stats[name] += n
+
+    def recordJob(self, secs:float, failed:bool=False) -> None:
+        """Count a job a JobPool ran for this traversal, and its time.
+        """
+        msec = int(secs * 1000)
+        with self.lock:
+            self.stats["jobs"] += 1
+            if (failed): self.stats["jobFailures"] += 1
+            self.stats["jobMsec"] += msec
+            if (msec > self.stats["jobMsecMax"]): self.stats["jobMsecMax"] = msec
 
     def indent(self, msg:str="", level:int=2) -> str:
         """If msg is provided, display it (indented) and return.
@@ -1090,16 +1736,31 @@ class TraversalState(list):
         * Otherwise stack it, return the PWFrame, then pop it.
         ==> Iff this returns a PWFrame the caller should yield it.
     """
-    def openContainer(self, path:str, fh:object, inode:int=0) -> Union[PWFrame, None]:
+    def isActive(self, dirKey:Tuple[int, int]) -> bool:
+        """Is the directory with this (st_dev, st_ino) already open on the stack
+        (in which case opening it again would cycle)?
+        """
+        return dirKey in self.activeDirs
+
+    def wasVisited(self, dirKey:Tuple[int, int]) -> bool:
+        return dirKey in self.visitedDirs
+
+    def openContainer(self, path:str, fh:object, inode:int=0,
+        dirKey:Tuple[int, int]=None) -> Union[PWFrame, None]:
         """Create and push a stack frame for the thing we found.
         Files that are filtered out don't even get here. But for containers,
         we mightgenerate events or excpetions (see options["containers")
+        @param dirKey: (st_dev, st_ino) for directories, to detect cycles.
         """
         thePWFrame = PWFrame(path, fh, PWType.OPEN, inode=inode)
         assert isPWFrameOK(thePWFrame)
 
         self.bump("containersOpened")
         self.append(thePWFrame)
+        self.dirKeys.append(dirKey)
+        if (dirKey is not None):
+            self.activeDirs.add(dirKey)
+            if (self.options["visitOnce"]): self.visitedDirs.add(dirKey)
         self.depth += 1  # not thread-safe
         if (self.depth > self.stats["maxDepthReached"]):
             self.stats["maxDepthReached"] = self.depth
@@ -1123,6 +1784,16 @@ class TraversalState(list):
         self.bump("leafs")
         return thePWFrame
 
+    def handleChange(self, path:str, fh:object, what:PWType) -> PWFrame:
+        """Like handleLeaf(), but for the ADDED, MODIFIED, and REMOVED
+        events of an incremental rescan.
+        """
+        warning(3, "handleChange: %s %s" % (what.name, path))
+        thePWFrame = PWFrame(path, fh, what, inode=0)
+        assert isPWFrameOK(thePWFrame)
+        self.bump(what.name.lower())
+        return thePWFrame
+
     def handleIgnorable(self, path:str) -> Union[PWFrame, None]:
         """Called for an ignorable item:
             * If caller doesn't want them, return None
@@ -1167,6 +1838,8 @@ class TraversalState(list):
         self.depth -= 1  # not thread-safe
         warning(1, "closeContainer: %s" % (thePWFrame.path))
         self.pop()
+        dirKey = self.dirKeys.pop()
+        if (dirKey is not None): self.activeDirs.discard(dirKey)
         if (thePWFrame.what == PWType.OPEN):
             if (not self.options["containers"]):
                 return None
@@ -1197,6 +1870,7 @@ class PowerWalk:
         "excludeNames"        : "REGEX",
         "excludePaths"        : "REGEX",
         "excludeFileInfos"    : "REGEX",
+        "fileInfoCache"       : str,
         "includeExtensions"   : "REGEX",
         "includeNames"        : "REGEX",
         "includePaths"        : "REGEX",
@@ -1211,6 +1885,8 @@ class PowerWalk:
         "containers"          : bool,
         "dirsSeparate"        : str,
         "encoding"            : str,
+        "engine"              : str,
+        "errorEvents"         : bool,
         "exceptions"          : bool,
         "followLinks"         : PWDisp,
         "followWeblocs"       : PWDisp,
@@ -1219,6 +1895,7 @@ class PowerWalk:
         "ignorables"          : bool,
         "maxDepth"            : int,            # TODO -> find-style?
         "maxFiles"            : int,            # TODO -> find-style?
+        "manifest"            : str,
         "maxSize"             : int,            # TODO -> find-style?
         "minDepth"            : int,            # TODO -> find-style?
         "minSize"             : int,            # TODO -> find-style?
@@ -1227,13 +1904,19 @@ class PowerWalk:
         "open"                : bool,
         "openGzip"            : bool,
         "openTar"             : bool,
+        "openZip"             : bool,
         "perm"                : str,
         "recursive"           : bool,
+        "rescan"              : str,
         "reverseSort"         : bool,
         "sampleFactor"        : float,
         "sort"                : str,
+        "threads"             : int,
+        "topK"                : int,
         "type"                : str,
+        "unordered"           : bool,
         "verbose"             : int,
+        "visitOnce"           : bool,
     }
 
     def handlePathsArg(self, topLevelItems:Union[List, str]):
@@ -1260,6 +1943,7 @@ class PowerWalk:
             "excludeNames"        : "",
             "excludePaths"        : "",
             "excludeFileInfos"    : "",
+            "fileInfoCache"       : "",       # Path to save `file` results
             "includeExtensions"   : "",
             "includeNames"        : "",
             "includePaths"        : "",
@@ -1272,8 +1956,9 @@ class PowerWalk:
             "backups"             : False,
             "close"               : False,    # Do fh.close() on leafs for user.
             "containers"          : True,     # Events for container start/end?
-            "dirsSeparate"        : "MIX",    # Separate dirs vs. files in sort?
+            "dirsSeparate"        : "mix",    # Separate dirs vs. files in sort?
             "encoding"            : "utf-8",  # Character encoding
+            "engine"              : "scandir",  # How to list directories
             "errorEvents"         : False,    # Return events for errors?
             "exceptions"          : False,    # Exception for containers?
             "followLinks"         : PWDisp.IGNORE,
@@ -1284,21 +1969,28 @@ class PowerWalk:
             "ignorables"          : False,    # Events even for ignored stuff?
             "maxDepth"            : 0,
             "maxFiles"            : 0,
+            "manifest"            : "",       # Path to SQLite record of dirs
             "maxSize"             : 0,
             "minDepth"            : 0,
             "minSize"             : 0,
             "mode"                : "rb",     # Read, write, bin, etc.
             "notify"              : False,    # Tell caller on start/end dir
             "open"                : False,    # Do leaf open()s for user.
-            "openGzip"            : False,
+            "openGzip"            : False,    # Traverse archives as dirs?
             "openTar"             : False,
+            "openZip"             : False,
             "perm"                : "",       # Test permissions
             "recursive"           : False,
+            "rescan"              : "",       # Only report changes ("dirs"/"files")
             "reverseSort"         : False,
             "sampleFactor"        : 100.0,    # Take everything.
             "sort"                : "",       # TODO: Test in tar, zip, etc.
+            "threads"             : 0,        # Threads to list dirs ahead
+            "topK"                : 0,        # Max files per dir (after sort)
             "type"                : "",
+            "unordered"           : False,    # With threads, ready dirs first
             "verbose"             : 0,
+            "visitOnce"           : False,    # Skip dirs seen via another path
         }
         self.permOptions = []                 # Parsed version of --perm
 
@@ -1324,7 +2016,9 @@ class PowerWalk:
             theType = self.__optionTypes[name]
             if (theType == "REGEX"):
                 warning(1, "setOption for '%s' to '%s' type %s." % (name, value, theType))
-                if (value):
+                if (isinstance(value, (list, tuple, set, frozenset))):
+                    self.options[name] = list(value)  # See FilterSet
+                elif (value):
                     try:
                         self.options[name] = re.compile(value)
                     except (re.error, TypeError) as e:
@@ -1341,7 +2035,7 @@ class PowerWalk:
                 elif (theType == PWDisp): value = PWDisp.IGNORE
                 else: value = 0
             try:
-                ###self.options[name] = theType(value)
+                self.options[name] = value
                 if (name=="verbose"):
                     global verbose
                     verbose = value
@@ -1358,11 +2052,11 @@ class PowerWalk:
         for k, v in argsObj.__dict__.items():
             if (not k.startswith(prefix)):  # Not ours
                 continue
-            k = k[len(prefix)]
-            if (k == "type" and not re.match(PowerWalk.typeLetterExpr, v)):
-                warning("Unrecognized --type letter in '%s'.", v)
-            if (k == "gitStatus" and not re.match(PowerWalk.gitStatusExpr, v)):
-                warning("Unrecognized --gitStatus letter in '%s'.", v)
+            k = k[len(prefix):]
+            if (k == "type" and v and not re.match(PowerWalk.typeLetterExpr, v)):
+                warning(0, "Unrecognized --type letter in '%s'." % (v))
+            if (k == "gitStatus" and v and not re.match(PowerWalk.gitStatusExpr, v)):
+                warning(0, "Unrecognized --gitStatus letter in '%s'." % (v))
             if (k in self.options):
                 self.setOption(k, v, strict=False)
         #showOptions(argsObj)
@@ -1389,6 +2083,10 @@ class PowerWalk:
                 help="%s items with %s matching this regex." %
                     (sign, thing.lower()))
 
+        parser.add_argument(
+            prefix + "fileInfoCache", type=str, metavar="P", default="",
+            help="Keep results of the 'file' command (for --*FileInfos) in this file.")
+
         PowerWalk.addTimeOptions(parser, prefix=prefix)
 
         # And the grep-like ones
@@ -1429,6 +2127,10 @@ class PowerWalk:
         parser.add_argument(
             prefix + "encoding", type=str,metavar="E", default="utf-8",
             help="Assume this character set. Default: utf-8.")
+        parser.add_argument(
+            prefix + "engine", type=str, default="scandir",
+            choices = [ "scandir", "listdir" ],
+            help="How to list directories. Default: scandir (fewer syscalls).")
         parser.add_argument(
             prefix + "errorEvents", action="store_true",
             help="Return events for errors like unopenable items.")
@@ -1443,7 +2145,7 @@ class PowerWalk:
             help="Follow MacOS .webloc links to the destination.")
         parser.add_argument(
             "--gitStatus", "--git-status", type=str, default="",
-            help="Git status letter(s) as for git -s [%s]. UNFINISHED."
+            help="Git status letter(s) as for git -s [%s]."
             % (PowerWalk.gitStatuses))
         parser.add_argument(
             prefix + "hidden", "-a", action="store_true",
@@ -1452,6 +2154,9 @@ class PowerWalk:
             prefix + "ignorables", action="store_true",
             help="Return events (or exceptions) for ignorable items.")
 
+        parser.add_argument(
+            prefix + "manifest", metavar="P", type=str, default="",
+            help="Record each directory traversed in this SQLite file (see --rescan).")
         parser.add_argument(
             prefix + "maxDepth", metavar="N", type=int, default=0,
             help="Do not traverse more than this many levels down.")
@@ -1480,9 +2185,12 @@ class PowerWalk:
         parser.add_argument(
             prefix + "openTar", action="store_true",
             help="Open tar files as if they were directories.")
+        parser.add_argument(
+            prefix + "openZip", action="store_true",
+            help="Open zip files as if they were directories.")
         parser.add_argument(
             prefix + "openGzip", action="store_true",
-            help="Open openGzip files as if they were directories.")
+            help="Open gzip files as if they were directories (of one file).")
         parser.add_argument(
             prefix + "perm", type=str, default="",
             help="Test permissions, such as +gw or -ux (experimental).")
@@ -1499,6 +2207,9 @@ class PowerWalk:
             prefix + "no-recursive", action="store_false", dest="recursive",
             help="Do NOT descend into subdirectories.")
 
+        parser.add_argument(
+            prefix + "rescan", type=str, default="", choices=[ "", "dirs", "files" ],
+            help="With --manifest, only report changes since the last traversal.")
         parser.add_argument(
             prefix + "reverseSort", action="store_true",
             help="If --sort is used, reverse the order.")
@@ -1511,11 +2222,25 @@ class PowerWalk:
                 "atime", "ctime", "mtime", "size", "ext" ],
             help="Sort directory members by what? Default: none. ")
 
+        parser.add_argument(
+            prefix + "threads", metavar="N", type=int, default=0,
+            help="List directories ahead on N worker threads. Default: 0.")
+        parser.add_argument(
+            prefix + "topK", metavar="N", type=int, default=0,
+            help="Only the first N files in each directory (in --sort order).")
+        parser.add_argument(
+            prefix + "unordered", action="store_true",
+            help="With --threads, descend into whichever subdirs are listed first.")
         parser.add_argument(
             prefix + "type", type=str, default="",
             help='Like the "find" command, plus Door, Port, Whiteout,'
             ' and can give multiple letters.')
 
+        parser.add_argument(
+            prefix + "visitOnce", action="store_true",
+            help="Skip directories already traversed via another path"
+            " (links, bind mounts).")
+
         # Test that all the known options are available.
         for op in PowerWalk.__optionTypes.keys():
             if (prefix+op not in parser._option_string_actions):
@@ -1573,6 +2298,9 @@ class PowerWalk:
 
         TODO: This should really make a separate iterator object, to be
         thread-safe for accessing things like depth.
+
+        With the "threads" option, a DirPrefetcher lists directories on worker
+        threads, but everything else still happens in the caller's thread.
         """
         # Reference the traversal state in the main object, so the caller
         # can get at stats, depth, etc. But this isn't thread-safe, and
@@ -1585,24 +2313,43 @@ class PowerWalk:
         else:
             tops = self.topLevelItems
 
-        for tl in (tops):
-            if (self.options["absolute"]):
-                tl = os.path.abspath(tl)
-            warning(1, "\n******* Starting top-level item '%s'." % (tl))
-            for tsf in self.ttraverse(tl, trav):
-                trav.bump("nodesTried")
-                warning(3, "tried %d, max %d." %
-                    (trav.stats["nodesTried"], self.options["maxFiles"]))
-                if (self.options["maxFiles"] and
-                    trav.stats["nodesTried"] > self.options["maxFiles"]): break
-                yield tsf[0:3]
+        if (self.options["threads"] > 0):
+            trav.prefetcher = DirPrefetcher(self, trav, self.options["threads"],
+                sortListings=not self.options["manifest"])
+        if (self.options["gitStatus"]):
+            trav.gitCache = GitStatusCache()
+        if (self.options["includeFileInfos"] or self.options["excludeFileInfos"]):
+            trav.fileInfos = FileInfoCache(self.options["fileInfoCache"], trav)
+        if (self.options["manifest"]):
+            trav.manifest = Manifest(self.options["manifest"])
+            if (self.options["rescan"]): trav.changes = {}
+        try:
+            for tl in (tops):
+                if (self.options["absolute"]):
+                    tl = os.path.abspath(tl)
+                warning(1, "\n******* Starting top-level item '%s'." % (tl))
+                for tsf in self.ttraverse(tl, trav):
+                    trav.bump("nodesTried")
+                    warning(3, "tried %d, max %d." %
+                        (trav.stats["nodesTried"], self.options["maxFiles"]))
+                    if (self.options["maxFiles"] and
+                        trav.stats["nodesTried"] > self.options["maxFiles"]): break
+                    yield tsf[0:3]
+        finally:
+            if (trav.prefetcher): trav.prefetcher.close()
+            if (trav.fileInfos): trav.fileInfos.save()
+            if (trav.manifest): trav.manifest.close()
         if (self.options["exceptions"]):
             raise Finished()
         return
 
-    def ttraverse(self, path:str, trav:TraversalState) -> Union[PWFrame, None]:
+    def ttraverse(self, path:str, trav:TraversalState,
+        entry:Union[os.DirEntry, PWEntry]=None) -> Union[PWFrame, None]:
         """Recurse as needed.
         @param path: The path as accumulated down any recursion.
+        @param entry: The os.DirEntry (or PWEntry) for path, if the caller
+            has one (see listChildren()). All the type tests, filters, and
+            sort keys get their information from it.
         """
         warning(3, "%sttraverse at '%s'" % ("  "*len(trav), path))
 
@@ -1611,27 +2358,36 @@ class PowerWalk:
             return
 
         try:
-            theStat = os.stat(path)
+            if (entry is None):
+                entry = PWEntry(path)
+                entry.stat()
+            elif (entry.is_symlink()):
+                entry.stat()  # Fails for dangling links, as os.stat would.
         except (FileNotFoundError, OSError) as e:
             warning(0, "Unexpected error statting '%s':\n    %s" % (path, e))
             self.travState.bump("errors")
             return False
+        trav.entry = entry
 
         # filter-checking can raise FileNotFound, /OSError.
-        if (not self.passesFilters(path, theStat, trav)):  # IGNORABLE FILE
+        if (not self.passesFilters(path, entry, trav)):    # IGNORABLE FILE
             tsf = trav.handleIgnorable(path)
             if (tsf): yield tsf
 
-        elif (not os.path.exists(path)):                   # NOT FOUND
-            tsf = trav.handleError(path, "Item not found")
-            if (tsf): yield tsf
+        elif (trav.changes is not None and entry.is_dir() and
+            trav.changes.get(path) == PWType.ADDED):       # NEW DIRECTORY
+            # Report it as one event, like a removed one, but still traverse
+            # it (discarding the events) to record it in the manifest.
+            del trav.changes[path]
+            yield trav.handleChange(path, None, PWType.ADDED)
+            for _tsf in self.ttraverse(path, trav, entry): pass
 
-        elif (os.path.isdir(path)):                        # DIRECTORY
+        elif (entry.is_dir()):                             # DIRECTORY
             # Well, I found this wonder:
             #    ~/Library/Application Support/Steam/Steam.AppBundle/
             #    Steam/Contents/MacOS/Frameworks/Steam Helper EH.app/Contents/
             # which contains a symlink "Frameworks", to ../../../Frameworks.
-            # TODO Check inode vs. stack to see if we're circular
+            # passesFilters() checks that against trav.isActive().
 
             trav.bump("directory")
             self.recordItemType(trav, "directory")
@@ -1644,61 +2400,44 @@ class PowerWalk:
                 tsf = trav.handleIgnorable(path)
                 if (tsf): yield tsf
             else:
-                tsf = trav.openContainer(path, fh=None, inode=theStat.st_ino)
+                dirKey = getDirKey(entry)
+                tsf = trav.openContainer(path, fh=None, inode=dirKey[1],
+                    dirKey=dirKey)
                 warning(1, "Opening dir '%s' (tsf %s)." % (path, tsf))
                 if (tsf): yield tsf
-                children = os.listdir(path)
-                if (self.options["sort"]):
-                    children = self.chSort(
-                        path, children, self.options["reverseSort"])
-                for ch in children:
-                    chPath = os.path.join(path, ch)
-                    for chFrame in self.ttraverse(chPath, trav):
+                pf = trav.prefetcher
+                removed = []
+                if (trav.manifest is not None):
+                    children, removed = self.getChildrenWithManifest(path, entry, trav)
+                elif (pf is None):
+                    children = self.getChildren(path)
+                else:
+                    children = pf.get(path)
+                    pf.prefetch(children)
+                if (trav.fileInfos):
+                    trav.fileInfos.prime([ ch for ch in children if ch.is_file() ])
+                for ch in (children if (pf is None or not self.options["unordered"])
+                    else pf.inCompletionOrder(children)):
+                    for chFrame in self.ttraverse(ch.path, trav, ch):
                         yield chFrame
+                if (pf): pf.discard(children)
+                if (trav.changes is not None):
+                    for ch in children: trav.changes.pop(ch.path, None)
+                for rem in removed:
+                    if (self.passesFilters(rem.path, rem, trav)):
+                        trav.entry = rem
+                        yield trav.handleChange(rem.path, None, PWType.REMOVED)
                 tsf = trav.closeContainer()
                 warning(1, "Closing dir '%s', tsf %s." % (path, tsf))
                 if (tsf): yield tsf
 
-        elif (False and tarfile.is_tarfile(path)):         # TAR FILE
-            self.recordItemType(trav, "tar")
-            if (not self.options["openTar"]):
-                tsf = trav.handleIgnorable(path)
-                if (tsf): yield tsf
-            else:
-                tfObject = tarfile.open(path, "r:*")
-                tsf = trav.openContainer(path, fh=None, inode=theStat.st_ino)
-                if (tsf): yield tsf
-                for tfMember in (tfObject.getmembers):
-                    if (tfMember.isfile()):
-                        fh2 = tfObject.extractfile(tfMember)
-                        yield trav.handleLeaf(path, fh2)
-                        if (self.options["close"] and fh2):
-                            fh2.close()
-                    elif (tfMember.isdir()):
-                        self.recordItemType(trav, "tarSubdir")
-                        # TODO: add tar internal recursion!
-                    else:  # also issyn, islnk, ischr, isblk, isfifo, isdev
-                        warning(0, "Non-file, non-dir) in tar file.")
-                tfObject.closeContainer()
-                tsf = trav.closeContainer()
-                if (tsf): yield tsf
+        elif (trav.changes is None and
+            self.archiveType(path, entry) is not None):    # ARCHIVE FILE
+            for tsf in self.traverseArchive(path, entry, trav,
+                self.archiveType(path, entry)):
+                yield tsf
 
-        elif (path.endswith(".gz")):                       # GZIP FILE
-            self.recordItemType(trav, "gzip")
-            if (not self.options["openGzip"]):
-                tsf = trav.handleIgnorable(path)
-                if (tsf): yield tsf
-            else:
-                fh2 = gzip.open(path, mode=self.options["mode"],
-                    encoding=self.options["encoding"])
-                tsf = trav.openContainer(path, fh=None, inode=theStat.st_ino)
-                if (tsf): yield tsf
-                yield trav.handleLeaf(path, fh2)
-                if (self.options["close"]): fh2.close()
-                tsf = trav.closeContainer()
-                if (tsf): yield tsf
-
-        elif (os.path.islink(path)):                       # LINK
+        elif (entry.is_symlink()):                         # LINK
             disp = self.options["followLinks"]             # Weblocs
             if (disp == PWDisp.IGNORE):
                 tsf = trav.handleIgnorable(path)
@@ -1737,6 +2476,15 @@ class PowerWalk:
             trav.bump("ignoredSamples")
             if (tsf): yield tsf
 
+        elif (trav.changes is not None and len(trav) > 0): # RESCANNED FILE
+            what = trav.changes.get(path)
+            if (what is None):
+                trav.bump("unchanged")
+            else:
+                fh = self.openLeafIfNeeded(path)
+                yield trav.handleChange(path, fh, what)
+                if (self.options["close"] and fh): fh.close()
+
         else:                                              # SELECTED FILE
             fh = self.openLeafIfNeeded(path)
             yield trav.handleLeaf(path, fh)
@@ -1744,6 +2492,229 @@ class PowerWalk:
 
         return
 
+    archiveTypes = [  # ReadAny.OpenItem type, option to open, name expr
+        ("TAR",  "openTar",  re.compile(r"\.(tar|tgz|tbz2?|txz|tar\.(gz|bz2|xz))$", re.I)),
+        ("ZIP",  "openZip",  re.compile(r"\.(zip|jar)$", re.I)),
+        ("GZIP", "openGzip", re.compile(r"\.gz$", re.I)),
+    ]
+
+    def archiveType(self, path:str, entry:Union[os.DirEntry, PWEntry]) -> Union[str, None]:
+        """If path is an archive the options say to open, return its type.
+        """
+        for kind, optName, expr in self.archiveTypes:
+            if (self.options[optName] and expr.search(path)):
+                return kind if entry.is_file() else None
+        return None
+
+    def traverseArchive(self, path:str, entry:Union[os.DirEntry, PWEntry],
+        trav:TraversalState, kind:str) -> Union[PWFrame, None]:
+        """Like the DIRECTORY case of ttraverse(), but for an archive file.
+        Its members come from an ArchiveReader, in archive order.
+        openDirs tracks the virtual directories the current member is in,
+        as (name, passedFilters) pairs.
+        """
+        self.recordItemType(trav, kind.lower())
+        try:
+            reader = ArchiveReader(path, kind, entry.stat())
+        except (OSError, EOFError, tarfile.TarError, zipfile.BadZipFile) as e:
+            tsf = trav.handleError(path, "Cannot open %s file: %s" % (kind, e))
+            if (tsf): yield tsf
+            return
+        tsf = trav.openContainer(path, fh=None, inode=entry.inode())
+        if (tsf): yield tsf
+        openDirs = []
+        try:
+            for member in reader.members():
+                parts = member.relPath.split("/") if member.relPath else []
+                if (not member.is_dir()): parts.pop()
+                for tsf in self.syncArchiveDirs(path, parts, openDirs,
+                    member, reader, trav):
+                    yield tsf
+                if (member.is_dir() or not member.relPath or
+                    (openDirs and not openDirs[-1][1])): continue
+                for tsf in self.traverseArchiveMember(member, trav):
+                    yield tsf
+        except (OSError, EOFError, tarfile.TarError, zipfile.BadZipFile,
+            zlib.error) as e:
+            tsf = trav.handleError(path, "Error reading %s file: %s" % (kind, e))
+            if (tsf): yield tsf
+        finally:
+            reader.close()
+        while (openDirs):
+            if (openDirs.pop()[1]):
+                tsf = trav.closeContainer()
+                if (tsf): yield tsf
+        tsf = trav.closeContainer()
+        if (tsf): yield tsf
+
+    def syncArchiveDirs(self, path:str, parts:List, openDirs:List,
+        member:ArchiveEntry, reader:ArchiveReader,
+        trav:TraversalState) -> Union[PWFrame, None]:
+        """Close the virtual directories in openDirs that the next member
+        isn't in, and open the ones (listed in parts) it is in.
+        A directory that fails the filters, or is beyond "maxDepth", isn't
+        opened, and neither is anything inside it.
+        """
+        n = 0
+        while (n < len(openDirs) and n < len(parts) and openDirs[n][0] == parts[n]):
+            n += 1
+        while (len(openDirs) > n):
+            if (openDirs.pop()[1]):
+                tsf = trav.closeContainer()
+                if (tsf): yield tsf
+        while (len(openDirs) < len(parts)):
+            name = parts[len(openDirs)]
+            passed = not openDirs or openDirs[-1][1]
+            if (passed and self.options["maxDepth"] > 0 and
+                len(trav) > self.options["maxDepth"]):
+                passed = False
+            if (passed):
+                relPath = "/".join(parts[0:len(openDirs)+1])
+                dirEntry = member if (relPath == member.relPath) else (
+                    ArchiveEntry(path + "/" + relPath, reader.dirStat))
+                self.recordItemType(trav, "tarSubdir")
+                passed = self.containerPassesFilters(dirEntry.path, dirEntry, trav)
+                if (passed):
+                    trav.entry = dirEntry
+                    tsf = trav.openContainer(dirEntry.path, fh=None)
+                    if (tsf): yield tsf
+            openDirs.append((name, passed))
+
+    def traverseArchiveMember(self, member:ArchiveEntry,
+        trav:TraversalState) -> Union[PWFrame, None]:
+        """Like the file cases of ttraverse(), but for a member of an archive.
+        """
+        if (self.options["maxDepth"] > 0 and len(trav) > self.options["maxDepth"]):
+            return
+        trav.entry = member
+        if (not member.is_file() or
+            not self.filePassesFilters(member.path, member, trav)):
+            tsf = trav.handleIgnorable(member.path)
+            if (tsf): yield tsf
+        elif (self.options["sampleFactor"] < 100 and
+            random.random()*100.0 > self.options["sampleFactor"]):
+            tsf = trav.handleIgnorable(member.path)
+            trav.bump("ignoredSamples")
+            if (tsf): yield tsf
+        else:
+            fh = member.open()
+            if ("b" not in self.options["mode"]):
+                fh = codecs.getreader(self.options["encoding"])(fh)
+            yield trav.handleLeaf(member.path, fh)
+            if (self.options["close"]): fh.close()
+
+    def getChildrenWithManifest(self, path:str, entry:Union[os.DirEntry, PWEntry],
+        trav:TraversalState) -> Tuple[List, List]:
+        """Like getChildren(), but using and updating trav.manifest.
+        With "rescan", if the directory's mtime is as recorded, its children
+        come from the manifest instead of being listed (and with
+        "rescan files", they are each statted to find modified files).
+        Children found to be added or modified get an entry in trav.changes.
+        Return the children, and a list of ManifestEntry for removed ones.
+        """
+        man = trav.manifest
+        rescan = self.options["rescan"]
+        absPath = os.path.abspath(path)
+        try:
+            dirStat = (os.stat(path) if (isinstance(entry, ManifestEntry))
+                else entry.stat())
+        except OSError as e:
+            warning(0, "Unexpected error statting '%s':\n    %s" % (path, e))
+            trav.bump("errors")
+            return [], []
+        old = man.getDir(absPath)
+        removed = []
+
+        if (rescan and old is not None and old[0] == dirStat.st_mtime_ns):
+            trav.bump("dirsUnchanged")
+            children = [ ManifestEntry(os.path.join(path, name), st, isLink)
+                for name, (st, isLink) in old[1].items() ]
+            if (rescan == "files"):
+                anyChanged = False
+                for i, ch in enumerate(children):
+                    if (ch.is_dir()): continue
+                    fresh = PWEntry(ch.path)
+                    try:
+                        if (not self.statChanged(ch.stat(), fresh.stat())): continue
+                    except OSError:
+                        continue
+                    trav.changes[ch.path] = PWType.MODIFIED
+                    children[i] = fresh
+                    anyChanged = True
+                if (anyChanged):
+                    man.putDir(absPath, dirStat.st_mtime_ns,
+                        self.getChildRecords(children))
+            if (self.options["sort"] or self.options["topK"]):
+                children = self.chSort(path, children, self.options["reverseSort"])
+            return children, removed
+
+        # Record all the children, before any "topK" selection.
+        pf = trav.prefetcher
+        children = pf.get(path) if (pf) else self.getChildren(path, sort=False)
+        if (pf and not rescan): pf.prefetch(children)
+        records = self.getChildRecords(children)
+        if (rescan):
+            oldChildren = old[1] if (old) else {}
+            for ch in children:
+                prev = oldChildren.get(ch.name)
+                if (prev is None):
+                    trav.changes[ch.path] = PWType.ADDED
+                elif (self.statChanged(prev[0], records[ch.name][0])):
+                    trav.changes[ch.path] = PWType.MODIFIED
+            for name, (st, isLink) in oldChildren.items():
+                if (name in records): continue
+                removed.append(ManifestEntry(os.path.join(path, name), st, isLink))
+                if (stat.S_ISDIR(st.st_mode)):
+                    man.removeTree(os.path.join(absPath, name))
+        man.putDir(absPath, dirStat.st_mtime_ns, records)
+        if (self.options["sort"] or self.options["topK"]):
+            children = self.chSort(path, children, self.options["reverseSort"])
+        return children, removed
+
+    @staticmethod
+    def getChildRecords(children:List) -> Dict:
+        """Make the dict of name: (os.stat_result, isLink) that Manifest stores.
+        """
+        records = {}
+        for ch in children:
+            try:
+                st = ch.stat()
+            except OSError:  # Dangling link
+                st = ch.stat(follow_symlinks=False)
+            records[ch.name] = (st, ch.is_symlink())
+        return records
+
+    @staticmethod
+    def statChanged(st1:os.stat_result, st2:os.stat_result) -> bool:
+        return (st1.st_mtime_ns != st2.st_mtime_ns or st1.st_size != st2.st_size
+            or st1.st_ino != st2.st_ino or st1.st_mode != st2.st_mode)
+
+    def getChildren(self, path:str, sort:bool=True) -> List:
+        """List and (if requested) sort the children of a directory.
+        This is all that DirPrefetcher runs on its worker threads.
+        """
+        children = self.listChildren(path)
+        if (sort and (self.options["sort"] or self.options["topK"])):
+            children = self.chSort(path, children, self.options["reverseSort"])
+        return children
+
+    def mightDescend(self, entry:Union[os.DirEntry, PWEntry]) -> bool:
+        """Cheap test of whether the traversal may open this entry as a
+        directory, so it's worth prefetching.
+        """
+        return (self.options["recursive"] and entry.is_dir() and
+            (self.options["hidden"] or not isHidden(entry.name)))
+
+    def listChildren(self, path:str) -> List:
+        """Return entries for the children of a directory: os.DirEntry objects
+        from os.scandir() (the "scandir" engine), or PWEntry objects made from
+        os.listdir() names (the "listdir" engine, which stats every child).
+        """
+        if (self.options["engine"] == "listdir"):
+            return [ PWEntry(os.path.join(path, ch)) for ch in os.listdir(path) ]
+        with os.scandir(path) as it:
+            return list(it)
+
     def openLeafIfNeeded(self, path:str):
         if (not self.options["open"]):
             fh = None
@@ -1752,47 +2723,62 @@ class PowerWalk:
                 encoding=self.options["encoding"])
         return fh
 
-    def passesFilters(self, path:str, theStat:os.stat_result, trav:TraversalState) -> bool:
+    def passesFilters(self, path:str, entry:Union[os.DirEntry, PWEntry],
+        trav:TraversalState) -> bool:
         """Check the file at "path" against all the filters, and
         return True iff it's one the user wants. 'hidden' applies to
         containers (such as directories) and to leafs (such as files).
         Most other filters apply only to one or the other.
         """
-        if (not os.path.isdir(path)):
-            return self.filePassesFilters(path, theStat, trav)
+        if (not entry.is_dir()):
+            if (trav.changes is None and self.archiveType(path, entry)):
+                return self.containerPassesFilters(path, entry, trav)
+            return self.filePassesFilters(path, entry, trav)
         # For directories, we have to avoid circularity:
-        newInode = theStat.st_ino
-        if (newInode):
-            for ancPWFrame in self.travState:
-                if (ancPWFrame.inode != newInode): continue
-                self.travState.bump("errors")
-                warning(0, "Directory 'tree' has cyclic link at %s. Skipped." % (path))
-                return False
-        return self.dirPassesFilters(path, theStat, trav)
-
-    def dirPassesFilters(self, path:str, _theStat:os.stat_result, trav:TraversalState) -> bool:
+        dirKey = getDirKey(entry)
+        if (trav.isActive(dirKey)):
+            trav.bump("errors")
+            trav.bump("cycles")
+            warning(0, "Directory 'tree' has cyclic link at %s. Skipped." % (path))
+            return False
+        if (self.options["visitOnce"] and trav.wasVisited(dirKey)):
+            self.recordEvent(trav, "ignoredRevisits")
+            return False
+        return self.dirPassesFilters(path, entry, trav)
+
+    def dirPassesFilters(self, path:str, entry:Union[os.DirEntry, PWEntry],
+        trav:TraversalState) -> bool:
         if (self.options["type"] and "d" not in self.options["type"]):
             self.recordEvent(trav, "ignoredByType")
             return False
         # ignoredByPerm ??
+        if (not self.containerPassesFilters(path, entry, trav)):
+            return False
+        self.recordEvent(trav, "directory")
+        return True
+
+    def containerPassesFilters(self, path:str, _entry:Union[os.DirEntry, PWEntry],
+        trav:TraversalState) -> bool:
+        """The filters for directories that also apply to archives (and the
+        directories in them), which "type" does not.
+        """
         if (not self.options["hidden"] and isHidden(path)):
             self.recordEvent(trav, "hiddenDir")
             return False
-        if (self.options["excludeDir"] and
-            re.search(self.options["excludeDir"], path)):
+        fs = trav.filters
+        if (fs.excludeDir and fs.excludeDir(path)):
             self.recordEvent(trav, "ignoredByExcludeDir")
             return False
-        if (self.options["includeDir"] and
-            not re.search(self.options["includeDir"], path)):
+        if (fs.includeDir and not fs.includeDir(path)):
             self.recordEvent(trav, "ignoredByIncludeDir")
             return False
-        self.recordEvent(trav, "directory")
         return True
 
-    def filePassesFilters(self, path:str, theStat:os.stat_result,
+    def filePassesFilters(self, path:str, entry:Union[os.DirEntry, PWEntry],
         trav:TraversalState) -> bool:
         """Test most of the file-filtering conditions.
         Return True only if the all pass (reaching the final "else").
+        Only the type and permission tests need entry.stat().
         """
         _, tail = os.path.split(path)
         (_, extPart) = os.path.splitext(tail)
@@ -1801,45 +2787,40 @@ class PowerWalk:
         trav.indent("Checking filters for '%s', ext '%s' (exclExt '%s')." %
             (tail, extPart, self.options["excludeExtensions"]), level=1)
 
+        fs = trav.filters
         passes = False  # Matching any of these test is a fail/reject.
         #
-        if (not self.passesType(path, theStat)):
+        if (self.options["type"] and not self.passesType(path, entry.stat())):
             self.recordEvent(trav, "ignoredByType")
         elif (self.permOptions and
-            not self.passesPerm(path, theStat, self.permOptions)):
+            not self.passesPerm(path, entry.stat(), self.permOptions)):
             self.recordEvent(trav, "ignoredByPerm")
         elif (len(trav)<self.options["minDepth"]):
             self.recordEvent(trav, "ignoredByMinDepth")
         elif (not self.options["hidden"] and isHidden(path)):
             self.recordEvent(trav, "hiddenFile")
 
-        elif (self.options["excludeExtensions"] and
-            re.search(self.options["excludeExtensions"], extPart)):
+        elif (fs.excludeExtensions and fs.excludeExtensions(extPart)):
             self.recordEvent(trav, "ignoredByExcludeExtensions")
-        elif (self.options["includeExtensions"] and
-            not re.search(self.options["includeExtensions"], extPart)):
+        elif (fs.includeExtensions and not fs.includeExtensions(extPart)):
             self.recordEvent(trav, "ignoredByIncludeExtensions")
 
         elif (self.options["gitStatus"] and
-            getGitStatus(path) not in self.options["gitStatus"]):
+            trav.gitCache.getStatus(path) not in self.options["gitStatus"]):
             self.recordEvent(trav, "ignoredByGitStatus")
-        elif (self.options["excludeNames"] and
-            re.search(self.options["excludeNames"], tail)):
+        elif (fs.excludeNames and fs.excludeNames(tail)):
             self.recordEvent(trav, "ignoredByExcludeNames")
-        elif (self.options["includeNames"] and
-            not re.search(self.options["includeNames"], tail)):
+        elif (fs.includeNames and not fs.includeNames(tail)):
             self.recordEvent(trav, "ignoredByIncludeNames")
-        elif (self.options["excludePaths"] and
-            re.search(self.options["excludePaths"], path)):
+        elif (fs.excludePaths and fs.excludePaths(path)):
             self.recordEvent(trav, "ignoredByExcludePaths")
-        elif (self.options["includePaths"] and
-            not re.search(self.options["includePaths"], path)):
+        elif (fs.includePaths and not fs.includePaths(path)):
             self.recordEvent(trav, "ignoredByIncludePaths")
-        elif (self.options["excludeFileInfos"] and
-            re.search(self.options["excludeFileInfos"], getFileInfo(path))):
+        elif (fs.excludeFileInfos and
+            fs.excludeFileInfos(trav.fileInfos.get(path, entry))):
             self.recordEvent(trav, "ignoredByExcludeFileInfos")
-        elif (self.options["includeFileInfos"] and
-            not re.search(self.options["includeFileInfos"], getFileInfo(path))):
+        elif (fs.includeFileInfos and
+            not fs.includeFileInfos(trav.fileInfos.get(path, entry))):
             self.recordEvent(trav, "ignoredByIncludeFileInfos")
 
         elif (not self.options["backups"] and isBackup(path)):
@@ -1980,27 +2961,29 @@ class PowerWalk:
         return actions
 
     def chSort(self, curPath:str, chList:list, reverse=False) -> list:
-        """Sort a file-list returned from os.listdir somehow.
+        """Sort a list of entries returned from listChildren() somehow.
+        With the "topK" option, keep only the first K non-directories.
         """
         warning(2, "Sorting by '%s'." % (self.options["sort"]))
-        if (self.options["sort"] == "none"):
+        sby = self.options["sort"] or "none"
+        topK = self.options["topK"]
+        if (sby == "none" and not topK):
             return chList
 
-        sby = self.options["sort"]
-        if (self.options["dirsSeparate"] == "mix"):
+        if (self.options["dirsSeparate"] == "mix" and not topK):
             return self.doTheSort(
                 curPath, chList, sortBy=sby, reverse=reverse)
 
-        chDirList = []
-        for i in reversed(range(len(chList))):
-            if (os.path.isdir(os.path.join(curPath, chList[i]))):
-                chDirList.append(chList[i])
-                del chList[i]
+        chDirList = [ ch for ch in chList if ch.is_dir() ]
+        chList = [ ch for ch in chList if not ch.is_dir() ]
         chList = self.doTheSort(
-            curPath, chList, sortBy=sby, reverse=reverse)
+            curPath, chList, sortBy=sby, reverse=reverse, topK=topK)
         chDirList = self.doTheSort(
             curPath, chDirList, sortBy=sby, reverse=reverse)
-        if (self.options["dirsSeparate"] == "dirs"):
+        if (self.options["dirsSeparate"] == "mix"):
+            return self.doTheSort(
+                curPath, chDirList + chList, sortBy=sby, reverse=reverse)
+        elif (self.options["dirsSeparate"] == "dirs"):
             chDirList.extend(chList)
             return chDirList
         elif (self.options["dirsSeparate"] == "files"):
@@ -2010,27 +2993,43 @@ class PowerWalk:
             raise KeyError("Unknown value '%s' for --dirsSeparate." %
                 (self.options["dirsSeparate"]))
 
-    def doTheSort(self, curPath:str, chList:list, sortBy:str, reverse=False) -> list:
-        #pylint: disable=C3001
-        if (sortBy == "name"):
-            theLambda = None
-            #chList.sort()
+    statSortFields = {
+        "atime": "st_atime", "ctime": "st_ctime", "mtime": "st_mtime", "size": "st_size" }
+
+    def doTheSort(self, _curPath:str, chList:list, sortBy:str, reverse=False,
+        topK:int=0) -> list:
+        """Sort entries. Each key is computed once, into a decorated tuple of
+        (key, position, entry); time and size keys come from the entry's
+        stat() (cached, or recorded in a Manifest), or lstat() for dangling
+        links. The position keeps the sort stable, even in reverse.
+        If topK is set, only the first topK are kept, selected with a heap.
+        """
+        if (sortBy == "none"):
+            return chList[0:topK] if (topK) else chList
+        sign = -1 if (reverse) else 1
+        if (sortBy in self.statSortFields):
+            field = self.statSortFields[sortBy]
+            decorated = []
+            for i, ch in enumerate(chList):
+                try:
+                    st = ch.stat()
+                except OSError:
+                    st = ch.stat(follow_symlinks=False)
+                decorated.append((getattr(st, field), sign*i, ch))
+        elif (sortBy == "name"):
+            decorated = [ (ch.name, sign*i, ch) for i, ch in enumerate(chList) ]
         elif (sortBy == "iname"):
-            theLambda = lambda x: x.lower()
-        elif (sortBy == "atime"):
-            theLambda = lambda x: getatime(os.path.join(curPath, x))
-        elif (sortBy == "ctime"):
-            theLambda = lambda x: getctime(os.path.join(curPath, x))
-        elif (sortBy == "mtime"):
-            theLambda = lambda x: getmtime(os.path.join(curPath, x))
-        elif (sortBy == "size"):
-            theLambda = lambda x: getsize(os.path.join(curPath, x))
+            decorated = [ (ch.name.lower(), sign*i, ch) for i, ch in enumerate(chList) ]
         elif (sortBy == "ext"):
-            theLambda = lambda x: splitext(os.path.join(curPath, x))[1]
+            decorated = [ (splitext(ch.name)[1], sign*i, ch) for i, ch in enumerate(chList) ]
         else:
             raise ValueError("Unknown sort method '%s'." % (sortBy))
-        chList.sort(key=theLambda, reverse=reverse)
-        return chList
+        if (topK and topK < len(decorated)):
+            if (reverse): decorated = heapq.nlargest(topK, decorated)
+            else: decorated = heapq.nsmallest(topK, decorated)
+        else:
+            decorated.sort(reverse=reverse)
+        return [ ch for _key, _i, ch in decorated ]
 
     def recordItemType(self, trav:TraversalState, testName:str) -> None:
         self.recordEvent(trav, testName, isTest=False)
@@ -2143,23 +3142,198 @@ def getGitStatus(path:str) -> Union[str, None]:
         ! = ignored
         0 = Error
 
+    This runs `git status` just for `path`; to ask about many files, use a
+    GitStatusCache (as traversals with the "gitStatus" option do).
     TODO: Add a code to mean "not in a git repo at all", so user can
     treat files outside git distinctly from untracked files in git areas.
     """
+    dirPath, tail = os.path.split(os.path.abspath(path))
     try:
-        tokens = [ "git", "status", "-s", path ]
-        buf = check_output(tokens)
-    except CalledProcessError:
+        tokens = [ "git", "-C", dirPath, "status", "--porcelain", "-z",
+            "--ignored=matching", "--", tail ]
+        buf = check_output(tokens, stderr=subprocess.DEVNULL)
+    except (CalledProcessError, FileNotFoundError):
         return "0"
-    if str(buf[0]) in " MADRCU?!": return str(buf[1])
-    warning(0, "Unknown code '%s' from git status -s '%s'." % (str(buf[0]), path))
-    return None
+    statuses = parseGitStatus(buf)
+    if (not statuses): return " "
+    return next(iter(statuses.values()))
+
+def parseGitStatus(buf:bytes) -> Dict[str, str]:
+    """Parse `git status --porcelain -z` output to a dict from paths (relative
+    to the repository root; directories end with "/") to a status letter:
+    the work-tree code if there is one, otherwise the index code.
+    """
+    statuses = {}
+    recs = buf.decode("utf-8", errors="surrogateescape").split("\0")
+    i = 0
+    while (i < len(recs)):
+        rec = recs[i]
+        i += 1
+        if (len(rec) < 4): continue
+        x, y, relPath = rec[0], rec[1], rec[3:]
+        if (x in "RC"): i += 1  # Skip the original path of a rename/copy
+        statuses[relPath] = x if (y == " ") else y
+    return statuses
+
+
+###############################################################################
+#
+class GitStatusCache:
+    """Answer git status questions for many files, running just one
+    `git status` per repository. Repository roots are found by looking upward
+    for ".git" like versionStatus.findOwningVCS() (cached per directory), and
+    each root's whole status is parsed into a dict and kept. Create one per
+    traversal, since the statuses can go stale.
+    """
+    def __init__(self):
+        from versionStatus import findVCSRoot
+        self.findVCSRoot = findVCSRoot
+        self.rootOfDir = {}   # abs dir path -> repo root (or None)
+        self.statusMaps = {}  # repo root -> parseGitStatus() dict (or None)
+
+    def getRoot(self, dirPath:str) -> Union[str, None]:
+        if (dirPath not in self.rootOfDir):
+            self.rootOfDir[dirPath] = self.findVCSRoot(dirPath, ".git")
+        return self.rootOfDir[dirPath]
+
+    def getStatusMap(self, root:str) -> Union[Dict[str, str], None]:
+        if (root not in self.statusMaps):
+            warning(1, "Running git status for repository at '%s'." % (root))
+            try:
+                buf = check_output([ "git", "-C", root, "status", "--porcelain",
+                    "-z", "--ignored=matching" ], stderr=subprocess.DEVNULL)
+                self.statusMaps[root] = parseGitStatus(buf)
+            except (CalledProcessError, FileNotFoundError):
+                self.statusMaps[root] = None
+        return self.statusMaps[root]
+
+    def getStatus(self, path:str) -> str:
+        """Return the same codes as getGitStatus(), for a file. (For a
+        directory, getGitStatus() reports the status of some file in it,
+        but this only reports an untracked or ignored one as a whole.)
+        """
+        absPath = os.path.abspath(path)
+        root = self.getRoot(os.path.dirname(absPath))
+        if (root is None): return "0"
+        statuses = self.getStatusMap(root)
+        if (statuses is None): return "0"
+        relPath = os.path.relpath(absPath, root)
+        if (relPath in statuses): return statuses[relPath]
+        # Untracked and ignored directories are reported as a whole.
+        head = os.path.dirname(relPath)
+        while (head):
+            if (head + "/" in statuses): return statuses[head + "/"]
+            head = os.path.dirname(head)
+        return " "
 
 def getFileInfo(path:str) -> str:
     """See what the "file" command has to say about something...
+    To ask about many files, use a FileInfoCache.
     """
-    buf = check_output([ "file", "-b", path ])
-    return str(buf)
+    buf = check_output([ "file", "-b", "--", path ])
+    return buf.decode("utf-8", errors="replace").rstrip("\n")
+
+
+###############################################################################
+#
+class FileInfoCache:
+    """Keep what the `file` command says about files, keyed by
+    (st_dev, st_ino, st_mtime_ns, st_size) so a changed file is asked about
+    again. `file` (without -L) describes a symlink itself, so the key comes
+    from the link's own stat, not its target's. prime() runs `file` once for a whole batch of files (such as a
+    directory's children); get() answers from the cache when it can.
+
+    If `cachePath` is given, the cache is loaded from there and saved back
+    by save(), so later traversals skip unchanged files. The format is one
+    line per file: the 4 key fields, a TAB, and the description.
+    """
+    batchSize = 256  # Max paths per `file` run
+
+    def __init__(self, cachePath:str=None, trav:'TraversalState'=None):
+        self.cachePath = cachePath
+        self.trav = trav
+        self.infos = {}
+        self.dirty = False
+        if (cachePath and os.path.exists(cachePath)):
+            self.load()
+
+    @staticmethod
+    def makeKey(st:os.stat_result) -> Tuple[int, int, int, int]:
+        return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def load(self) -> None:
+        with codecs.open(self.cachePath, "rb", encoding="utf-8") as ifh:
+            for rec in ifh.readlines():
+                keyPart, _, info = rec.rstrip("\n").partition("\t")
+                try:
+                    self.infos[tuple(int(k) for k in keyPart.split())] = info
+                except ValueError:
+                    warning(0, "Bad record in file info cache '%s': %s" %
+                        (self.cachePath, rec))
+
+    def save(self) -> None:
+        if (not (self.cachePath and self.dirty)): return
+        tmpPath = self.cachePath + ".tmp"
+        with codecs.open(tmpPath, "wb", encoding="utf-8") as ofh:
+            for key, info in self.infos.items():
+                ofh.write("%d %d %d %d\t%s\n" % (*key, info))
+        os.replace(tmpPath, self.cachePath)
+        self.dirty = False
+
+    def prime(self, entries:List) -> None:
+        """Find out about any of these (os.DirEntry or PWEntry) entries not
+        already cached, running `file` as few times as possible.
+        """
+        todo = []
+        for entry in entries:
+            try:
+                key = self.makeKey(entry.stat(follow_symlinks=False))
+            except OSError:
+                continue
+            if (key not in self.infos): todo.append((key, entry.path))
+        for i in range(0, len(todo), self.batchSize):
+            batch = todo[i:i+self.batchSize]
+            infos = self.runFile([ path for _key, path in batch ])
+            for (key, _path), info in zip(batch, infos):
+                self.infos[key] = info
+            self.dirty = True
+
+    def get(self, path:str, entry:Union[os.DirEntry, PWEntry]=None) -> str:
+        if (entry is None): entry = PWEntry(path)
+        if (isinstance(entry, ArchiveEntry)):  # No key; ask about its start
+            return self.runFileOnData(entry.peek())
+        key = self.makeKey(entry.stat(follow_symlinks=False))
+        if (key not in self.infos):
+            self.infos[key] = self.runFile([ path ])[0]
+            self.dirty = True
+        return self.infos[key]
+
+    def runFile(self, paths:List) -> List:
+        """Run `file -b` on a list of paths, and return the descriptions.
+        If the output doesn't split into one line per path (say, if `file`
+        says something odd), fall back to one run per path.
+        """
+        if (self.trav): self.trav.bump("fileCommandRuns")
+        try:
+            buf = check_output([ "file", "-b", "--" ] + paths)
+        except (CalledProcessError, FileNotFoundError) as e:
+            warning(0, "Could not run 'file' on %d paths: %s" % (len(paths), e))
+            return [ "" ] * len(paths)
+        infos = buf.decode("utf-8", errors="replace").split("\n")[:-1]
+        if (len(infos) == len(paths)):
+            return infos
+        return [ self.runFile([ path ])[0] for path in paths ]
+
+    def runFileOnData(self, data:bytes) -> str:
+        """Run `file -b` on some bytes (such as the start of an archive member).
+        """
+        if (self.trav): self.trav.bump("fileCommandRuns")
+        try:
+            buf = check_output([ "file", "-b", "-" ], input=data)
+        except (CalledProcessError, FileNotFoundError) as e:
+            warning(0, "Could not run 'file' on data: %s" % (e))
+            return ""
+        return buf.decode("utf-8", errors="replace").rstrip("\n")
 
 def xset(path:str, prop:str, val:Any) -> None:
     #import xattr
@@ -2167,6 +3341,205 @@ def xset(path:str, prop:str, val:Any) -> None:
     sys.exit()
 
 
+###############################################################################
+# Actions to take on each selected item (for `--copyTo` and `--exec`).
+# They get everything they need as arguments, so a JobPool can run them on
+# other threads or processes. Each returns any output to report, and raises
+# an exception if it fails.
+#
+def itemCopy(fromPath:str, tgtDir:str, serialFormat:str=None, serial:int=None,
+    xattrs:bool=False) -> str:
+    """Copy a file into tgtDir. If serialFormat is given, the serial number
+    is formatted with it and inserted before the extension.
+    The target is created exclusively, so parallel copies of files with the
+    same name can't overwrite each other; if the copy fails, it is removed
+    again (so a later run won't find it there and refuse).
+    """
+    baseName = os.path.basename(fromPath)
+    if (serialFormat):
+        root, ext = splitext(baseName)
+        baseName = root + (serialFormat % (serial)) + ext
+    warning(1, "copyTo '%s', base '%s'." % (tgtDir, baseName))
+    tgtPath = os.path.join(tgtDir, baseName)
+    try:
+        os.close(os.open(tgtPath, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+    except FileExistsError as e:
+        raise FileExistsError("Target already exists: %s => %s" %
+            (fromPath, tgtPath)) from e
+    try:
+        copyfile(fromPath, tgtPath)
+    except BaseException:
+        os.remove(tgtPath)
+        raise
+    if (xattrs):
+        xset(tgtPath, "kmdItemWhereFroms", "file://"+fromPath)
+    return ""
+
+def itemExec(path:str, cmd:str, magic:str="{}") -> str:
+    """Run a shell command on path (quoted), which replaces `magic` in cmd,
+    or is appended if cmd doesn't contain it. Return the command's output.
+    """
+    qpath = shlex.quote(path)
+    if (magic in cmd): cmd = cmd.replace(magic, qpath)
+    else: cmd += " " + qpath
+    return check_output(cmd, shell=True).decode("utf-8", errors="replace")
+
+def timedCall(fn, *fnArgs) -> Tuple[float, Any, Union[str, None]]:
+    """Run fn(*fnArgs) for a JobPool, and return (seconds, result, error).
+    error is a message (not the exception, which might not pickle), or None.
+    """
+    t0 = time.perf_counter()
+    try:
+        result, error = fn(*fnArgs), None
+    except Exception as e:  # Report any failure, don't kill the pool
+        result, error = None, "%s: %s" % (type(e).__name__, e)
+    return time.perf_counter() - t0, result, error
+
+# What a JobPool reports for each job.
+#
+JobResult = namedtuple("JobResult", [ "key", "result", "error", "secs" ])
+
+class JobPool:
+    """Run jobs (such as itemCopy() or itemExec() on each item a traversal
+    yields) on a pool of threads, or of processes if `processes` is set.
+    That keeps many copies or commands going at once, which helps most when
+    each one is small and latency-bound.
+
+    submit() blocks once `maxPending` jobs are running or waiting to be
+    reported, which holds back the traversal feeding it (so memory stays
+    bounded). It and finish() generate a JobResult for each job that is
+    done: in submission order, or as they finish if `ordered` is False.
+    Each job is counted (with its time and any failure) in the
+    TraversalState passed to submit(); see TraversalState.recordJob().
+
+    With nJobs 0, each job just runs when submitted.
+    """
+    def __init__(self, nJobs:int=0, processes:bool=False, maxPending:int=0,
+        ordered:bool=True):
+        self.nJobs = nJobs
+        self.ordered = ordered
+        self.maxPending = maxPending or 4 * nJobs
+        self.pending = deque()  # of (key, trav, future)
+        self.executor = None
+        if (nJobs > 0):
+            if (processes): self.executor = ProcessPoolExecutor(max_workers=nJobs)
+            else: self.executor = ThreadPoolExecutor(max_workers=nJobs)
+
+    def submit(self, trav:TraversalState, key:Any, fn, *fnArgs):
+        """Start fn(*fnArgs), and generate the results now ready to report.
+        """
+        if (self.executor is None):
+            yield self.collect(key, trav, timedCall(fn, *fnArgs))
+            return
+        while (len(self.pending) >= self.maxPending):
+            trav.bump("jobWaits")
+            if (self.ordered):
+                self.pending[0][2].result()
+            else:
+                wait([ fut for _k, _t, fut in self.pending ],
+                    return_when=FIRST_COMPLETED)
+            for jr in self.ready(): yield jr
+        self.pending.append((key, trav, self.executor.submit(timedCall, fn, *fnArgs)))
+        for jr in self.ready(): yield jr
+
+    def ready(self):
+        """Generate the results of pending jobs that are done and can be
+        reported (for `ordered`, only those ahead of any unfinished ones).
+        """
+        if (self.ordered):
+            while (self.pending and self.pending[0][2].done()):
+                key, trav, fut = self.pending.popleft()
+                yield self.collect(key, trav, fut.result())
+        else:
+            stillPending = deque()
+            for key, trav, fut in self.pending:
+                if (fut.done()): yield self.collect(key, trav, fut.result())
+                else: stillPending.append((key, trav, fut))
+            self.pending = stillPending
+
+    @staticmethod
+    def collect(key:Any, trav:TraversalState, timed:Tuple) -> JobResult:
+        secs, result, error = timed
+        if (trav is not None): trav.recordJob(secs, failed=error is not None)
+        return JobResult(key, result, error, secs)
+
+    def finish(self):
+        """Wait for all pending jobs, and generate their results.
+        """
+        futs = [ fut for _k, _t, fut in self.pending ]
+        for fut in (futs if self.ordered else as_completed(futs)):
+            fut.result()
+            for jr in self.ready(): yield jr
+
+    def close(self) -> None:
+        if (self.executor is not None): self.executor.shutdown(wait=True)
+        self.executor = None
+
+
+###############################################################################
+#
+class JsonEventWriter:
+    """Write a JSON object for each traversal event as it comes, either
+    one per line ("ndjson"), or as members of a JSON array ("jsonArray").
+    Each is flushed right away. Nothing is kept but a flag for whether a
+    comma is needed, so memory use is constant.
+    """
+    formats = [ "ndjson", "jsonArray" ]
+    eventFields = [ "path", "name", "what", "depth" ]
+
+    def __init__(self, ofh, fields:str, isArray:bool=False):
+        self.ofh = ofh
+        self.isArray = isArray
+        self.nWritten = 0
+        self.fields = []  # Pairs of (field name, stat attribute or None)
+        for f in re.split(r"\s*,\s*", fields.strip()):
+            if (f in self.eventFields):
+                self.fields.append((f, None))
+                continue
+            attr = f if f.startswith("st_") else "st_" + f
+            if (not hasattr(os.stat_result, attr)):
+                raise ValueError("Unknown --fields item '%s'." % (f))
+            self.fields.append((f, attr))
+        self.needStat = any(attr for _f, attr in self.fields)
+
+    def start(self) -> None:
+        if (self.isArray): self.ofh.write("[")
+
+    def write(self, path:str, what:PWType, depth:int,
+        entry:Union[os.DirEntry, PWEntry]=None) -> None:
+        """Write a record for one event. For OPEN, depth is taken as the
+        depth of the container itself (that is, of its parent's contents).
+        Stat fields come from `entry` (such as TraversalState.entry) if
+        given, which has usually cached them already; else from os.lstat().
+        """
+        st = None
+        if (self.needStat):
+            try:
+                st = (entry.stat(follow_symlinks=False) if (entry is not None)
+                    else os.lstat(path))
+            except OSError:
+                pass
+        rec = {}
+        for f, attr in self.fields:
+            if (f == "path"): rec[f] = path
+            elif (f == "name"): rec[f] = os.path.basename(path)
+            elif (f == "what"): rec[f] = what.name
+            elif (f == "depth"): rec[f] = depth - 1 if (what == PWType.OPEN) else depth
+            else: rec[f] = getattr(st, attr) if (st is not None) else None
+        buf = json.dumps(rec, ensure_ascii=False)
+        if (self.isArray):
+            buf = ("\n" if (self.nWritten == 0) else ",\n") + buf
+        else:
+            buf += "\n"
+        self.ofh.write(buf)
+        self.ofh.flush()
+        self.nWritten += 1
+
+    def finish(self) -> None:
+        if (self.isArray): self.ofh.write("\n]\n")
+        self.ofh.flush()
+
+
 ###############################################################################
 # TODO: Move OutputFormatter out to separate driver?
 #
@@ -2411,8 +3784,14 @@ if __name__ == "__main__":
             parser.add_argument(
                 prefix+"oformat", prefix+"utputFormat", prefix+"output-format",
                 type=str, default="outline",
-                choices = [ "plain", "outline", "json", "html", "sexp" ],
+                choices = [ "plain", "outline", "json", "html", "sexp",
+                    "ndjson", "jsonArray" ],
                 help="Format the output in this way.")
+            parser.add_argument(
+                prefix+"fields", metavar="F", type=str,
+                default="path,what,depth,size,mtime",
+                help="With --oformat ndjson or jsonArray, the fields to write "
+                "(comma-separated: path, name, what, depth, and os.stat fields).")
             parser.add_argument(
                 prefix+"short", action="store_true",
                 help="Only show the bottom-level name in the outline view.")
@@ -2472,6 +3851,9 @@ if __name__ == "__main__":
                 self.OFOptions["closeQuote"] = "</file></li>"
                 #self.OFOptions["anonymousClose"] = True
 
+            elif (formatName in JsonEventWriter.formats):
+                pass  # Written by JsonEventWriter, not OutputFormatter
+
             elif (formatName == "sexp"):
                 warning(0, "Overriding quote settings for --oformat sexp")
                 self.OFOptions["openDirString"] = "("
@@ -2574,32 +3956,13 @@ if __name__ == "__main__":
     def itemList():
         pass
 
-    def itemCopy(fromPath:str, tgtDir:str, serialFormat:str=None, serial:int=None):
-        if (not os.path.isdir(tgtDir)):
-            warning(0, "No directory available at '%s'." % (tgtDir))
-            sys.exit()
-
-        _, baseName = os.path.split(fromPath)
-        if (serialFormat):
-            baseName = serialFormat % (serial, baseName)
-        warning(1, "copyTo '%s', base '%s'." % (tgtDir, baseName))
-        tgtPath = os.path.join(tgtDir, baseName)
-        if (os.path.exists(tgtPath)):
-            warning(0, "Target already exists: %s => %s" % (fromPath, tgtPath))
-        else:
-            copyfile(fromPath, tgtPath)
-            if (args.xattrs):
-                xset(tgtPath, "kmdItemWhereFroms", "file://"+fromPath)
-
-    def itemExec(path:str, cmd:str, magic:str="{}"):
-        if (magic in cmd): cmd.replace(magic, path)
-        else: cmd += " " + path
-        try:
-            buf0 = check_output(cmd, shell=True)
-            if (not args.quiet): print(buf0)
-        except CalledProcessError as e0:
-            warning(0, "exec failed on %s:\n    %s" % (cmd, e0))
-
+    def reportJob(jr:JobResult) -> None:
+        action, path = jr.key
+        if (jr.error is not None):
+            warning(0, "%s failed on %s:\n    %s" % (action, path, jr.error))
+        elif (jr.result and not args.quiet):
+            print(jr.result, end="")
+        warning(2, "%s took %.3fs on %s." % (action, jr.secs, path))
 
     ###########################################################################
     # The main main...
@@ -2624,6 +3987,19 @@ if __name__ == "__main__":
         parser.add_argument(
             "--execMagic", metavar="S", type=str, default="{}",
             help="With --exec, replace this instead of {} with the path.")
+        parser.add_argument(
+            "--jobs", "-j", metavar="N", type=int, default=0,
+            help="Run --copyTo and --exec on N threads (or see --jobProcesses).")
+        parser.add_argument(
+            "--jobProcesses", action="store_true",
+            help="With --jobs, use a pool of processes instead of threads.")
+        parser.add_argument(
+            "--jobsUnordered", action="store_true",
+            help="With --jobs, report results as jobs finish, not in order.")
+        parser.add_argument(
+            "--maxPendingJobs", metavar="N", type=int, default=0,
+            help="With --jobs, pause the traversal while this many jobs are "
+            "unfinished or unreported. Default: 4 times --jobs.")
         parser.add_argument(
             "--maxBasenameLength", metavar="N", type=int, default=0,
             help="Report files only ig basename is shorter than this.")
@@ -2704,7 +4080,8 @@ if __name__ == "__main__":
     if (args.verbose > 1 or args.showOptions):
         showOptions(args)
     if (args.copyTo and not os.path.isdir(args.copyTo)):
-        assert IOError("No --copyTo directory at '%s'." % (args.copyTo))
+        warning(0, "No --copyTo directory at '%s'." % (args.copyTo))
+        sys.exit()
 
     argDict = {}
     for k0 in vars(args).keys():
@@ -2717,11 +4094,26 @@ if __name__ == "__main__":
 
     of = OutputFormatter()
     if (args.oformat): of.mapNamedOFOs()
+    jw = None
+    if (args.oformat in JsonEventWriter.formats):
+        try:
+            jw = JsonEventWriter(sys.stdout, args.fields,
+                isArray=(args.oformat == "jsonArray"))
+        except ValueError as e0:
+            warning(0, str(e0))
+            sys.exit()
+        jw.start()
 
     if (args.statFormat):
         import PowerStat
         powerstat = PowerStat.PowerStat(args.statFormat)
 
+    changeMarks = {  # For --rescan
+        PWType.ADDED: "+ ", PWType.MODIFIED: "M ", PWType.REMOVED: "- " }
+
+    jobs = JobPool(args.jobs, processes=args.jobProcesses,
+        maxPending=args.maxPendingJobs, ordered=not args.jobsUnordered)
+
     leafNum = 0
     for topItem in args.files:
         pw = PowerWalk(topItem)
@@ -2736,8 +4128,16 @@ if __name__ == "__main__":
             abspath0 = os.path.abspath(path0)
             if (args.absolute): printpath0 = abspath0
             else: printpath0 = path0
+            depth0 = pw.travState.depth
+
+            if (jw is not None and what0 not in
+                (PWType.LEAF, PWType.ADDED, PWType.MODIFIED)):  # Leafs below
+                if (what0 == PWType.CLOSE): continue
+                if (what0 == PWType.OPEN and args.type and "d" not in args.type): continue
+                jw.write(printpath0, what0, depth0, pw.travState.entry)
+                continue
 
-            flag = of.getFlagChar(abspath0)
+            flag = "" if (what0 == PWType.REMOVED) else of.getFlagChar(abspath0)
             printpath0 = of.makeDisplayableName(printpath0) + flag
             if (args.quote): printpath0 = of.quoteFilename(printpath0)
 
@@ -2746,22 +4146,34 @@ if __name__ == "__main__":
             if (what0 == PWType.OPEN):
                 if (args.type and "d" not in args.type): continue
                 print(of.makeOpenDirDisplay(printpath0, pw.travState.depth))
-            elif (what0 == PWType.LEAF):
+            elif (what0 == PWType.REMOVED):
+                print(of.makeItemDisplay(
+                    changeMarks[what0] + printpath0, pw.travState.depth))
+            elif (what0 in (PWType.LEAF, PWType.ADDED, PWType.MODIFIED)):
+                if (what0 in changeMarks): printpath0 = changeMarks[what0] + printpath0
                 if (args.minBasenameLength and
                     len(os.path.basename(abspath0)) < args.minBasenameLength): continue
                 if (args.maxBasenameLength and
                     len(os.path.basename(abspath0)) > args.maxBasenameLength): continue
                 leafNum += 1
 
-                if (not args.quiet):
+                if (jw is not None):
+                    jw.write(abspath0 if (args.absolute) else path0, what0, depth0,
+                        pw.travState.entry)
+                elif (not args.quiet):
                     print(of.makeItemDisplay(printpath0, pw.travState.depth))
                 if (args.statFormat):
                     print(powerstat.format(abspath0))
                 if (args.copyTo):
-                    itemCopy(fromPath=abspath0, tgtDir=args.copyTo,
-                        serialFormat=args.serializeFormat, serial=leafNum)
+                    for jr0 in jobs.submit(pw.travState, ("copyTo", path0),
+                        itemCopy, abspath0, args.copyTo,
+                        args.serializeFormat if args.serialize else None,
+                        leafNum, args.xattrs):
+                        reportJob(jr0)
                 if (args.exec):
-                    itemExec(path0, args.exec, args.execMagic)
+                    for jr0 in jobs.submit(pw.travState, ("exec", path0),
+                        itemExec, path0, args.exec, args.execMagic):
+                        reportJob(jr0)
 
             elif (what0 == PWType.CLOSE):
                 if (args.type and "d" not in args.type): continue
@@ -2770,6 +4182,11 @@ if __name__ == "__main__":
                 print(indent, "IGNORING: ", printpath0, args.itemSep)
             elif (what0 == PWType.ERROR):
                 print(indent, "ERROR: ", printpath0, args.itemSep)
+        for jr0 in jobs.finish():
+            reportJob(jr0)
+
+    jobs.close()
+    if (jw is not None): jw.finish()
 
     if (args.count):
         print("Dirs: %d\nFiles: %d" %
@@ -8,6 +8,11 @@ import codecs
 import unicodedata
 import urllib
 import html
+import os
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 #from html.parser import HTMLParser
 
 import regex as re  # Adds support for \p{}. See https://pypi.org/project/regex/
@@ -778,6 +783,18 @@ Ported from Tokenizer.pm (also) by Steven J. DeRose.
 * 2021-04-09: Clean up. Spell NFKD right. Re-sync versions.
 Clean up handling of `dispTypes`, quotes and general lint.
 * 2022-03-11: Drop Python2. Lint.
+* 2026-10-16: Compile HeavyTokenizer's regexes once, and do normalize() and
+nonWordTokens() each in one pass, via a cached NormPlan (one str.translate()
+table for the char-class options, one combined regex for the T_ options).
+Accept "disp" option values in any case, and make map() return `s` for "keep".
+* 2026-10-16: Add BatchTokenizer, to tokenize many texts or files in a pool
+of worker processes, each with its own pre-built tokenizer, in bounded memory
+and in input order. Add `--workers` and `--chunkSize`.
+* 2026-10-16: Add tokenizeSpans() to all three tokenizers, to generate
+(start, end, kind) offsets into the original string instead of token strings
+(see `spanKinds`), plus `spans` for BatchTokenizer and `--spans`. Move the T_
+regexes to makeNonWordRegexes(), and fix ones that could never match (URI,
+emoticon, hashtag, user, percent, currency, date, and Rumi fractions).
 
 
 =Rights=
@@ -1046,6 +1063,238 @@ def die(msg):
     raise AssertionError(msg)
 
 
+###############################################################################
+# Regexes for non-word tokens, like times, URIs, and emoticons.
+#
+def makeNonWordRegexes() -> dict:
+    """Return the (uncompiled) regexes for the kinds of non-word tokens,
+    keyed by option name (like "T_TIME"). HeavyTokenizer uses these in
+    nonWordTokens(), and all the tokenizers use them to classify spans (see
+    spanKind()).
+    """
+    regexes = {}
+
+    ###################################################### DATE/TIME
+    # Doesn't deal with alphabetic times
+    #
+    yr       = r"\b[12]\d\d\d"                         # Year
+    tim      = r"[012]?\d:[0-5]\d(:[0-5]\d)?"
+    # Move following few to TokensEN?
+    ampm     = r"(a\.?m\.?|p\.?m\.?)?"
+    era      = r"(AD|BC|CE|BCE)"                       # Which half of hx
+    zone     = r"\s?[ECMP][SD]T"                       # Time zone
+    regexes["T_TIME"]      = r"\b%s\s*%s(%s)?\b" % (tim, ampm, zone)
+    # Also '60s 60's 60s
+    regexes["T_DATE"]      = (
+        r'('+yr+r'[-\/][01]?\d[-\/][0-3]?\d|'+yr+' ?'+era+r')\b')
+
+    ###################################################### NUMERICS
+    # Also float, exp, 1,234,567, 5'6", roman numerals, Europen punctuation
+    #
+    regexes["T_NUMBER"]    = r'\b[-+]?\d+\b'
+    regexes["T_FLOAT"]     = r'\b[-+]?\d+(\.\d+)?([Ee][-+]?\d+)?\b'
+
+    ###################################################### FRACTIONS
+    # Doesn't deal with spelled out "one half" etc.
+    # (sadly, Unicode lumps these into Number, other).
+    fractionChars = "".join([
+        "\u00BC",   # VULGAR FRACTION ONE QUARTER
+        "\u00BD",   # VULGAR FRACTION ONE HALF
+        "\u00BE",   # VULGAR FRACTION THREE QUARTERS
+        "\u0B72",   # ORIYA FRACTION ONE QUARTER
+        "\u0B73",   # ORIYA FRACTION ONE HALF
+        "\u0B74",   # ORIYA FRACTION THREE QUARTERS
+        "\u0B75",   # ORIYA FRACTION ONE SIXTEENTH
+        "\u0B76",   # ORIYA FRACTION ONE EIGHTH
+        "\u0B77",   # ORIYA FRACTION THREE SIXTEENTHS
+        "\u0C78",   # TELUGU FRACTION DIGIT ZERO FOR ODD POWERS OF FOUR
+        "\u0C79",   # TELUGU FRACTION DIGIT ONE FOR ODD POWERS OF FOUR
+        "\u0C7A",   # TELUGU FRACTION DIGIT TWO FOR ODD POWERS OF FOUR
+        "\u0C7B",   # TELUGU FRACTION DIGIT THREE FOR ODD POWERS OF FOUR
+        "\u0C7C",   # TELUGU FRACTION DIGIT ONE FOR EVEN POWERS OF FOUR
+        "\u0C7D",   # TELUGU FRACTION DIGIT TWO FOR EVEN POWERS OF FOUR
+        "\u0C7E",   # TELUGU FRACTION DIGIT THREE FOR EVEN POWERS OF FOUR
+        "\u0D73",   # MALAYALAM FRACTION ONE QUARTER
+        "\u0D74",   # MALAYALAM FRACTION ONE HALF
+        "\u0D75",   # MALAYALAM FRACTION THREE QUARTERS
+        "\u2044",   # FRACTION SLASH Sm 0 CS     N
+        "\u2150",   # VULGAR FRACTION ONE SEVENTH
+        "\u2151",   # VULGAR FRACTION ONE NINTH
+        "\u2152",   # VULGAR FRACTION ONE TENTH
+        "\u2153",   # VULGAR FRACTION ONE THIRD
+        "\u2154",   # VULGAR FRACTION TWO THIRDS
+        "\u2155",   # VULGAR FRACTION ONE FIFTH
+        "\u2156",   # VULGAR FRACTION TWO FIFTHS
+        "\u2157",   # VULGAR FRACTION THREE FIFTHS
+        "\u2158",   # VULGAR FRACTION FOUR FIFTHS
+        "\u2159",   # VULGAR FRACTION ONE SIXTH
+        "\u215A",   # VULGAR FRACTION FIVE SIXTHS
+        "\u215B",   # VULGAR FRACTION ONE EIGHTH
+        "\u215C",   # VULGAR FRACTION THREE EIGHTHS
+        "\u215D",   # VULGAR FRACTION FIVE EIGHTHS
+        "\u215E",   # VULGAR FRACTION SEVEN EIGHTHS
+        "\u215F",   # FRACTION NUMERATOR ONE
+        "\u2189",   # VULGAR FRACTION ZERO THIRDS
+        "\u2CFD",   # COPTIC FRACTION ONE HALF
+        "\uA830",   # NORTH INDIC FRACTION ONE QUARTER
+        "\uA831",   # NORTH INDIC FRACTION ONE HALF
+        "\uA832",   # NORTH INDIC FRACTION THREE QUARTERS
+        "\uA833",   # NORTH INDIC FRACTION ONE SIXTEENTH
+        "\uA834",   # NORTH INDIC FRACTION ONE EIGHTH
+        "\uA835",   # NORTH INDIC FRACTION THREE SIXTEENTHS
+        "\U00010E7B",   # RUMI FRACTION ONE HALF
+        "\U00010E7C",   # RUMI FRACTION ONE QUARTER
+        "\U00010E7D",   # RUMI FRACTION ONE THIRD
+        "\U00010E7E",   # RUMI FRACTION TWO THIRDS
+    ])
+
+    # (The fraction chars aren't \w, so \b doesn't work around them)
+    regexes["T_FRACTION"]  = (
+        r"\b(\d+-)?\d+\/\d+\b|(?<!\w)[%s](?!\w)" % (fractionChars))
+
+    ###################################################### CURRENCY
+    currency = "".join([r"$",
+        "\u00A3",   # pound sign
+        "\u00A4",   # currency sign
+        #"\u09F4",   # to U+09F9: Bengali currency numerators/denominator
+        "\u0E3f",   # Thai bhat
+        "\u17DB",   # Khmer riel
+        "\u20A0",   # Euro sign ~~ U+20CF
+        "\uFFE1",   # fullwidth pound sign
+        "\uFE69",   # SMALL DOLLAR SIGN
+        "\uFF04",   # FULLWIDTH DOLLAR SIGN
+        #"\u1F4B2",  # HEAVY DOLLAR SIGN
+    ])
+    regexes["T_CURRENCY"]  = r"(?<!\w)[%s]\d+(\.\d+)?[KMB]?\b" % (currency)
+
+    ###################################################### PERCENT, etc.
+    pct = "".join(["%",
+        "\u2030",   # Per Mille Sign
+        "\u2031",   # Per Ten Thousand Sign
+        "\u0609",   # Arabic-indic Per Mille Sign
+        "\u060a",   # Arabic-indic Per Ten Thousand Sign
+        "\u066a",   # Arabic-indic Percent Sign
+        "\uFE6A",   # Small Percent Sign
+        "\uFF05",   # Fullwidth Percent Sign
+    ])
+    regexes["T_PERCENT"]   = r"\b\d+(\.\d+)?[%s]" % (pct)
+
+    uriChars = r"[-~?\[\]()&@+\w.:\/$#%=]"             # Chars ok in URIs
+    schemes  = "(shttp|http|https|ftp|mailto)"        # URI scheme prefixes
+    #tld      = "(com|org|edu|net|uk|ca)"              # top-level domains
+    regexes["T_EMOTICON"]  = r"(?<![\w:;])[-:;]+[(){}<>PD](?!\w)"
+    regexes["T_HASHTAG"]   = r"(?<!\w)#\p{L}+\b"
+    regexes["T_EMAIL"]     = r"\b\w[-.+\w]*@\w+(\.\w+)+\b"
+    regexes["T_USER"]      = r"(?<![\w@])@\w[.\w]*\b"
+    regexes["T_URI"]       = r"\b%s:\/\/%s+\w\b" % (schemes, uriChars)
+
+    return regexes
+
+
+###############################################################################
+# Spans. Each tokenizer's tokenizeSpans() generates (start, end, kind) for
+# each token, as offsets into the original string. `kind` is one of these:
+#
+spanKinds = {
+    "T_URI":         "URI, such as http://example.com/x",
+    "T_EMAIL":       "Email address",
+    "T_USER":        "User name, such as @nine",
+    "T_HASHTAG":     "Hash-tag, such as #nine",
+    "T_TIME":        "Time, such as 2:31am",
+    "T_DATE":        "Date, such as 2005-04-02 or 2021 CE",
+    "T_FRACTION":    "Fraction, such as 3-1/2 or a Unicode fraction char",
+    "T_PERCENT":     "Percentage, such as 12%",
+    "T_CURRENCY":    "Amount of money, such as $200M",
+    "T_EMOTICON":    "Emoticon, such as :)",
+    "T_NUMBER":      "Integer",
+    "T_FLOAT":       "Other number, such as 3.14 or 0.2E-12",
+    "CONTRACTION":   "Split-off contraction or possessive, such as 's or '",
+    "WORD":          "Any other token with word characters",
+    "PUNCT":         "Any other token (punctuation, symbols, etc.)",
+    "CHAR":          "One character (HeavyTokenizer with TOKENTYPE 'chars')",
+    "TEXT":          "The whole string (HeavyTokenizer with TOKENTYPE 'none')",
+}
+
+# spanKind() tries the T_ kinds in the order of `spanKinds`, so one token
+# can be tested against them all in one regex call.
+nonWordRegexes = makeNonWordRegexes()
+spanKindRegex = re.compile("|".join(
+    [ "(?P<%s>%s)" % (kind, nonWordRegexes[kind])
+        for kind in spanKinds if kind.startswith("T_") ] +
+    [ r"(?P<WORD>\W*\w(?s:.*))", r"(?P<PUNCT>(?s:.+))" ]))
+
+def spanKind(s:str, start:int, end:int) -> str:
+    """Return the kind (see `spanKinds`) of the token s[start:end], without
+    making a string of it. Lookbehinds (like the one in T_USER) can see the
+    chars before `start`, just as when finding such tokens in running text.
+    Tokenizers leave a final "." on tokens (it may be an abbreviation), so
+    if the token isn't a T_ kind but would be without that, it counts as one.
+    """
+    mat = spanKindRegex.fullmatch(s, start, end)
+    kind = mat.lastgroup if (mat) else "PUNCT"
+    if (not kind.startswith("T_") and end - start > 1 and s[end-1] == "."):
+        mat = spanKindRegex.fullmatch(s, start, end-1)
+        if (mat and mat.lastgroup.startswith("T_")): return mat.lastgroup
+    return kind
+
+spanChunkRegex = re.compile(r"\S+")
+
+def spanChunks(s:str, sepRegex) -> tuple:
+    """Generate (start, end, isSep) for each match of `sepRegex` in `s` (which
+    become tokens of their own, like em dashes), and for each whitespace-
+    delimited chunk between them.
+    """
+    pos = 0
+    for sep in sepRegex.finditer(s):
+        for chunk in spanChunkRegex.finditer(s, pos, sep.start()):
+            yield chunk.start(), chunk.end(), False
+        yield sep.start(), sep.end(), True
+        pos = sep.end()
+    for chunk in spanChunkRegex.finditer(s, pos):
+        yield chunk.start(), chunk.end(), False
+
+def spanTexts(s:str, spans):
+    """Generate the token strings for (start, end, kind) `spans` in `s`,
+    one at a time, only when they're wanted.
+    """
+    for start, end, _kind in spans:
+        yield s[start:end]
+
+def translateWithOffsets(s:str, table) -> tuple:
+    """Translate `s` with a str.translate() `table` (such as a CharTable),
+    and also return a list of the offset in the result where each char of
+    `s` starts (or None if every char became just one char, so offsets
+    didn't change). See spansBack().
+    """
+    s2 = s.translate(table)
+    if (len(s2) == len(s) and
+        all(len(table[ord(c)]) == 1 for c in set(s))):
+        return s2, None
+    starts = list(accumulate(
+        (len(table[ord(c)]) for c in s), initial=0))
+    return s2, starts[:-1]
+
+def spansBack(s:str, spans, starts:list):
+    """Map (start, end, kind) `spans` found in a translated copy of `s` (see
+    translateWithOffsets()), back to offsets in `s`. Where one char of `s`
+    became several, tokens within it overlap once mapped back, so those are
+    merged into one span (keeping the first one's kind). A kind of None is
+    filled in by spanKind(), from `s`.
+    """
+    pst = pen = -1
+    pkind = None
+    for st, en, kind in spans:
+        if (starts is not None):
+            st = bisect_right(starts, st) - 1
+            en = bisect_left(starts, en)
+        if (st < pen):
+            pen = max(pen, en)
+            continue
+        if (pst >= 0): yield pst, pen, pkind or spanKind(s, pst, pen)
+        pst, pen, pkind = st, en, kind
+    if (pst >= 0): yield pst, pen, pkind or spanKind(s, pst, pen)
+
+
 ###############################################################################
 # Could be fancier. Based on Volsunga Python port.
 #
@@ -1070,6 +1319,14 @@ class SimpleTokenizer:
     # Hyphenated words?
     hyphens        = re.compile(r"(\w)-(\w)")
 
+    # The same rules for tokenizeSpans(), to find tokens in place rather
+    # than insert spaces around them.
+    spanLeading    = re.compile(r"[\"`\p{Pi}\p{Ps}]+")
+    spanTrailing   = re.compile(r"[\"`:;,.?!\p{Pf}\p{Pe}]+$")
+    spanContracted = re.compile(r"(?<=\w)'(s|d|t|ll|ve|re)?$")
+    spanHyphens    = re.compile(r"(?<=\w)-(?=\w)")
+    spanPuncts     = re.compile(r"\.+|-+|.", re.S)  # Same as spaceAll()
+
     # Insert spaces between all characters, except inside emdash, ellipsis.
     #
     def spaceAll(self, mat):
@@ -1084,6 +1341,7 @@ class SimpleTokenizer:
         ):
         self.normalize = normalize
         self.breakHyphens = breakHyphens
+        self.charTables = {}  # See tokenizeSpans()
         self.contractor = None
         if (fancyContractions):
             import TokensEN
@@ -1148,6 +1406,55 @@ class SimpleTokenizer:
 
         return(tokens)
 
+    def tokenizeSpans(self, s1):
+        """Like tokenize(), but generate (start, end, kind) for each token,
+        as offsets into `s1` itself, instead of making a list of strings
+        (see `spanKinds`, and spanTexts() to get strings only when needed).
+        Normalization can move token boundaries (NFKD makes a fullwidth
+        comma into ","), so the tokens are found in the normalized text,
+        made one char at a time through a CharTable so the offsets can be
+        mapped back (see spansBack()). Tokens that split one source char
+        (say, "……" becomes "......", then "....", "..") come back as one
+        span. Contractions are always split by the simple rule.
+        """
+        if (self.normalize not in self.charTables):
+            rules = [ (re.compile("\u00AD"), lambda c: "") ]
+            if (self.normalize):
+                rules.append((re.compile(r"(?s:.)"),
+                    lambda c: unicodedata.normalize("NFKD", c)))
+            self.charTables[self.normalize] = CharTable(rules)
+        s2, starts = translateWithOffsets(s1, self.charTables[self.normalize])
+        return spansBack(s1, self.findSpans(s2), starts)
+
+    def findSpans(self, s1):
+        """Find the tokens in (already normalized) `s1`, for tokenizeSpans().
+        """
+        for st, en, isSep in spanChunks(s1, SimpleTokenizer.splitDashes):
+            if (isSep):
+                yield st, en, "PUNCT"
+                continue
+
+            mat = SimpleTokenizer.spanLeading.match(s1, st, en)
+            if (mat):
+                for i in range(st, mat.end()): yield i, i+1, "PUNCT"
+                st = mat.end()
+            if (st >= en): continue
+
+            mat = SimpleTokenizer.spanTrailing.search(s1, st, en)
+            trail = mat.start() if (mat) else en
+            mat = SimpleTokenizer.spanContracted.search(s1, st, trail)
+            contr = mat.start() if (mat) else trail
+
+            if (self.breakHyphens):
+                for mat in SimpleTokenizer.spanHyphens.finditer(s1, st, contr):
+                    yield st, mat.start(), spanKind(s1, st, mat.start())
+                    yield mat.start(), mat.end(), "PUNCT"
+                    st = mat.end()
+            if (st < contr): yield st, contr, spanKind(s1, st, contr)
+            if (contr < trail): yield contr, trail, "CONTRACTION"
+            for mat in SimpleTokenizer.spanPuncts.finditer(s1, trail, en):
+                yield mat.start(), mat.end(), "PUNCT"
+
 
 ###############################################################################
 #
@@ -1186,6 +1493,7 @@ class NLTKTokenizerPlus:
         self.options = {}
         self.srcData = ""
         self.tokens = []
+        self.charTables = {}  # See prepareWithOffsets()
 
     def tokenize(self, txt):
         if (self.options["unicodePunct"]):
@@ -1203,6 +1511,71 @@ class NLTKTokenizerPlus:
                 tokens[i] = token[0:-1]
         return tokens
 
+    def tokenizeSpans(self, txt):
+        """Like tokenize(), but generate (start, end, kind) for each token,
+        as offsets into `txt` itself, instead of making a list of strings
+        (see `spanKinds`, and spanTexts() to get strings only when needed).
+        NLTK tokenizes the prepared text (see prepareWithOffsets()), its
+        tokens are found in that, and their offsets mapped back to `txt`.
+        A dropped final dot is just left out of its token's span.
+        When one char of `txt` became several tokens (say, NFKC turns "½"
+        into "1⁄2"), those tokens map back to overlapping spans of `txt`,
+        so they are merged into one span.
+        """
+        txt2, starts = self.prepareWithOffsets(txt)
+        return spansBack(txt, self.findSpans(txt2), starts)
+
+    def findSpans(self, txt2):
+        """Find where each of NLTK's tokens came from in the prepared text.
+        """
+        pos = 0
+        for token in self.nltk.word_tokenize(txt2):
+            st, en = NLTKTokenizerPlus.findToken(txt2, token, pos)
+            if (st < 0): continue
+            pos = en
+            if (len(token) > 1 and token.find(".") == len(token)-1):
+                en -= 1
+            yield st, en, None
+
+    def prepareWithOffsets(self, txt):
+        """Make the same changes tokenize() makes before calling NLTK,
+        but one char at a time (see prepareChar()), so we know where each
+        char of `txt` ended up. Return the changed text, plus a list of the
+        offset in it where each char of `txt` starts (or None, if every char
+        became just one char, so offsets didn't change).
+        """
+        key = (self.options["unicodePunct"], self.options["expandLigatures"],
+            self.options["normalize"])
+        if (key not in self.charTables):
+            self.charTables[key] = CharTable(
+                [ (re.compile(r"(?s:.)"), self.prepareChar) ])
+        return translateWithOffsets(txt, self.charTables[key])
+
+    def prepareChar(self, c):
+        if (self.options["unicodePunct"]):
+            c = self.regularizeUnicode(c)
+        if (self.options["expandLigatures"]):
+            c = self.expandLigatures(c)
+        if (self.options["normalize"]):
+            c = unicodedata.normalize(self.options["normalize"], c)
+        return c
+
+    @staticmethod
+    def findToken(txt, token, pos):
+        """Find where NLTK got `token` from, at or after `pos` in `txt`.
+        NLTK turns double quotes into `` or '', so look for any of them.
+        Return (-1, -1) if it's not there.
+        """
+        if (token in ("``", "''")):
+            found = [ (txt.find(q, pos), q) for q in ('"', "``", "''") ]
+            found = [ (st, q) for st, q in found if st >= 0 ]
+            if (not found): return -1, -1
+            st, q = min(found)
+            return st, st + len(q)
+        st = txt.find(token, pos)
+        if (st < 0): return -1, -1
+        return st, st + len(token)
+
     def regularizeUnicode(self, txt):
         """Deal with Unicode details. Specifically:
             - Reduce variant spaces, dashes, quotes
@@ -1233,13 +1606,13 @@ class NLTKTokenizerPlus:
 # Functions used as RHS in regex changes
 #
 def ligRegexFunction(mat):
-    try:
-        return unicodeLigatures[mat.group(0)]
-    except KeyError:
-        return mat.group(0)
+    # unicodeLigatures just lists code points, so expand them via NFKD.
+    return unicodedata.normalize("NFKD", mat.group(0))
 
 def strip_diacritics(mat):
-    c = mat.group(1)
+    return stripDiacritics(mat.group(0))
+
+def stripDiacritics(c):
     de = unicodedata.normalize("NFKD", c)
     if (de is None or de == ""): return(c)
     # Ditch accents, but not ligature parts...
@@ -1248,12 +1621,112 @@ def strip_diacritics(mat):
 
 
 def get_value(mat):
+    return numericValue(mat.group(0))
+
+def numericValue(c):
     """Unicode defines numeric values for many chars, such as fractions.
+    Return it as a string ("0.5", not "0.5000"; "5", not "5.0"), or `c`
+    itself if it has none.
     """
-    c = mat.group(1)
-    v = unicodedata.numeric(c)
-    if (v is None or v == ""): return(c)
-    return(v)
+    if (len(c) != 1): return(c)
+    v = unicodedata.numeric(c, None)
+    if (v is None): return(c)
+    if (v == int(v)): return(str(int(v)))
+    return(str(v))
+
+
+###############################################################################
+# Compiled normalization, so HeavyTokenizer doesn't need a separate re.sub()
+# pass over the text for every option.
+#
+def dispFunction(dt, norm=None):
+    """Return a function that does what dispType `dt` says to a matched
+    char or token (`norm` is the replacement for DT_UNIFY).
+    """
+    if (dt == DT_UNIFY):     return lambda t: norm
+    if (dt == DT_DELETE):    return lambda t: ""
+    if (dt == DT_SPACE):     return lambda t: " "
+    if (dt == DT_STRIP):     return stripDiacritics
+    if (dt == DT_VALUE):     return numericValue
+    if (dt == DT_UPPER):     return str.upper
+    if (dt == DT_LOWER):     return str.lower
+    if (dt == DT_DECOMPOSE): return lambda t: unicodedata.normalize("NFKD", t)
+    die("dispFunction: bad dispType '%s'." % (dt))
+
+
+class CharTable(dict):
+    """A str.translate() table that works out what to do with each char
+    the first time it turns up, and remembers that. So even huge classes
+    like \\p{Cn} cost nothing up front, and a text only pays once for each
+    distinct char in it.
+    `rules` is a list of (compiled regex, function), and the first regex
+    that matches a char decides it. Chars no rule matches map to themselves.
+    """
+    def __init__(self, rules):
+        super().__init__()
+        self.rules = rules
+
+    def __missing__(self, code):
+        c = chr(code)
+        rep = c
+        for cregex, fn in self.rules:
+            if (cregex.match(c)):
+                rep = fn(c)
+                break
+        self[code] = rep
+        return rep
+
+
+class NormPlan:
+    """Everything HeavyTokenizer's normalize() and nonWordTokens() have to
+    do for one set of option values, compiled so each is a single pass:
+        * the char-class options (Ascii_Only, the Unicode categories,
+          Control_0, Nbsp, etc.) become one str.translate() table;
+        * the T_ options, which match whole tokens and so can't be
+          translated, become one regex that's an alternation of named
+          groups, with a callback that handles whichever one matched.
+    Options set to "keep" are left out entirely. Each char gets mapped
+    once, by the first non-"keep" option that covers it, so the results of
+    one option are never run through another.
+
+    Plans are cached by option values, so HeavyTokenizers set up the same
+    way share them (and their translate tables).
+    """
+    cache = {}
+
+    def __init__(self, charRules, tokenRules):
+        """Both arguments are lists of (compiled regex, optName, dispType, norm).
+        """
+        self.table = None
+        if (charRules):
+            self.table = CharTable(
+                [ (cregex, dispFunction(dt, norm))
+                for cregex, _optName, dt, norm in charRules ])
+
+        self.tokenRegex = None
+        self.tokenNames = []
+        self.tokenFns = {}
+        if (tokenRules):
+            alts = []
+            for cregex, optName, dt, norm in tokenRules:
+                alts.append("(?P<%s>%s)" % (optName, cregex.pattern))
+                self.tokenNames.append(optName)
+                self.tokenFns[optName] = dispFunction(dt, norm)
+            self.tokenRegex = re.compile("|".join(alts))
+
+    def normalize(self, s):
+        if (self.table is None): return s
+        return s.translate(self.table)
+
+    def nonWordTokens(self, s):
+        if (self.tokenRegex is None): return s
+        return self.tokenRegex.sub(self.tokenRepl, s)
+
+    def tokenRepl(self, mat):
+        for optName in self.tokenNames:
+            if (mat.start(optName) >= 0):
+                return self.tokenFns[optName](mat.group(0))
+        return mat.group(0)
 
 
 ###############################################################################
@@ -1276,6 +1749,32 @@ class HeavyTokenizer:
         "decompose" :  8,     # "Letter"
         }
 
+    # The options normalize() and nonWordTokens() apply, in order, with the
+    # replacement to use if they're set to "unify".
+    charOptions = [ (ugcName, ugcDescr)
+        for ugcName, ugcDescr in unicodeCategories.items() ] + [
+        ("Accent",         "???"),
+        ("Control_0",      " "),
+        ("Control_1",      " "),
+        # The digit normalization should be optional:
+        #("Digit",          "9"),
+        ("Nbsp",           " "),
+        ("Soft_Hyphen",    ""),
+    ]
+    tokenOptions = [
+        ("T_TIME",         "09:09"),
+        ("T_DATE",         "2009-09-09"),
+        ("T_FRACTION",     "9/9"),
+        #("T_NUMBER",       "9999"),
+        #("T_CURRENCY",     "#99"),
+        ("T_PERCENT",      "99%"),
+        ("T_EMOTICON",     ":)"),
+        ("T_HASHTAG",      "#nine"),
+        ("T_EMAIL",        "u@nine.com"),
+        ("T_USER",         "@nine"),
+        ("T_URI",          "http://www.nine.com"),
+    ]
+
     def __init__(self, breakHyphens=False):
         self.options     = {}
         self.optionTypes = {}
@@ -1285,6 +1784,7 @@ class HeavyTokenizer:
         self.tokens      = []
         self.nNilTokens  = []   # by place in record
         self.regexes     = {}
+        self.plan        = None  # See getPlan()
 
         self.breakHyphens = breakHyphens
 
@@ -1376,12 +1876,65 @@ class HeavyTokenizer:
         if (name not in self.options):
             raise ValueError("Unknown option '%s'." % (name))
         self.options[name] = value
+        if (self.optionTypes[name] == "disp" or name == "Ascii_Only"):
+            self.plan = None
+        elif (name in ("N_CHAR", "N_SPACE")):
+            self.preCompileRegexes()
 
     def getOption(self, name):
         if (name not in self.options):
             raise ValueError("Unknown option '%s'." % (name))
         return self.options[name]
 
+    def getDisp(self, optName:str) -> str:
+        """Return the DT_ constant for the value of a "disp" option
+        (which are set as lower-case keywords, like "keep" or "space").
+        """
+        optValue = self.options[optName]
+        if (optValue is None):
+            die("No option value found for '%s'." % (optName))
+        try:
+            return dispTypes[str(optValue).upper()][0]
+        except KeyError:
+            die("Unknown value '%s' for option '%s'." % (optValue, optName))
+
+    def getPlan(self) -> NormPlan:
+        """Return the NormPlan for the current option values. It's only
+        rebuilt (or fetched from NormPlan.cache) after setOption() changes
+        one of them; so if you change self.options directly, set
+        self.plan to None.
+        """
+        if (self.plan is not None): return self.plan
+
+        charRules = []
+        if (self.options["Ascii_Only"]):
+            charRules.append(
+                (self.regexes["Ascii_Only"], "Ascii_Only", DT_DELETE, None))
+        else:
+            charRules = self.getRules(HeavyTokenizer.charOptions)
+        tokenRules = self.getRules(HeavyTokenizer.tokenOptions)
+
+        key = tuple((optName, dt) for _cregex, optName, dt, _norm
+            in charRules + tokenRules)
+        if (key not in NormPlan.cache):
+            NormPlan.cache[key] = NormPlan(charRules, tokenRules)
+        self.plan = NormPlan.cache[key]
+        return self.plan
+
+    def getRules(self, optList:list) -> list:
+        """Make a (compiled regex, optName, dispType, norm) tuple for each
+        option in `optList` that isn't set to "keep".
+        """
+        rules = []
+        for optName, norm in optList:
+            dt = self.getDisp(optName)
+            if (dt == DT_KEEP): continue
+            cregex = self.regexes.get(optName)
+            if (cregex is None):
+                die("No compiled regex available for '%s'" % (optName))
+            rules.append((cregex, optName, dt, norm))
+        return rules
+
 
     ###########################################################################
     # REGEX
@@ -1403,119 +1956,9 @@ class HeavyTokenizer:
 
         ###################################################### VERY SPECIAL CHARS
         self.regexes["Nbsp"]        = r"\xA0"
-        self.regexes["Soft_Hyphen"] = r"\xAD\u1806"
+        self.regexes["Soft_Hyphen"] = r"[\xAD\u1806]"
 
-        ###################################################### DATE/TIME
-        # Doesn't deal with alphabetic times
-        #
-        yr       = r"\b[12]\d\d\d"                         # Year
-        tim      = r"[012]?\d:[0-5]\d(:[0-5]\d)?"
-        # Move following few to TokensEN?
-        ampm     = r"(a\.?m\.?|p\.?m\.?)?"
-        era      = r"(AD|BC|CE|BCE)"                       # Which half of hx
-        zone     = r"\s?[ECMP][SD]T"                       # Time zone
-        self.regexes["T_TIME"]      = r"\b%s\s*%s(%s)?\b" % (tim, ampm, zone)
-        # Also '60s 60's 60s
-        self.regexes["T_DATE"]      = (
-            r'\b('+yr+r'".\'[-\/][0-3]?\d[-\/][0-3]?\d)|('+yr+' ?'+era+r')\b')
-
-        ###################################################### NUMERICS
-        # Also float, exp, 1,234,567, 5'6", roman numerals, Europen punctuation
-        #
-        self.regexes["T_NUMBER"]    = r'\b[-+]?\d+\b'
-        self.regexes["T_FLOAT"]     = r'\b[-+]?\d+(\.\d+)?([Ee][-+]?\d+)?\b'
-
-        ###################################################### FRACTIONS
-        # Doesn't deal with spelled out "one half" etc.
-        # (sadly, Unicode lumps these into Number, other).
-        fractionChars = "".join([
-            "\u00BC",   # VULGAR FRACTION ONE QUARTER
-            "\u00BD",   # VULGAR FRACTION ONE HALF
-            "\u00BE",   # VULGAR FRACTION THREE QUARTERS
-            "\u0B72",   # ORIYA FRACTION ONE QUARTER
-            "\u0B73",   # ORIYA FRACTION ONE HALF
-            "\u0B74",   # ORIYA FRACTION THREE QUARTERS
-            "\u0B75",   # ORIYA FRACTION ONE SIXTEENTH
-            "\u0B76",   # ORIYA FRACTION ONE EIGHTH
-            "\u0B77",   # ORIYA FRACTION THREE SIXTEENTHS
-            "\u0C78",   # TELUGU FRACTION DIGIT ZERO FOR ODD POWERS OF FOUR
-            "\u0C79",   # TELUGU FRACTION DIGIT ONE FOR ODD POWERS OF FOUR
-            "\u0C7A",   # TELUGU FRACTION DIGIT TWO FOR ODD POWERS OF FOUR
-            "\u0C7B",   # TELUGU FRACTION DIGIT THREE FOR ODD POWERS OF FOUR
-            "\u0C7C",   # TELUGU FRACTION DIGIT ONE FOR EVEN POWERS OF FOUR
-            "\u0C7D",   # TELUGU FRACTION DIGIT TWO FOR EVEN POWERS OF FOUR
-            "\u0C7E",   # TELUGU FRACTION DIGIT THREE FOR EVEN POWERS OF FOUR
-            "\u0D73",   # MALAYALAM FRACTION ONE QUARTER
-            "\u0D74",   # MALAYALAM FRACTION ONE HALF
-            "\u0D75",   # MALAYALAM FRACTION THREE QUARTERS
-            "\u2044",   # FRACTION SLASH Sm 0 CS     N
-            "\u2150",   # VULGAR FRACTION ONE SEVENTH
-            "\u2151",   # VULGAR FRACTION ONE NINTH
-            "\u2152",   # VULGAR FRACTION ONE TENTH
-            "\u2153",   # VULGAR FRACTION ONE THIRD
-            "\u2154",   # VULGAR FRACTION TWO THIRDS
-            "\u2155",   # VULGAR FRACTION ONE FIFTH
-            "\u2156",   # VULGAR FRACTION TWO FIFTHS
-            "\u2157",   # VULGAR FRACTION THREE FIFTHS
-            "\u2158",   # VULGAR FRACTION FOUR FIFTHS
-            "\u2159",   # VULGAR FRACTION ONE SIXTH
-            "\u215A",   # VULGAR FRACTION FIVE SIXTHS
-            "\u215B",   # VULGAR FRACTION ONE EIGHTH
-            "\u215C",   # VULGAR FRACTION THREE EIGHTHS
-            "\u215D",   # VULGAR FRACTION FIVE EIGHTHS
-            "\u215E",   # VULGAR FRACTION SEVEN EIGHTHS
-            "\u215F",   # FRACTION NUMERATOR ONE
-            "\u2189",   # VULGAR FRACTION ZERO THIRDS
-            "\u2CFD",   # COPTIC FRACTION ONE HALF
-            "\uA830",   # NORTH INDIC FRACTION ONE QUARTER
-            "\uA831",   # NORTH INDIC FRACTION ONE HALF
-            "\uA832",   # NORTH INDIC FRACTION THREE QUARTERS
-            "\uA833",   # NORTH INDIC FRACTION ONE SIXTEENTH
-            "\uA834",   # NORTH INDIC FRACTION ONE EIGHTH
-            "\uA835",   # NORTH INDIC FRACTION THREE SIXTEENTHS
-            "\u10E7B",   # RUMI FRACTION ONE HALF
-            "\u10E7C",   # RUMI FRACTION ONE QUARTER
-            "\u10E7D",   # RUMI FRACTION ONE THIRD
-            "\u10E7E",   # RUMI FRACTION TWO THIRDS
-        ])
-
-        self.regexes["T_FRACTION"]  = r"\b((\d+-)?\d+\/\d+|[%s])\b" % (fractionChars)
-
-        ###################################################### CURRENCY
-        currency = "".join([r"$",
-            "\u00A3",   # pound sign
-            "\u00A4",   # currency sign
-            #"\u09F4",   # to U+09F9: Bengali currency numerators/denominator
-            "\u0E3f",   # Thai bhat
-            "\u17DB",   # Khmer riel
-            "\u20A0",   # Euro sign ~~ U+20CF
-            "\uFFE1",   # fullwidth pound sign
-            "\uFE69",   # SMALL DOLLAR SIGN
-            "\uFF04",   # FULLWIDTH DOLLAR SIGN
-            #"\u1F4B2",  # HEAVY DOLLAR SIGN
-        ])
-        self.regexes["T_CURRENCY"]  = r"\b[%s]\d+(\.\d+)?[KMB]?\b" % (currency)
-
-        ###################################################### PERCENT, etc.
-        pct = "".join(["%",
-            "\u2030",   # Per Mille Sign
-            "\u2031",   # Per Ten Thousand Sign
-            "\u0609",   # Arabic-indic Per Mille Sign
-            "\u060a",   # Arabic-indic Per Ten Thousand Sign
-            "\u066a",   # Arabic-indic Percent Sign
-            "\uFE6A",   # Small Percent Sign
-            "\uFF05",   # Fullwidth Percent Sign
-        ])
-        self.regexes["T_PERCENT"]   = r"\b\d+(\.\d+)[%s]\b" % (pct)
-
-        uriChars = r"[-~?\\[\\]\\(\\)&@+\w.:\\/\\$\\#]"    # Chars ok in URIs
-        schemes  = "(shttp|http|https|ftp|mailto)"        # URI scheme prefixes
-        #tld      = "(com|org|edu|net|uk|ca)"              # top-level domains
-        self.regexes["T_EMOTICON"]  = r"[-:;]+[(){}<>]\b"
-        self.regexes["T_HASHTAG"]   = r"\b#\p{L}+\b"
-        self.regexes["T_EMAIL"]     = r"\b\w+@\w+(\.\w+)+\b"
-        self.regexes["T_USER"]      = r"\s@[.\w+]\b"
-        self.regexes["T_URI"]       = r"\b%s:\/\/%s+\w\b" % (schemes, uriChars)
+        self.regexes.update(makeNonWordRegexes())
 
         ###################################################### Hyphenation
         self.regexes["S_HYPHENATED"]= r"(\w)-(\w)"
@@ -1523,6 +1966,11 @@ class HeavyTokenizer:
         self.regexes["N_CHAR"]      = r"(\w)\1{%s,}" % (self.options["N_CHAR"])
         self.regexes["N_SPACE"]     = r"\s{%s,}" % (self.options["N_SPACE"])
 
+        # Compile them all once here, rather than on every use. Empty ones
+        # (not written yet) become None.
+        for name, pattern in self.regexes.items():
+            self.regexes[name] = re.compile(pattern) if pattern else None
+
 
     ###########################################################################
     # MAIN TOKENIZER
@@ -1552,6 +2000,67 @@ class HeavyTokenizer:
         self.tokens = tokens
         return(tokens)
 
+    # splitTokens()'s rules for tokenizeSpans(), to find tokens in place.
+    spanSeps       = re.compile(r"--+|([.\/*\\#=?!])(\s*\1){2,}")
+    spanLeading    = re.compile(r"[^\w\s#@]+(?=\w)")
+    spanTrailing   = re.compile(r"(?<=\w)[^\w\s.]+$")
+    spanHyphens    = re.compile(r"(?<=\w)-(?=\w)")
+
+    def tokenizeSpans(self, s):
+        """Like tokenize(), but generate (start, end, kind) for each token,
+        as offsets into `s` itself, instead of making a list of strings
+        (see `spanKinds`, and spanTexts() to get strings only when needed).
+        Tokens are split as splitTokens() does for the TOKENTYPE option,
+        in the text as normalize() leaves it: the NormPlan's table is applied
+        one char at a time, so chars it turns into spaces split tokens, and
+        deleted chars are left out of their tokens' spans (see spansBack()).
+        The expand and shorten steps are skipped (X_ options can turn escapes
+        into spaces, which is not done here). The T_ and F_ options don't
+        unify, space, or delete anything here: each token's kind is reported
+        instead, so callers can drop what they like.
+        tokenize() also returns empty tokens when `s` starts or ends with
+        whitespace (or trailing punct), from re.split(); those have no span.
+        """
+        table = self.getPlan().table
+        if (table is None): return self.findSpans(s)
+        s2, starts = translateWithOffsets(s, table)
+        return spansBack(s, self.findSpans(s2), starts)
+
+    def findSpans(self, s):
+        """Find the tokens in (already normalized) `s`, for tokenizeSpans().
+        """
+        bt = self.getOption("TOKENTYPE") or ""
+        if (bt == "chars"):
+            for i in range(len(s)): yield i, i+1, "CHAR"
+            return
+        if (bt == "none"):
+            if (s): yield 0, len(s), "TEXT"
+            return
+        if (bt != "words"):
+            die("Unknown TOKENTYPE '%s' (not words, chars, or none).\n" % (bt))
+
+        breakHyphens = (self.getDisp("S_HYPHENATED") != DT_KEEP)
+        for st, en, isSep in spanChunks(s, HeavyTokenizer.spanSeps):
+            if (isSep):
+                yield st, en, "PUNCT"
+                continue
+
+            # splitTokens() only splits off leading punct after whitespace.
+            mat = st > 0 and HeavyTokenizer.spanLeading.match(s, st, en)
+            if (mat):
+                yield st, mat.end(), "PUNCT"
+                st = mat.end()
+            mat = HeavyTokenizer.spanTrailing.search(s, st, en)
+            trail = mat.start() if (mat) else en
+
+            if (breakHyphens):
+                for mat in HeavyTokenizer.spanHyphens.finditer(s, st, trail):
+                    yield st, mat.start(), spanKind(s, st, mat.start())
+                    yield mat.start(), mat.end(), "PUNCT"
+                    st = mat.end()
+            if (st < trail): yield st, trail, spanKind(s, st, trail)
+            if (trail < en): yield trail, en, "PUNCT"
+
     def expand(self, s):
         """Decode various special-character representations for various
         file formats. These often get left around in NLP lexica....
@@ -1571,35 +2080,19 @@ class HeavyTokenizer:
         return s
 
     def normalize(self, s):
-        if (self.options["Ascii_Only"] ): # boolean
-            s = re.sub(r"[^[:ascii:]]", "", s)
-
-        else:
-            for ugcName in (unicodeCategories.keys()):
-                optValue = self.options[ugcName]
-                if (dispTypes[optValue] == DT_KEEP): continue
-                s = self.map(s, ugcName, unicodeCategories[ugcName])
-
-            s = self.map(s, "Accent",            "???")
-            s = self.map(s, "Control_0",         " ")
-            s = self.map(s, "Control_1",         " ")
-            # The digit normalization should be optional:
-            #s = self.map(s, "Digit",             "9")
-            #s = self.map(s, "Fullwidth"
-            #s = self.map(s, "Ligature"
-            #s = self.map(s, "Math"
-            s = self.map(s, "Nbsp",              " ")
-            s = self.map(s, "Soft_Hyphen",       "")
-        return s
+        """Apply Ascii_Only, or else the options for Unicode categories and
+        other char classes. This is a single str.translate() via getPlan().
+        """
+        return self.getPlan().normalize(s)
 
     def shorten(self, s):
         """Nuke tokens where char is heavily repeated, like argggggggg.
         """
         if (self.options["N_CHAR"] > 1):
-            s = re.sub(self.regexes["N_CHAR"],"11",s)
+            s = self.regexes["N_CHAR"].sub("11", s)
 
         if (self.options["N_SPACE"] > 1):
-            s = re.sub(self.regexes["N_SPACE"], " ", s)
+            s = self.regexes["N_SPACE"].sub(" ", s)
         return s
 
 
@@ -1609,19 +2102,10 @@ class HeavyTokenizer:
         """Special handling for special kinds of tokens.
         Don't need to tokenize these, they're normally already surrounded by
         spaces or other breaking punctuation. But, can unify/space/delete them.
+        The options and their "unify" values are in `tokenOptions`, and
+        they're all done in one regex pass via getPlan().
         """
-        s = self.map(s, "T_TIME",      r"09:09")
-        s = self.map(s, "T_DATE",      r"2009-09-09")
-        s = self.map(s, "T_FRACTION",  r"9/9")
-        #s = self.map(s, "T_NUMBER",    r"9999")
-        #s = self.map(s, "T_CURRENCY",  r"#99")
-        s = self.map(s, "T_PERCENT",   r"99%")
-        s = self.map(s, "T_EMOTICON",  r":)")
-        s = self.map(s, "T_HASHTAG",   r"#nine")
-        s = self.map(s, "T_EMAIL",     r"u\@nine.com")
-        s = self.map(s, "T_USER",      r"\@nine")
-        s = self.map(s, "T_URI",       r"http://www.nine.com")
-        return s
+        return self.getPlan().nonWordTokens(s)
 
     def splitTokens(self, s):
         # A few specials
@@ -1678,43 +2162,39 @@ class HeavyTokenizer:
         as their value). Apply a regex change (that was already compiled!),
         to do the right thing to matching data.
         """
-        optValue = self.options[optName]
-        if (optValue is None):
-            die("No option value found for '%s'." % (optName))
-            optValue = self.options[optName] = "keep"
+        dt = self.getDisp(optName)
+        if (dt == DT_KEEP):                         # keep
+            return s
 
         cregex = self.regexes[optName]
         if (not cregex):
             die("No compiled regex available for '%s'" % (optName))
-            return
+            return s
 
         #warn "Firing %s\t'%s': \t/%s/ on\n    %s\n" %
         # (optName, optValue, regex, s))
-        dl = dispTypes[optValue]
-
         try:
-            if (dl[0] == DT_KEEP):                  # keep
-                return
-            if (dl[0] == DT_UNIFY):                 # unify
-                s = re.sub(cregex, norm, s)
-            elif (dl[0] == DT_DELETE):              # delete
-                s = re.sub(cregex, "", s)
-            elif (dl[0] == DT_SPACE):               # space
-                s = re.sub(cregex, " ", s)
-            elif (dl[0] == DT_STRIP):               # strip
-                s = re.sub(r"(%s)" % (cregex), strip_diacritics, s)
-            elif (dl[0] == DT_VALUE):               # value
-                s = re.sub(r"(%s)" % (cregex), get_value, s)
-            elif (dl[0] == DT_UPPER):               # upper
+            if (dt == DT_UNIFY):                    # unify
+                s = cregex.sub(norm, s)
+            elif (dt == DT_DELETE):                 # delete
+                s = cregex.sub("", s)
+            elif (dt == DT_SPACE):                  # space
+                s = cregex.sub(" ", s)
+            elif (dt == DT_STRIP):                  # strip
+                s = cregex.sub(strip_diacritics, s)
+            elif (dt == DT_VALUE):                  # value
+                s = cregex.sub(get_value, s)
+            elif (dt == DT_UPPER):                  # upper
                 s = s.upper()
                 # OR: s = re.sub(r"(%s)" % (cregex), "\U\\1\E", s)
-            elif (dl[0] == DT_LOWER):               # lower
+            elif (dt == DT_LOWER):                  # lower
                 s = s.lower()
                 # OR: s = re.sub(r"(%s)" % (cregex), "\L\\1\E", s)
-            elif (dl[0] == DT_DECOMPOSE):           # decompose
+            elif (dt == DT_DECOMPOSE):              # decompose
                 s = unicodedata.normalize("NFKD", s)
             else:
-                die("map: bad (disp) value '%d' (=%s)\n" % (optValue, dl))
+                die("map: bad (disp) value '%s' (=%s)\n" % (
+                    self.options[optName], dt))
         except TypeError as e:
             print("TypeError (cregex is %s):\n    %s" % (cregex, e))
 
@@ -1754,6 +2234,134 @@ class HeavyTokenizer:
         return(tokens)
 
 
+###############################################################################
+# Batch tokenizing, in a pool of worker processes.
+#
+batchTokenizer = None  # Each worker process's own tokenizer
+
+def makeTokenizer(tokenizerClass, tokenizerArgs:dict=None, options:dict=None):
+    """Construct a tokenizer and set its options. Tokenizers that don't
+    have setOption() just get them put in their `options` dict.
+    """
+    tok = tokenizerClass(**(tokenizerArgs or {}))
+    for name, value in (options or {}).items():
+        if (hasattr(tok, "setOption")): tok.setOption(name, value)
+        else: tok.options[name] = value
+    return tok
+
+def initBatchWorker(tokenizerClass, tokenizerArgs:dict, options:dict):
+    """Worker initializer for BatchTokenizer. This sets up the worker's
+    tokenizer just once, so its regexes (and for HeavyTokenizer, its
+    NormPlan) are only compiled once per process.
+    """
+    global batchTokenizer
+    batchTokenizer = makeTokenizer(tokenizerClass, tokenizerArgs, options)
+
+def tokenizeChunk(texts:list, spans:bool=False) -> list:
+    """Worker for BatchTokenizer: tokenize a list of texts (into lists of
+    spans, if `spans` is set; see tokenizeSpans()).
+    This is at module level so ProcessPoolExecutor can pickle it.
+    """
+    if (spans):
+        return [ list(batchTokenizer.tokenizeSpans(txt)) for txt in texts ]
+    return [ batchTokenizer.tokenize(txt) for txt in texts ]
+
+
+class BatchTokenizer:
+    """Tokenize lots of texts, spread over `workers` processes that each
+    have their own tokenizer, made by makeTokenizer() from `tokenizerClass`,
+    `tokenizerArgs` (keyword args for its constructor), and `options`.
+
+    Texts are sent to workers in chunks of `chunkSize`, and the token lists
+    come back in input order. At most `maxPending` chunks (default: twice
+    the number of workers) are in flight or waiting to be yielded, and the
+    input is only read as far as that, so memory stays bounded no matter
+    how long the input is. (ProcessPoolExecutor.map() would read it all
+    up front.)
+
+    With `workers` of 0 or 1, it all just runs in this process.
+    `workers` of None means os.cpu_count().
+    With `spans` set, each text's result is a list of (start, end, kind)
+    from tokenizeSpans() instead of a list of token strings.
+    """
+    def __init__(self, tokenizerClass=None, tokenizerArgs:dict=None,
+        options:dict=None, workers:int=None, chunkSize:int=1000,
+        maxPending:int=None, spans:bool=False):
+        self.tokenizerClass = tokenizerClass or SimpleTokenizer
+        self.tokenizerArgs  = tokenizerArgs or {}
+        self.options        = options or {}
+        self.workers        = os.cpu_count() if workers is None else workers
+        self.chunkSize      = max(chunkSize, 1)
+        self.maxPending     = maxPending or 2 * max(self.workers, 1)
+        self.spans          = spans
+
+    def tokenizeAll(self, texts):
+        """Generate the list of tokens for each of `texts` (any iterable).
+        """
+        for _txt, tokens in self.run(texts):
+            yield tokens
+
+    def tokenizeFiles(self, paths, encoding:str="utf-8"):
+        """Tokenize each line of each of the files in `paths`, and generate
+        (path, lineNumber, line, tokens) for each, in order.
+        """
+        for (path, lineNum, rec), tokens in self.run(
+            self.fileRecords(paths, encoding), textOf=lambda item: item[2]):
+            yield path, lineNum, rec, tokens
+
+    def fileRecords(self, paths, encoding:str):
+        for path in paths:
+            with codecs.open(path, "rb", encoding=encoding) as fh:
+                for lineNum, rec in enumerate(fh, start=1):
+                    yield path, lineNum, rec
+
+    def run(self, items, textOf=None):
+        """Generate (item, tokens) for each of `items`, in order. `textOf`
+        can be given to get the text to tokenize out of each item.
+        """
+        if (self.workers <= 1):
+            tok = makeTokenizer(
+                self.tokenizerClass, self.tokenizerArgs, self.options)
+            for item in items:
+                txt = textOf(item) if textOf else item
+                if (self.spans): yield item, list(tok.tokenizeSpans(txt))
+                else: yield item, tok.tokenize(txt)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=initBatchWorker,
+            initargs=(self.tokenizerClass, self.tokenizerArgs, self.options)
+            ) as pool:
+            pending = deque()
+            try:
+                for chunk in self.chunks(items):
+                    texts = [ textOf(x) for x in chunk ] if textOf else chunk
+                    pending.append((chunk,
+                        pool.submit(tokenizeChunk, texts, self.spans)))
+                    if (len(pending) >= self.maxPending):
+                        yield from self.takeChunk(pending.popleft())
+                while (pending):
+                    yield from self.takeChunk(pending.popleft())
+            finally:
+                # If the caller stopped early, don't finish the rest.
+                for _chunk, future in pending: future.cancel()
+
+    def chunks(self, items):
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if (len(chunk) >= self.chunkSize):
+                yield chunk
+                chunk = []
+        if (chunk): yield chunk
+
+    def takeChunk(self, entry):
+        """Wait for one chunk's results, and yield them with their items.
+        """
+        chunk, future = entry
+        yield from zip(chunk, future.result())
+
+
 ###############################################################################
 # Main
 #
@@ -1761,11 +2369,15 @@ if __name__ == "__main__":
     def doOneFile(path0, fhandle, tok0):
         if (not args.quiet): print("Starting %s" % (path0))
         for rec in (fhandle.readlines()):
-            tokens = tok0.tokenize(rec)
             print(rec)
-            print(" | ".join(tokens))
+            if (args.spans): showSpans(rec, tok0.tokenizeSpans(rec))
+            else: print(" | ".join(tok0.tokenize(rec)))
         return
 
+    def showSpans(rec, spans):
+        print(" | ".join([ "%d:%d:%s '%s'" % (st, en, kind, rec[st:en])
+            for st, en, kind in spans ]))
+
     def doSmokeTest(tok0):
         print("Using smoke-test data... (mostly just ASCII, though!)")
         testData = """
@@ -1788,9 +2400,9 @@ seen substance(s) 8-hydroxydeoxyguanosine and 2,3,4-dihydrogen-monoxide.
 Visit Lake Chargoggagoggmanchauggagoggchaubunagungamaugg.
 """
         for rec in (testData.split()):
-            tokens = tok0.tokenize(rec)
             print("\n======= %s" % (rec))
-            print(" | ".join(tokens))
+            if (args.spans): showSpans(rec, tok0.tokenizeSpans(rec))
+            else: print(" | ".join(tok0.tokenize(rec)))
 
         return
 
@@ -1806,6 +2418,9 @@ Visit Lake Chargoggagoggmanchauggagoggchaubunagungamaugg.
         except ImportError:
             parser = argparse.ArgumentParser(description=descr)
 
+        parser.add_argument(
+            "--chunkSize", type=int, metavar="N", default=1000,
+            help="With --workers, send lines to workers N at a time.")
         parser.add_argument(
             "--heavy", action="store_true",
             help="Use HeavyTokenizer instead of SimpleTokenizer.")
@@ -1821,6 +2436,9 @@ Visit Lake Chargoggagoggmanchauggagoggchaubunagungamaugg.
         parser.add_argument(
             "--quiet", "-q", action="store_true",
             help="Suppress most messages.")
+        parser.add_argument(
+            "--spans", action="store_true",
+            help="Show tokens as start:end:kind (see tokenizeSpans()).")
         parser.add_argument(
             "--unicode", action="store_const", dest="iencoding",
             const="utf8", help="Assume utf-8 for input files.")
@@ -1830,6 +2448,9 @@ Visit Lake Chargoggagoggmanchauggagoggchaubunagungamaugg.
         parser.add_argument(
             "--version", action="version", version=__version__,
             help="Display version information, then exit.")
+        parser.add_argument(
+            "--workers", type=int, metavar="N", default=0,
+            help="Tokenize files in N worker processes (see BatchTokenizer).")
 
         parser.add_argument(
             "files", type=str,
@@ -1847,17 +2468,28 @@ Visit Lake Chargoggagoggmanchauggagoggchaubunagungamaugg.
 
     if (args.heavy):
         print("Running HeavyTokenizer")
-        tok = HeavyTokenizer()
-        if (args.verbose): tok.setOption("TVERBOSE", 1)
+        tokClass, tokArgs = HeavyTokenizer, {}
+        tokOptions = { "TVERBOSE": 1 } if (args.verbose) else {}
     elif (args.nltk):
         print("Running NLTKTokenizerPlus")
-        tok = NLTKTokenizerPlus()
+        tokClass, tokArgs, tokOptions = NLTKTokenizerPlus, {}, {}
     else:
         print("Running SimpleTokenizer")
-        tok = SimpleTokenizer(verbose=args.verbose)
+        tokClass, tokArgs = SimpleTokenizer, { "verbose": args.verbose }
+        tokOptions = {}
+    tok = makeTokenizer(tokClass, tokArgs, tokOptions)
 
     if (len(args.files) == 0 or args.files[0] == "*"):
         doSmokeTest(tok)
+    elif (args.workers > 1):
+        batcher = BatchTokenizer(tokClass, tokArgs, tokOptions,
+            workers=args.workers, chunkSize=args.chunkSize, spans=args.spans)
+        for path, lineNum, rec, tokens in batcher.tokenizeFiles(
+            args.files, encoding=args.iencoding):
+            if (lineNum == 1 and not args.quiet): print("Starting %s" % (path))
+            print(rec)
+            if (args.spans): showSpans(rec, tokens)
+            else: print(" | ".join(tokens))
     else:
         for path in args.files:
             fh0 = codecs.open(path, "rb", encoding=args.iencoding)
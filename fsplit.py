@@ -6,17 +6,23 @@
 #pylint: disable=W0603,W0511
 #
 import sys
+import os
+import io
 import argparse
 import codecs
 import re
-from collections import namedtuple
+from collections import namedtuple, deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Any, Union, IO, List, Callable, Final
 from enum import Enum
+from types import MappingProxyType
 import ast
+import itertools
 import html
 import datetime
 import uuid
 import array
+import math
 import unicodedata
 
 import logging
@@ -25,6 +31,10 @@ from Datatypes import Datatypes
 lg = logging.getLogger()
 dt = Datatypes()
 
+# Replaced by processOptions() when run from the command line. This default
+# lets the few functions that still consult 'args' work when imported.
+args = argparse.Namespace(verbose=0, ifields=None, visible=False)
+
 __metadata__ = {
     "title"        : "fsplit",
     "description"  : "A better (I hope) str.split() or csv package.",
@@ -33,7 +43,7 @@ __metadata__ = {
     "type"         : "http://purl.org/dc/dcmitype/Software",
     "language"     : "Python 3.7",
     "created"      : "2020-02-28",
-    "modified"     : "2023-11-19",
+    "modified"     : "2026-10-16",
     "publisher"    : "http://github.com/sderose",
     "license"      : "https://creativecommons.org/licenses/by-sa/3.0/"
 }
@@ -264,6 +274,13 @@ pass it to `fsplit()` along with each record in turn:
         myFields = fsplit(rec, dialect=myDialectX)
         print("Record %d:\\n    " + join("\\n    ", myFields))
 
+`fsplit()` turns the options into a `CompiledDialectX` (an immutable, hashable
+form holding the quote map, delimiters, and precompiled regexes), and memoizes
+those by option signature; `myDialectX` also keeps its own, until you set one
+of its options. Or do that once yourself with `myDialectX.freeze()` and pass
+the result instead. A `CompiledDialectX` can't be changed, but `thaw()`
+returns a new `DialectX` with its options.
+
 ==Default CSV dialect==
 
 The default dialect is the same as for Python `csv`. The shared properties are:
@@ -282,6 +299,7 @@ The extended properties are:
     delimitercycle:bool = False
     delimiterrepeat:bool = False
     encoding:str = "utf-8"
+    engine:str = "compiled"
     entities:bool = False
     header:bool = False
     maxsplit:int = None
@@ -444,6 +462,12 @@ used in combination with a list of delimiters (see 'delimitercycle').
 
 * ''encoding'' = "utf-8" -- what encoding to use. This affects escaping.
 
+* ''engine'':str = "compiled" -- which parser `fsplit()` uses. "compiled"
+builds one regex per dialect (see `CompiledSplitter`) that jumps from one
+special character to the next and slices out the text in between, which is
+much faster on long records. "loop" is the original character-at-a-time parser.
+Both produce the same tokens; regex and cycling delimiters always use "loop".
+
 * ''entities'':bool = False -- If set, character references are recognized
 and replaced as in HTML. Decimal (&#8226;), hexadecimal (&#x2022;), and the
 ubiquitous named forms (&bull; etc.) are all supported.
@@ -810,6 +834,27 @@ Ditch 'typelist'. Add DictWriterXSV, SAXReader.
 Rename `multidelimiter` to `delimiterrepeat`, 'cycle' to 'delimitercycle'.
 Add support for regex delimiters. Factor out class `Escaping`.
 
+* 2026-10-16: Add `CompiledSplitter` and the `engine` option. Factor the
+character loop out of `fsplit()` into `splitByChars()`. Register `__RFC4180__`
+in `predefinedDialects`, and don't die on `minsplit=None`.
+Make `reader` stream the input in fixed-size buffers (`readPhysicalLines()`)
+and carry quote state from line to line (`QuoteTracker`), instead of
+`readlines()` and re-counting quotes on the growing record.
+Add parallel parsing for `reader` and `DictReader` (`workers`), over byte
+ranges cut at LFs (a range found to start inside quotes is parsed again),
+in file order. Let `reader` take a path.
+Add `reader.batches()` and `DictReader.batches()` for column-oriented
+output, cast a column at a time (`FieldSchema.handleBatch()`,
+`DatatypeHandler.castColumn()`).
+Give `DictWriter` and `DictWriterXSV` per-column formatters and a buffered
+`writerows()`. Make `DictWriter` work with a `DialectX` or default dialect,
+and escape quotes in string values.
+Add `ColumnTyper` for per-column `autotype` in `reader`. Fix
+`datetimeCaster()`, and `guessType()` with no `reserved` dict.
+Add `CompiledDialectX` and `DialectX.freeze()`, so `fsplit()` no longer
+re-applies and re-checks options on every call (nor changes the dialect
+passed to it when given option arguments).
+
 
 =Rights=
 
@@ -1074,6 +1119,7 @@ class DialectX:
         "comment":          str,
         "delimitercycle":   bool,
         "encoding":         str,
+        "engine":           str,
         "entities":         bool,
         "header":           bool,
         "delimiterrepeat":  bool,  # Cf *nix *paste -d*
@@ -1093,7 +1139,9 @@ class DialectX:
         self.setDefaultOptions()
         if (dialect):
             for oname in self.__OptionTypes__.keys():
-                setattr(self, oname, getattr(dialect, oname))
+                v = getattr(dialect, oname)
+                if (isinstance(v, tuple)): v = list(v)  # From CompiledDialectX
+                setattr(self, oname, v)
 
         #lg.info("Default options:\n" + self.tostring())
         if (argNS): self.applyargs(argNS, prefix="")
@@ -1118,6 +1166,7 @@ class DialectX:
         self.delimitercycle    = False  # bool
         self.delimiterrepeat   = False  # bool
         self.encoding          = "utf-8"# str
+        self.engine            = "compiled"  # str
         self.entities          = False  # bool
         self.header            = False  # bool
         self.maxsplit          = 0      # int
@@ -1131,6 +1180,43 @@ class DialectX:
 
         self.checkDialect()
 
+    # "loop" is the original character-by-character parser; "compiled" uses
+    # CompiledSplitter where the dialect allows, and otherwise falls back.
+    engines = [ "compiled", "loop" ]
+
+    def signature(self, overrides:Dict=None) -> tuple:
+        """Return a hashable tuple of all the option values (with any
+        'overrides' applied), for looking up a CompiledDialectX.
+        """
+        sig = []
+        for k in DialectX.__OptionTypes__:
+            v = overrides[k] if (overrides and k in overrides) else getattr(self, k)
+            if (isinstance(v, list)): v = tuple(v)
+            sig.append(v)
+        if (overrides):
+            for k in overrides:
+                if (k not in DialectX.__OptionTypes__): sig.append((k, overrides[k]))
+        return tuple(sig)
+
+    def freeze(self, **kwargs) -> 'CompiledDialectX':
+        """Return the immutable compiled form of this dialect, with any
+        option 'kwargs' applied (this dialect itself is not changed).
+        Compiled forms are memoized by option signature. Without 'kwargs',
+        this dialect also keeps its own until an option is set, so passing
+        it to fsplit() for each record doesn't recompute the signature.
+        (Changing a list option in place doesn't count as setting it.)
+        """
+        if (kwargs): return CompiledDialectX.get(self, kwargs)
+        cdx = getattr(self, "_compiled", None)
+        if (cdx is None):
+            cdx = CompiledDialectX.get(self)
+            object.__setattr__(self, "_compiled", cdx)
+        return cdx
+
+    def __setattr__(self, name:str, value:Any) -> None:
+        object.__setattr__(self, "_compiled", None)  # See freeze()
+        object.__setattr__(self, name, value)
+
     def applykwOptions(self, kwargs):
         for k, v in kwargs.items():
             if (k not in self.__OptionTypes__):
@@ -1181,6 +1267,9 @@ class DialectX:
                 (self.maxsplit or 0, self.minsplit or 0))
         if (self.doublequote and self.escapechar):
             errs.append("Cannot combine doublequote and escapechar.")  # TODO ???
+        if (self.engine not in DialectX.engines):
+            errs.append("Unknown engine '%s' (choose from %s)."
+                % (self.engine, ", ".join(DialectX.engines)))
 
         if (errs):
             if (strict):
@@ -1240,6 +1329,9 @@ class DialectX:
         parser.add_argument(
             pre+"delimiterrepeat", action="store_true",
             help="Treat multiple adjacent delimiters (e.g. space), as just one.")
+        parser.add_argument(
+            pre+"engine", type=str, default="compiled", choices=DialectX.engines,
+            help="Parsing engine: 'compiled' (faster) or 'loop' (the original).")
         parser.add_argument(
             pre+"entities", action="store_true",
             help="Recognize and expand HTML/XML entity references?")
@@ -1275,7 +1367,7 @@ class DialectX:
             if (k == "quoting" and not isinstance(theArgs.__dict__[k], QUOTING)):
                 theArgs.__dict__[k] = QUOTING.fromstring(theArgs.__dict__[k])
             if (k in theArgs.__dict__ and theArgs.__dict__[k] is not None):
-                self.__dict__[k] = theArgs.__dict__[prefix+k]
+                setattr(self, k, theArgs.__dict__[prefix+k])
 
     @staticmethod
     def makeVis(mat) -> str:
@@ -1303,8 +1395,11 @@ class DialectX:
         escaping cycling delimiters only when in effect (that seems to only be
         relevant for *nix `paste`, which doesn't handle escaping and quoting).
         """
+        delims = self.delimiter or ""
+        if (isinstance(delims, (list, tuple))): delims = "".join(delims)
+        elif (isinstance(delims, re.Pattern)): delims = ""
         return (
-            (self.delimiter or "") +
+            delims +
             (self.escapechar or "") +
             (self.lineterminator or "") +
             (self.quotechar or "") +
@@ -1363,6 +1458,96 @@ class DialectX:
         # encoding?
 
 
+###############################################################################
+#
+class CompiledDialectX:
+    """An immutable, hashable snapshot of a DialectX, plus everything fsplit()
+    derives from its options: the quote map, the delimiter cycle, the
+    problem characters and their regex, and the CompiledSplitter (if the
+    'engine' option and the delimiter allow one).
+    The options are available as attributes just like on DialectX, so this
+    can be passed anywhere a DialectX is only read.
+
+    Get one via DialectX.freeze() (or fsplit(), which does that for you);
+    they are memoized by name and option signature in CompiledDialectX.cache,
+    which drops the least recently used once it holds 'cacheMax'.
+    """
+    cache = OrderedDict()
+    cacheMax = 256
+
+    def __init__(self, dx:DialectX):
+        sv = object.__setattr__
+        sv(self, "dialectName", dx.dialectName)
+        for k in DialectX.__OptionTypes__:
+            v = getattr(dx, k)
+            if (isinstance(v, list)): v = tuple(v)
+            sv(self, k, v)
+        sv(self, "signature", dx.signature())
+        sv(self, "quoteMap", MappingProxyType(dict(setupQuoteMap(dx.quotechar))))
+        if (isinstance(self.delimiter, tuple)): delims = self.delimiter
+        else: delims = (self.delimiter,)
+        sv(self, "delimiters", delims)
+        sv(self, "problemChars", dx.getProblemChars())
+        sv(self, "problemExpr",
+            re.compile("([%s])" % (re.escape(self.problemChars)), flags=re.U)
+            if (self.problemChars) else None)
+        splitter = None
+        if (self.engine == "compiled" and CompiledSplitter.canCompile(self)):
+            splitter = CompiledSplitter(self)
+        sv(self, "splitter", splitter)
+
+    @staticmethod
+    def get(dx:DialectX, kwargs:Dict=None) -> 'CompiledDialectX':
+        """Find or make the compiled form of 'dx' with 'kwargs' applied.
+        'dx' may be None for the default dialect.
+        Option checking is done (once) when a new form is made.
+        """
+        if (dx is None): dx = defaultDialect
+        elif (isinstance(dx, CompiledDialectX)): dx = dx.thaw()
+        cache = CompiledDialectX.cache
+        key = (dx.dialectName,) + dx.signature(kwargs)
+        try:
+            cache.move_to_end(key)
+            return cache[key]
+        except KeyError:
+            pass
+        if (kwargs):
+            dx = DialectX(dx.dialectName, dialect=dx)
+            dx.applykwOptions(kwargs)
+        dx.checkOptions()
+        cdx = CompiledDialectX(dx)
+        if (len(cache) >= CompiledDialectX.cacheMax):
+            cache.popitem(last=False)
+        cache[key] = cdx
+        return cdx
+
+    def freeze(self, **kwargs) -> 'CompiledDialectX':
+        if (not kwargs): return self
+        return CompiledDialectX.get(self.thaw(), kwargs)
+
+    def thaw(self) -> DialectX:
+        """Return a new, mutable DialectX with the same options.
+        """
+        return DialectX(self.dialectName, dialect=self)
+
+    def __reduce__(self):
+        # Compiled regexes and MappingProxyType don't pickle, so rebuild.
+        return (DialectX.freeze, (self.thaw(),))
+
+    def __setattr__(self, name:str, value:Any) -> None:
+        raise AttributeError("CompiledDialectX is immutable (use DialectX).")
+
+    def __eq__(self, other:Any) -> bool:
+        return (isinstance(other, CompiledDialectX) and
+            self.signature == other.signature)
+
+    def __hash__(self) -> int:
+        return hash(self.signature)
+
+    def __repr__(self) -> str:
+        return "CompiledDialectX(%s)" % (self.dialectName)
+
+
 ###############################################################################
 #
 predefinedDialects = {}
@@ -1391,6 +1576,9 @@ __RFC4180__ = DialectX(
     xescapes             = False,   # Interpret \xFF
     uescapes             = False,   # Interpret \uFFFF
 )
+predefinedDialects["__RFC4180__"] = __RFC4180__
+
+defaultDialect = DialectX("default")
 
 class ISO8601:
     """
@@ -1453,6 +1641,8 @@ class DictReader:
         restval: Any=None,       # default any missing fields to this value
         dialect: DialectX=None,
         schema: 'FieldSchema'=None,
+        workers: int=0,          # >1 to parse in that many processes
+        chunkBytes: int=1<<23,   # Size of byte ranges for workers
         # *args,  # ???
         **kwargs
         ):
@@ -1465,15 +1655,19 @@ class DictReader:
         if (schema): self.schema = schema
         elif (fieldNames): self.schema = FieldSchema(fieldNames)
         else: self.schema = None      # Set up during first read
+        self.workers = workers
+        self.chunkBytes = chunkBytes
 
     def __iter__(self) -> List:
         """Read records into a dict of fields by name.
         Quoted fields that span lines are still experimental.
         """
-        rdr = reader(self.f, dialect=self.dialect, schema=self.schema)
+        rdr = reader(self.f, dialect=self.dialect, schema=self.schema,
+            workers=self.workers, chunkBytes=self.chunkBytes)
         for fields in rdr:
+            if (not self.fieldNames): self.fieldNames = rdr.fieldNames
             fieldDict = {}
-            for fNum, fd in fields:
+            for fNum, fd in enumerate(fields):
                 if (fNum < len(self.fieldNames)):
                     fieldDict[self.fieldNames[fNum]] = fd
                 elif (self.restkey):
@@ -1488,6 +1682,23 @@ class DictReader:
             yield fieldDict
         return None  # EOF
 
+    def batches(self, batchSize:int=1000) -> Dict:
+        """Generate up to 'batchSize' records at a time, as a dict from
+        field name to a column of values (see reader.batches()).
+        Unlike iteration, extra fields are not gathered under 'restkey'; they
+        get names like "Field_09".
+        """
+        rdr = reader(self.f, dialect=self.dialect, schema=self.schema,
+            workers=self.workers, chunkBytes=self.chunkBytes)
+        restval = "" if (self.restval is None) else self.restval
+        for columns in rdr.batches(batchSize, restval=restval):
+            if (not self.fieldNames): self.fieldNames = rdr.fieldNames
+            names = list(self.fieldNames)
+            while (len(names) < len(columns)):
+                names.append("Field_%02d" % (len(names)+1))
+            yield dict(zip(names, columns))
+        return None  # EOF
+
     # What's a legit field name to use?
     dftNameExpr:Final = r"^\w([-.$\w ]*)$"
 
@@ -1646,55 +1857,198 @@ def cleanField(s:str, dialect:DialectX) -> str:
 
 ###############################################################################
 #
+class QuoteTracker:
+    """Keep track of whether a logical record is still inside a quoted field,
+    one physical line at a time. This replaces re-counting quotes on the
+    growing record (see unclosedQuote()), so each character is examined once.
+    It honors the dialect's quote pairs, escapechar, and doublequote.
+    """
+    def __init__(self, dx:DialectX):
+        self.escapechar = dx.escapechar or None
+        self.doublequote = dx.doublequote
+        self.quoteMap = setupQuoteMap(dx.quotechar)
+        self.pendingQuote = None
+
+        esc = re.escape(self.escapechar or "")
+        self.outsideExpr = None
+        if (self.quoteMap):
+            self.outsideExpr = re.compile("[%s%s]" % (
+                esc, "".join(re.escape(q) for q in self.quoteMap.keys())))
+        self.insideExprs = {}
+        for closer in set(self.quoteMap.values()):
+            self.insideExprs[closer] = re.compile("[%s%s]" % (esc, re.escape(closer)))
+
+    def reset(self) -> None:
+        self.pendingQuote = None
+
+    def feed(self, line:str) -> bool:
+        """Scan one more physical line of the current logical record.
+        Return True if the record is still inside quotes afterward.
+        """
+        if (self.outsideExpr is None): return False
+        lLen = len(line)
+        pos = 0
+        while (pos < lLen):
+            if (self.pendingQuote):
+                mat = self.insideExprs[self.pendingQuote].search(line, pos)
+                if (not mat): break
+                i = mat.start()
+                if (line[i] == self.escapechar):
+                    pos = i + 2
+                elif (self.doublequote and line.startswith(self.pendingQuote, i+1)):
+                    pos = i + 2
+                else:
+                    self.pendingQuote = None
+                    pos = i + 1
+            else:
+                mat = self.outsideExpr.search(line, pos)
+                if (not mat): break
+                i = mat.start()
+                if (line[i] == self.escapechar):
+                    pos = i + 2
+                else:
+                    self.pendingQuote = self.quoteMap[line[i]]
+                    pos = i + 1
+        return self.pendingQuote is not None
+
+
+def readPhysicalLines(f:IO, bufferSize:int=1<<16):
+    """Generate the lines of a file (each with its terminator, if any),
+    reading fixed-size buffers rather than the whole file. Lines are split
+    only at LF, so CRLF stays together; a lone CR is not a line break.
+    Memory use is bounded by the buffer size plus the longest line.
+    """
+    pending = []  # Pieces of a line that spans buffers
+    while (True):
+        buf = f.read(bufferSize)
+        if (not buf): break
+        start = 0
+        while (True):
+            nl = buf.find("\n", start)
+            if (nl < 0): break
+            if (pending):
+                pending.append(buf[start:nl+1])
+                yield "".join(pending)
+                pending = []
+            else:
+                yield buf[start:nl+1]
+            start = nl + 1
+        if (start < len(buf)): pending.append(buf[start:])
+    if (pending):
+        yield "".join(pending)
+
+
 class reader:
     """A generator object that can read logical CSV records even with quoted
     newlines, and returns a lost of each record's parsed raw fields.
     Keeps track of physical and logical record numbers.
+
+    Input is read in buffers of 'bufferSize' characters, so the first record
+    is available right away and memory use is bounded by the largest logical
+    record, not the file size.
     """
     def __init__(
         self, csvfile:IO,
         dialect:DialectX=None,
         schema:'FieldSchema'=None,
+        bufferSize:int=1<<16,
+        workers:int=0,
+        chunkBytes:int=1<<23,
+        maxPending:int=None,
         **formatParams
         ):
         """Construct and return an fsplit-based generator object.
+        'csvfile' can be an open file, or a path (opened when iterating, with
+        the dialect's encoding).
+        If 'workers' is more than 1 and 'csvfile' is a path or a file opened
+        from one, records are parsed in that many processes (see iterParallel()).
         """
         self.csvfile = csvfile
         if (dialect): self.dialect = dialect
         else: self.dialect = DialectX(**formatParams)
         self.schema = schema
+        self.bufferSize = bufferSize
+        self.workers = workers
+        self.chunkBytes = chunkBytes
+        self.maxPending = maxPending or 2 * workers
 
         self.fieldNames = None
+        self.typers = None            # For autotype with 'workers'
+        self.carry = ""               # With 'workers', a record left unclosed
 
         self.line_num   = 0           # physical
         self.rec_num    = 0           # logical
         self.lrec       = ""          # last raw logical record
 
+    def logicalRecords(self, f:IO=None):
+        """Generate the raw logical records (possibly >1 physical record each),
+        and how many physical records went into each, from 'f' (by default,
+        'self.csvfile', which must then be an open file).
+        Quote state is carried from line to line by a QuoteTracker, so a long
+        multi-line record is scanned only once, and joined only once.
+        Comment lines are only recognized at the start of a logical record.
+        """
+        dx = self.dialect
+        tracker = QuoteTracker(dx) if (dx.quotednewline) else None
+        pieces = []
+        for rec in readPhysicalLines(f or self.csvfile, self.bufferSize):
+            self.line_num += 1
+            if (not pieces and dx.comment and rec.startswith(dx.comment)):
+                continue
+            pieces.append(rec)
+            if (tracker and tracker.feed(rec)):
+                continue  ### Go around for continuation line
+            yield "".join(pieces), len(pieces)
+            pieces = []
+            if (tracker): tracker.reset()
+        if (pieces):
+            yield "".join(pieces), len(pieces)
+
     def __iter__(self):
         """Read a logical record (possibly >1 physical record), and parse it
         into raw fields.
         Python's CSV doesn't treat this as a class (unlike DictReader), so we
         do the same. The main thing beyond readline() is that it handles quoted
-        newlines (but it does so only by counting quotes, so doesn't play well
-        with escaped quotes).
+        newlines (with 'quotednewline' set).
         """
-        self.lrec = ""
-        nPhysical = 0
-        for rec in self.csvfile.readlines():
-            nPhysical += 1
-
-            # TODO Are comments allowed as physical lines inside logical recs?
-            if (self.dialect.comment and
-                rec.startswith(self.dialect.comment)): continue
+        if (isinstance(self.csvfile, str)):
+            path, ifh = self.csvfile, None
+        else:
+            path, ifh = getattr(self.csvfile, "name", None), self.csvfile
+        if (self.workers > 1):
+            if (isinstance(path, str) and os.path.isfile(path)):
+                yield from self.iterParallel(path)
+                return None
+            lg.warning("Parallel reading needs a file path, so reading serially.")
+
+        if (ifh is None):
+            with open(path, "r", encoding=self.dialect.encoding, newline="") as ifh:
+                yield from self.iterSerial(ifh)
+        else:
+            yield from self.iterSerial(ifh)
+        return None
 
-            self.lrec += rec
-            if (not unclosedQuote(rec, quotechar=self.dialect.quotechar)):
-                try:
-                    fields = fsplit(self.lrec, self.dialect)
-                except UnclosedQuote as e:
-                    lg.info("Continued rec %d (%d):\n    %s",
-                        self.rec_num, nPhysical, e)
-                    continue  ### Go around for continuation line
+    def iterSerial(self, ifh:IO):
+        """Read and parse the records of an open file, in this process.
+        """
+        cdx = self.dialect.freeze()
+        typers = [] if (cdx.autotype) else None
+        carry = None  # In case fsplit() and the QuoteTracker disagree
+        for lrec, nPhysical in self.logicalRecords(ifh):
+            if (carry):
+                lrec = carry[0] + lrec
+                nPhysical += carry[1]
+                carry = None
+            self.lrec = lrec
+            isHeader = (self.rec_num == 0 and self.dialect.header)
+            try:
+                fields = fsplit(self.lrec, cdx,
+                    typers=None if (isHeader) else typers)
+            except UnclosedQuote as e:
+                lg.info("Continued rec %d (%d):\n    %s",
+                    self.rec_num, nPhysical, e)
+                carry = (lrec, nPhysical)
+                continue  ### Go around for continuation line
 
             self.rec_num += 1
             if (nPhysical > 1):
@@ -1711,17 +2065,195 @@ class reader:
                     continue  # Go around for first data record
                 else:
                     self.schema = ensureSchema(
-                        None, firstRec=self.lrec,
+                        self.schema, firstRec=self.lrec,
                         dialect=self.dialect, fsArg=args.ifields)  # TODO -args
                     self.fieldNames = self.schema.getFieldNames()
 
-            # Got the fields, so bump stats and yield
-            self.rec_num += 1
             yield fields
-            self.lrec = ""
-            nPhysical = 0
+
+        if (carry):
+            lg.error("Unclosed quote at EOF, in record starting:\n    %s",
+                carry[0][0:80])
         return None
 
+    def iterParallel(self, path:str):
+        """Parse the file in 'self.workers' processes. The main process reads
+        the first record (for the header and/or schema), then cuts the rest
+        into byte ranges of about 'chunkBytes', cut after LFs (see
+        planByteRanges()). Workers parse whole ranges, and the results are
+        yielded in file order. At most 'maxPending' ranges are in flight or
+        waiting to be yielded, which bounds memory.
+        With 'quotednewline', a cut can fall inside a quoted field. Then the
+        range before it ends with an unclosed record, and the next range is
+        parsed again here, starting with that record (see takeRange()).
+        So data with many quoted newlines parallelizes less well.
+        The encoding must be ASCII-compatible (e.g. UTF-8), since ranges are
+        cut at LF bytes.
+        With 'autotype', workers only split; the fields are typed here, in
+        file order, by one list of ColumnTypers (see takeRange()), so each
+        column gets the same type it would reading serially.
+        """
+        dx = self.dialect.freeze()
+        if (dx.autotype):
+            self.typers = []
+            dx = dx.freeze(autotype=False)
+        firstRec, dataStart, nLines = readFirstRecord(path, dx)
+        self.line_num = nLines
+        if (firstRec is None): return
+        self.schema = ensureSchema(
+            self.schema, firstRec=firstRec,
+            dialect=dx, fsArg=args.ifields)  # TODO -args
+        self.fieldNames = self.schema.getFieldNames()
+        if (dx.header):
+            self.rec_num = 1
+        else:
+            dataStart = 0
+            self.line_num = 0
+
+        self.carry = ""
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            for st, en in planByteRanges(path, dataStart, self.chunkBytes):
+                pending.append((pool.submit(parseByteRangeInWorker, path, st, en, dx),
+                    path, st, en, dx))
+                if (len(pending) >= self.maxPending):
+                    yield from self.takeRange(*pending.popleft())
+            while (pending):
+                yield from self.takeRange(*pending.popleft())
+        if (self.carry):
+            lg.error("Unclosed quote at EOF, in record starting:\n    %s",
+                self.carry[0:80])
+        return None
+
+    def takeRange(self, future, path:str, start:int, end:int, dx:DialectX):
+        """Wait for one worker's results, and yield them.
+        If the range before ended inside a record, this one didn't start on
+        a record boundary, so the worker's results (and messages) are
+        discarded and the range is parsed again here, starting with that record.
+        """
+        if (self.carry):
+            future.cancel()
+            recs, nLines, self.carry = parseByteRange(
+                path, start, end, dx, prefix=self.carry)
+        else:
+            recs, nLines, self.carry, logRecords = future.result()
+            for logRecord in logRecords: lg.handle(logRecord)
+        self.line_num += nLines
+        for fields in recs:
+            self.rec_num += 1
+            if (self.typers is not None):
+                ColumnTyper.typeRecord(self.typers, fields, dtHandler)
+            yield fields
+
+    def batches(self, batchSize:int=1000, restval:str=""):
+        """Like iterating, but generate up to 'batchSize' records at a time,
+        as a list of columns (see FieldSchema.handleBatch()). With a typed
+        schema, float columns are array.array (with NaN for empty or bad
+        values), other typed columns are lists (with None), and each column
+        is cast once per batch rather than field by field (see
+        DatatypeHandler.castColumn()).
+        """
+        rows = []
+        for fields in self:
+            rows.append(fields)
+            if (len(rows) >= batchSize):
+                yield self.schema.handleBatch(rows, restval=restval)
+                rows = []
+        if (rows):
+            yield self.schema.handleBatch(rows, restval=restval)
+
+
+def readFirstRecord(path:str, dx:DialectX) -> (str, int, int):
+    """Read just the first logical record of a file (skipping any comment
+    lines before it), for reader.iterParallel(). Return the record, the byte
+    offset following it, and the number of physical lines read.
+    """
+    tracker = QuoteTracker(dx) if (dx.quotednewline) else None
+    pieces = []
+    nLines = 0
+    with open(path, "rb") as f:
+        for bline in f:
+            nLines += 1
+            line = bline.decode(dx.encoding)
+            if (not pieces and dx.comment and line.startswith(dx.comment)):
+                continue
+            pieces.append(line)
+            if (tracker and tracker.feed(line)): continue
+            return "".join(pieces), f.tell(), nLines
+    if (pieces): return "".join(pieces), os.path.getsize(path), nLines
+    return None, 0, nLines
+
+def planByteRanges(path:str, start:int, chunkBytes:int):
+    """Generate (start, end) byte ranges of about 'chunkBytes' each, covering
+    the file from 'start' (which must be a record boundary) to EOF.
+    Each range ends just after an LF, found by seeking to the nominal cut
+    and reading to the next LF, so this doesn't read through the file.
+    With 'quotednewline', an LF may be inside quotes, so a range may not
+    start on a record boundary; reader.takeRange() deals with that.
+    """
+    size = os.path.getsize(path)
+    prev = start
+    with open(path, "rb") as f:
+        while (prev + chunkBytes < size):
+            f.seek(prev + chunkBytes - 1)
+            f.readline()
+            cut = f.tell()
+            if (cut >= size): break
+            yield prev, cut
+            prev = cut
+    if (prev < size):
+        yield prev, size
+
+def parseByteRange(path:str, start:int, end:int, dx:DialectX,
+    prefix:str="") -> (List, int, str):
+    """Worker for reader.iterParallel(): parse the logical records in one
+    byte range of a file (after 'prefix', the unclosed end of the range
+    before, if any). Return them, the number of physical lines in the range,
+    and the text of any record still unclosed at the end (else "").
+    As when reading serially, a record fsplit() finds unclosed is joined
+    to the next one.
+    This is at module level so ProcessPoolExecutor can pickle it.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode(dx.encoding)
+    rdr = reader(io.StringIO(prefix + text), dialect=dx)
+    recs = []
+    carry = ""
+    for lrec, _nPhysical in rdr.logicalRecords():
+        lrec = carry + lrec
+        try:
+            recs.append(fsplit(lrec, dx))
+            carry = ""
+        except UnclosedQuote:
+            carry = lrec
+    return recs, rdr.line_num - prefix.count("\n"), carry
+
+class KeepLogRecords(logging.Handler):
+    """Keep log records (made picklable) instead of emitting them.
+    """
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record:logging.LogRecord) -> None:
+        record.msg, record.args = record.getMessage(), None
+        record.exc_info = record.exc_text = None
+        self.records.append(record)
+
+def parseByteRangeInWorker(path:str, start:int, end:int,
+    dx:DialectX) -> (List, int, str, List):
+    """Run parseByteRange() in a worker process, returning its log records
+    as well, to be emitted only if the caller keeps the results.
+    """
+    keeper = KeepLogRecords()
+    savedHandlers = lg.handlers
+    lg.handlers = [ keeper ]
+    try:
+        return parseByteRange(path, start, end, dx) + (keeper.records,)
+    finally:
+        lg.handlers = savedHandlers
+
 
 ###############################################################################
 #
@@ -1740,6 +2272,14 @@ class DictWriter:
     every record, regardless of whether some are sometimes missing or extra.
     For some potential output formats, it may be ok to omit missing/ empty/
     default fields. This is not yet supported.
+    As with csv.DictWriter, a row with keys not in "fieldNames" raises
+    ValueError if "extrasaction" is "raise"; with "ignore", they're dropped.
+
+    Each field is formatted by a per-column function, chosen once from
+    "fieldformats", the FieldSchema's "fformat" (if "fieldNames" is a
+    FieldSchema), or formatScalar(); see getFormatters().
+    "writerows()" formats whole batches with those, and writes them in
+    chunks of about "flushSize" characters rather than record by record.
     """
 
     # For specifying fieldFormats: format strings like "%-8.4f", etc.
@@ -1753,17 +2293,35 @@ class DictWriter:
         restval: str = "",
         extrasaction: str = "raise",
         dialect: str = "excel",
-        disp_None: str = "[none]"
+        disp_None: str = "[none]",
+        flushSize: int = 1<<16
         #**kwds1
         ):
         self.f            = f
+        self.schema       = None
+        if (isinstance(fieldNames, FieldSchema)):
+            self.schema = fieldNames
+            fieldNames = fieldNames.getFieldNames()
         self.fieldNames   = fieldNames
+        self.fieldformats = fieldformats
         self.restval      = restval
+        if (extrasaction not in ("raise", "ignore")):
+            raise ValueError("extrasaction must be 'raise' or 'ignore', not '%s'."
+                % (extrasaction))
         self.extrasaction = extrasaction
-        self.dialect      = None
-        if (dialect in predefinedDialects):
+        if (isinstance(dialect, (DialectX, CompiledDialectX))):
+            self.dialect  = dialect
+        elif (dialect in predefinedDialects):
             self.dialect  = predefinedDialects[dialect]
+        else:
+            self.dialect  = defaultDialect
+        quoteMap = setupQuoteMap(self.dialect.quotechar)
+        if ('"' in quoteMap): self.quotePair = ('"', '"')
+        elif (quoteMap): self.quotePair = next(iter(quoteMap.items()))
+        else: self.quotePair = None
         self.disp_None    = disp_None
+        self.flushSize    = flushSize
+        self.formatters   = None  # See getFormatters()
 
         if (fieldNames):
             if (not isinstance(fieldNames, list)):
@@ -1776,34 +2334,80 @@ class DictWriter:
                     raise ValueError("Unparseable fieldFormat '%s'." % (ff))
 
     def writeheader(self) -> None:
-        self.writerow(self.fieldNames)
+        """Write the field names, quoted and escaped like string values.
+        """
+        self.f.write(self.dialect.delimiter.join(
+            [ self.formatScalar(fieldName) for fieldName in self.fieldNames ])
+            + self.dialect.lineterminator)
 
     def writerows(self, rows: List) -> int:
+        """Format and write many rows, buffering the output and writing
+        it about every "flushSize" characters (and at the end).
+        """
         rnum = 0
+        pending = []
+        pendingLen = 0
         for row in rows:
             rnum += 1
-            self.writerow(row)
+            line = self.formatRow(row)
+            pending.append(line)
+            pendingLen += len(line)
+            if (pendingLen >= self.flushSize):
+                self.f.write("".join(pending))
+                pending = []
+                pendingLen = 0
+        if (pending):
+            self.f.write("".join(pending))
         return rnum
 
     def writerow(self, row: Dict) -> None:
-        #nDelims = len(self.dialect.delimiter)  # For rotating delims a la *paste*
-        buf = ""
+        self.f.write(self.formatRow(row))
+
+    def formatRow(self, row: Dict) -> str:
+        """Return the formatted record (with lineterminator) for a dict.
+        """
         if (self.fieldNames is None):
             self.fieldNames = sorted(row.keys())
-        thisDelim = self.dialect.delimiter
-        badKeys = set(list(self.fieldNames)) - set(list(row.keys()))
-        if (badKeys):
-            lg.error("Extra keys found: %s", badKeys)
-
-        for fieldName in self.fieldNames:
-            # Some *nix utils support cyclic delimiters....
-            #thisDelim = self.dialect.delimiter[ i % nDelims ]  # cf *nix `paste`...
-            #fieldName = self.fieldNames[fnum]
-            fval = row[fieldName] if fieldName in row else ""
-            formattedVal = self.formatOneField(fval)
-            buf += formattedVal + thisDelim
-        buf[-len(thisDelim):] = self.dialect.lineterminator
-        self.f.write(buf)
+        formatters = self.formatters or self.getFormatters()
+        if (self.extrasaction == "raise"):
+            extraKeys = row.keys() - self.fieldSet
+            if (extraKeys):
+                raise ValueError("Row has keys not in fieldNames: %s"
+                    % (", ".join(sorted(map(str, extraKeys)))))
+        restval = self.restval
+        return self.dialect.delimiter.join(
+            [ fmt(row.get(fieldName, restval))
+                for fmt, fieldName in zip(formatters, self.fieldNames) ]
+        ) + self.dialect.lineterminator
+
+    def getFormatters(self) -> List:
+        """Pick a formatting function for each field, once. In order of
+        preference, that is from "fieldformats" (a %-format string), the field's
+        FieldInfo.fformat (a %-format string or a Callable), or formatOneField().
+        """
+        self.fieldSet = set(self.fieldNames)
+        formatters = []
+        for fnum, fieldName in enumerate(self.fieldNames):
+            fmt = None
+            if (self.fieldformats):
+                fmt = self.fieldformats[fnum]
+            elif (self.schema and fieldName in self.schema.infoDict):
+                fmt = self.schema[fieldName].fformat
+            if (callable(fmt)):
+                formatters.append(fmt)
+            elif (isinstance(fmt, str)):
+                formatters.append(self.makePercentFormatter(fmt))
+            else:
+                formatters.append(self.formatOneField)
+        self.formatters = formatters
+        return formatters
+
+    def makePercentFormatter(self, fmt:str) -> Callable:
+        disp_None = self.disp_None
+        def formatPercent(obj: Any) -> str:
+            if (obj is None): return disp_None
+            return fmt % (obj)
+        return formatPercent
 
     def writecomment(self, s: str):
         self.f.write(self.dialect.comment + s + self.dialect.lineterminator)
@@ -1812,13 +2416,19 @@ class DictWriter:
         return self.formatScalar(fval)
 
     def formatScalar(self, obj: Any) -> str:  # From alogging.py
-        # TODO: Escaping???
-        #
         ty = type(obj)
         if (obj is None):
             return self.disp_None
         elif (isinstance(obj, str)):
-            return '"%s"' % (obj)
+            if (not self.quotePair): return obj
+            openQ, closeQ = self.quotePair
+            esc = self.dialect.escapechar
+            if (esc and not self.dialect.doublequote):
+                if (esc in obj or closeQ in obj):
+                    obj = obj.replace(esc, esc+esc).replace(closeQ, esc+closeQ)
+            elif (closeQ in obj):
+                obj = obj.replace(closeQ, closeQ+closeQ)
+            return openQ + obj + closeQ
         elif (isinstance(obj, bytearray)):
             return 'b"%s"' % (obj)
         #elif (isinstance(obj, buffer)):
@@ -1867,18 +2477,22 @@ class DictWriterXSV(DictWriter):
         restval: str = "",
         extrasaction: str = "raise",
         dialect:DialectX = "XSV",
-        disp_None: str = "[none]"  # TODO: Move into FieldInfo
+        disp_None: str = "[none]",  # TODO: Move into FieldInfo
+        flushSize: int = 1<<16
         #**kwds1
         ):
         super(DictWriter, self).__init__()
         self.f            = f
         self.schema       = None
+        self.fieldNames   = fieldNames
         if (isinstance(fieldNames, FieldSchema)):
             self.schema = fieldNames
             self.fieldNames = fieldNames.getFieldNames()
         self.restval      = restval
         self.extrasaction = extrasaction
         self.disp_None    = disp_None
+        self.flushSize    = flushSize
+        self.attrPrefixes = None
 
     def writeheader(self, tableName:str="", dcMetadata:Dict=None) -> None:
         attrs = ' name="%s"' if tableName else ""
@@ -1890,23 +2504,20 @@ class DictWriterXSV(DictWriter):
             buf += fname + '="str"'
         self.f.write(buf)
 
-    def writerows(self, rows: List) -> int:
-        rnum = 0
-        for row in rows:
-            rnum += 1
-            self.writerow(row)
-        return rnum
-
-    def writerow(self, row: Dict) -> None:
-        buf = ""
+    def formatRow(self, row: Dict) -> str:
         if (self.fieldNames is None):
             self.fieldNames = sorted(row.keys())
-
-        for fname in self.fieldNames:
+        if (self.attrPrefixes is None):
+            self.attrPrefixes = [ ' %s="' % (fname) for fname in self.fieldNames ]
+        esc = Escaping.escapeXmlAttribute
+        buf = [ "<Rec" ]
+        for prefix, fname in zip(self.attrPrefixes, self.fieldNames):
             if (fname not in row):  continue  # TODO restval?
-            fval = str(row[fname])            # TODO format?
-            buf += self.makeAttr(fname, fval)
-        self.f.write("<Rec%s />\n" % (buf))
+            buf.append(prefix)
+            buf.append(esc(str(row[fname])))  # TODO format?
+            buf.append('"')
+        buf.append(" />\n")
+        return "".join(buf)
 
     def writecomment(self, s: str):
         self.f.write("<!--%s-->" % (Escaping.escapeXmlComment(s)))
@@ -2180,6 +2791,18 @@ class DatatypeHandler:
     vectorExpr = r"^\[\s*%s(\s*,\s*%s)*\]$" % (floatPart, floatPart)
     uuidExpr = r"[\da-f]{8}-[\da-f]{4}-[\da-f]{4}-[\da-f]{4}-[\da-f]{12}$"
 
+    # Unanchored expressions for just what some KnownTypes casters accept
+    # (for ColumnTyper). DATETIME is what datetimeCaster() accepts.
+    _digits = r"(?:\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)"
+    specialFloatExpr = r"[-+]?(?:nan|inf(?:inity)?)"
+    casterExprs = {
+        "ANYINT":   r"[-+]?(?:0[xX][\da-fA-F]+|0[oO][0-7]+|0[bB][01]+|0+|[1-9]\d*)",
+        "FLOAT":    r"[-+]?%s" % (_digits),
+        "COMPLEX":  r"\(?[-+]?%s(?:[jJ]|[-+]%s?[jJ])?\)?" % (_digits, _digits),
+        "DATETIME": (r"\d\d\d\d-\d\d-\d\d(?:T\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[-+]\d+)?)?"
+            r"|\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[-+]\d+)?"),
+    }
+
     #identExpr = r"^\w+$"
 
     @staticmethod
@@ -2205,7 +2828,7 @@ class DatatypeHandler:
             If set, "NaN" and (optionally signed) "inf" count as floats.
         """
         self.setupDefaultTypes()
-        self.reserved = reserved
+        self.reserved = reserved or {}
         self.specialFloats = specialFloats
 
     def setupDefaultTypes(self):
@@ -2304,6 +2927,60 @@ class DatatypeHandler:
         assert isinstance(castVal, typeDef.targetDT)
         return castVal
 
+    def findTypeDef(self, ftype:Union[str, type]) -> DTDef:
+        """Look up the DTDef for a type given as an actual type, or a name in
+        any case, perhaps with the ":" and "[constraint]" from a header hint.
+        Return None if it's not a known type.
+        """
+        if (isinstance(ftype, type)):
+            for typeDef in self.KnownTypes.values():
+                if (typeDef.targetDT is ftype): return typeDef
+            return None
+        if (not isinstance(ftype, str)): return None
+        name = re.sub(r"\[.*$", "", ftype.lstrip(":")).upper()
+        return self.KnownTypes.get(name, None)
+
+    # Element types for array.array columns (see castColumn()). Only float
+    # has a value (NaN) to stand in for an empty or bad one, so ints are lists.
+    arrayTypeCodes = { float: "d" }
+
+    def castColumn(self, ftype:Union[str, type], values:List,
+        default:Any=None, badRows:List=None) -> Union[array.array, List]:
+        """Cast a whole column of raw field values to the given type at once.
+        Unknown types, "str", and "bool" are not cast.
+        Each type always comes back as the same kind of column, whatever
+        the data: float columns as array.array("d"), everything else as a list.
+        Empty (or all-space) values are replaced by 'default' if it is not
+        None. Values that are still empty become NaN in float columns and
+        None in others; so do values that fail to cast, and their indexes
+        are added to 'badRows' (if given) so the caller can report them.
+        """
+        typeDef = self.findTypeDef(ftype)
+        if (typeDef is None or typeDef.caster is None or typeDef.targetDT is str):
+            return values if isinstance(values, list) else list(values)
+        if (default is not None):
+            values = [ default if (not v or v.isspace()) else v for v in values ]
+        caster = typeDef.caster
+        code = self.arrayTypeCodes.get(typeDef.targetDT, None)
+        try:
+            if (code): return array.array(code, map(caster, values))
+            return list(map(caster, values))
+        except (ValueError, TypeError, OverflowError):
+            pass
+        missing = math.nan if (code) else None
+        col = []
+        for i, v in enumerate(values):
+            if (not v or v.isspace()):
+                col.append(missing)
+                continue
+            try:
+                col.append(caster(v))
+            except (ValueError, TypeError, OverflowError):
+                col.append(missing)
+                if (badRows is not None): badRows.append(i)
+        if (code): return array.array(code, col)
+        return col
+
     def checkConstraint(self, typeName:str, castVal:Any, fInfo:'FieldInfo') -> bool:
         # TODO: Finish
         if (isinstance(typeName, type)):
@@ -2462,11 +3139,11 @@ class DatatypeHandler:
         dateTimeRegex = dateRegex + "T" + timeRegex
 
         if (re.match(dateTimeRegex, s)):
-            return datetime.datetime(s)
+            return datetime.datetime.fromisoformat(s)
         if (re.match(dateRegex, s)):
-            return datetime.date(s)
+            return datetime.date.fromisoformat(s)
         if (re.match(timeRegex, s)):
-            return datetime.time(s)
+            return datetime.time.fromisoformat(s)
         raise ValueError("String cannot be parsed as date and/or time: '%s'" % (s))
 
     def autoType(self, tok: str) -> Any:
@@ -2575,6 +3252,115 @@ class DatatypeHandler:
             return False
         return True
 
+    def makeColumnTyper(self, sampleSize:int=100) -> 'ColumnTyper':
+        return ColumnTyper(self, sampleSize=sampleSize)
+
+
+###############################################################################
+#
+class ColumnTyper:
+    """Cached type inference for one column (field), for 'autotype'.
+    The first 'sampleSize' non-empty values are typed individually by
+    DatatypeHandler.guessType(), and the widest type seen is locked in.
+    After that each value costs one match against that type's precompiled
+    regex (from DatatypeHandler.casterExprs), plus one cast by the
+    corresponding KnownTypes caster. A value that doesn't match moves
+    the column to the next wider type that does (see Wider), and it stays
+    there; so once a column is FLOAT, later integers come back as floats.
+
+    Reserved values and empty fields are handled as by guessType().
+    """
+    # Our type names, to the KnownTypes entries whose casters we use.
+    KnownNames = {
+        "INT": "ANYINT", "FLOAT": "FLOAT", "COMPLEX": "COMPLEX",
+        "DATETIME": "DATETIME",
+    }
+    # Where to go when a value doesn't fit. "STR" means leave it alone.
+    Wider = {
+        "INT":      "FLOAT",
+        "FLOAT":    "COMPLEX",
+        "COMPLEX":  "STR",
+        "DATETIME": "STR",
+        "STR":      None,
+    }
+    # guessType() names, to ours.
+    GuessNames = {
+        "int": "INT", "float": "FLOAT", "complex": "COMPLEX",
+        "datetime": "DATETIME", "str": "STR",
+    }
+
+    def __init__(self, dth:DatatypeHandler, sampleSize:int=100):
+        self.dth = dth
+        self.sampleSize = sampleSize
+        self.nSampled = 0
+        self.sampleType = None
+        self.typeName = None  # None until the sample is done
+
+        self.casters = {}
+        self.exprs = {}
+        for name, known in ColumnTyper.KnownNames.items():
+            self.casters[name] = (DatatypeHandler.datetimeCaster
+                if (known == "DATETIME") else dth.KnownTypes[known].caster)
+            expr = DatatypeHandler.casterExprs[known]
+            if (name == "FLOAT" and dth.specialFloats):
+                expr = r"(?i:%s|%s)" % (expr, DatatypeHandler.specialFloatExpr)
+            self.exprs[name] = re.compile(expr)
+
+    def widest(self, t1:str, t2:str) -> str:
+        """Return the narrowest of our types that covers both.
+        """
+        if (t1 is None): return t2
+        t = t1
+        while (t is not None):
+            u = t2
+            while (u is not None):
+                if (u == t): return t
+                u = ColumnTyper.Wider[u]
+            t = ColumnTyper.Wider[t]
+        return "STR"
+
+    def typeValue(self, tok:str) -> Any:
+        """Return the value cast to this column's type (see class doc).
+        """
+        if (not isinstance(tok, str)):
+            return tok
+        if (self.typeName is None):
+            gType, val = self.dth.guessType(tok)
+            if (gType != "None"):
+                self.nSampled += 1
+                self.sampleType = self.widest(self.sampleType,
+                    ColumnTyper.GuessNames.get(gType, "STR"))
+                if (self.nSampled >= self.sampleSize):
+                    self.typeName = self.sampleType
+            return val
+
+        tok2 = DatatypeHandler.stripSpace(tok)
+        if (tok2 in self.dth.reserved):
+            return self.dth.reserved[tok2]
+        if (tok2 == ""):
+            return None
+        while (self.typeName != "STR"):
+            if (self.exprs[self.typeName].fullmatch(tok2)):
+                try:
+                    return self.casters[self.typeName](tok2)
+                except (ValueError, OverflowError):
+                    pass
+            self.typeName = ColumnTyper.Wider[self.typeName]
+        return tok
+
+    @staticmethod
+    def typeRecord(typers:List, tokens:List, dth:DatatypeHandler,
+        sampleSize:int=100) -> List:
+        """Autotype a whole record in place, using (and extending as needed)
+        the list of ColumnTyper objects in 'typers', one per field.
+        """
+        while (len(typers) < len(tokens)):
+            typers.append(ColumnTyper(dth, sampleSize=sampleSize))
+        for i, token in enumerate(tokens):
+            tokens[i] = typers[i].typeValue(token)
+        return tokens
+
+
 DTH = DatatypeHandler(specialFloats=True)
 
 
@@ -2635,6 +3421,7 @@ class FieldInfo:
         self.regexConstraint = None
         self.fmin = None
         self.fmax = None
+        self.fbadCount = 0  # Values handleBatch() couldn't cast
 
         if (self.frequired and self.fdefault is not None):
             lg.error("Don't set 'required' when there's also a default value.")
@@ -2834,6 +3621,41 @@ class FieldSchema():
             # dtHandler.(self, tokens)  # TODO ????
         return fields
 
+    def handleBatch(self, rows:List, restval:str="") -> List:
+        """Turn a list of records (each a list of raw fields) into a list
+        of columns, one per field in the schema (or per field in the longest
+        row if that's more). Missing fields get 'restval'. Normalizing,
+        defaulting, and typecasting are done a column at a time (see
+        DatatypeHandler.castColumn()), so float columns come back as
+        array.array. Values that don't cast are logged, and counted in the
+        field's FieldInfo.fbadCount.
+        """
+        nFields = len(self.theFieldInfos)
+        if (rows): nFields = max(nFields, max(len(row) for row in rows))
+        columns = [ list(col) for col in
+            itertools.zip_longest(*rows, fillvalue=restval) ]
+        while (len(columns) < nFields): columns.append([ restval ] * len(rows))
+
+        for i in range(min(nFields, len(self.theFieldInfos))):
+            finfo = self.theFieldInfos[i]
+            col = columns[i]
+            if (callable(finfo.fnormalizer)):
+                col = list(map(finfo.fnormalizer, col))
+            if (finfo.frequired and any(not v or v.isspace() for v in col)):
+                raise ValueError("Missing required field %s." % (finfo.fname))
+            dft = finfo.fdefault
+            if (isinstance(dft, str)):
+                dft = dft.lstrip("=") if (dft != "!") else None
+            badRows = []
+            columns[i] = DTH.castColumn(
+                finfo.ftypeReal or finfo.ftypeName, col, default=dft,
+                badRows=badRows)
+            if (badRows):
+                finfo.fbadCount += len(badRows)
+                lg.warning("Field %s: %d value(s) not castable to %s, e.g. '%s'.",
+                    finfo.fname, len(badRows), finfo.ftypeName, col[badRows[0]])
+        return columns
+
 
 ###############################################################################
 #
@@ -2899,14 +3721,19 @@ def fsplit(
     s: str,
     dialect: DialectX=None,
     schema: FieldSchema=None,
+    typers: List=None,
     **kwargs
     ) -> List:
     """Fancier string splitter / csv parser. Lots of options, Unicode aware.
     Optionally handles datatyping, casting, and defaulting, too. TODO: Or to callers?
+    With 'autotype', pass the same (initially empty) list as 'typers' for each
+    record of a file, to infer types per column (see ColumnTyper) rather than
+    guessing for every field separately.
     """
-    dx = dialect if dialect else DialectX("default")
-    dx.applykwOptions(kwargs)
-    dx.checkOptions()
+    if (kwargs):
+        dx = CompiledDialectX.get(dialect, kwargs)
+    else:
+        dx = (dialect or defaultDialect).freeze()
 
     s = s.strip("\uFEFF")  # Lose the dang BOM.
     # TODO: Upgrade to DatatypeHandler.stripSpace(s)
@@ -2916,7 +3743,51 @@ def fsplit(
     thisDelim = currentDelim(dx, fieldNum=1)
     if (not thisDelim): return s.split(sep="")
 
-    currentQuoteMap = setupQuoteMap(dx.quotechar)
+    if (dx.splitter):
+        tokens, pendingQuote, i = dx.splitter.split(s)
+    else:
+        tokens, pendingQuote, i = splitByChars(s, dx, thisDelim)
+
+    # At end of record
+    #
+    if (pendingQuote):
+        # If the end of line is still inside quotes, and that's allowed,
+        # throw UnclosedQuote exception to signal caller to append
+        # another line and call us to parse again. Not efficient, but easy.
+        if (dx.quotednewline):
+            raise UnclosedQuote("Logical record is: " + s)
+        else:
+            syntaxError(s, i, tokens[-1],
+                "Unresolved quote (expected '%s')" % (pendingQuote), strict=dx.strict)
+        syntaxError(s, i, tokens[-1], "Unclosed quote", strict=dx.strict)
+
+    if (len(tokens) < (dx.minsplit or 0)+1):
+        syntaxError(
+            s, i, tokens[i-1] if 1<=i<=len(tokens) else "",
+            "min %d fields needed, but found %d" % (dx.minsplit, len(tokens)),
+            strict=dx.strict)
+
+    # Apply normalizers, defaults, typecasting, constraint checks, etc.
+    if (schema):
+        schema.handleRecord(tokens)
+    elif (dx.autotype):
+        if (typers is not None):
+            ColumnTyper.typeRecord(typers, tokens, dtHandler)
+        else:
+            for i, token in enumerate(tokens):
+                _typ, val = dtHandler.guessType(token)
+                tokens[i] = val
+
+    return tokens
+
+def splitByChars(s:str, dx:'CompiledDialectX',
+    thisDelim:Union[str, re.Pattern]) -> (List, str, int):
+    """The original character-at-a-time engine for fsplit(). It handles
+    every option combination, including regex and cycling delimiters.
+    Returns the tokens, any still-open quote's closer, and the final offset,
+    so fsplit() can do the end-of-record checks the same way for either engine.
+    """
+    currentQuoteMap = dx.quoteMap
     pendingQuote = None
     #breakpoint()
     sLen = len(s)
@@ -2988,34 +3859,126 @@ def fsplit(
 
         i += 1  # No continues, please.
 
-    # At end of record
-    #
-    if (pendingQuote):
-        # If the end of line is still inside quotes, and that's allowed,
-        # throw UnclosedQuote exception to signal caller to append
-        # another line and call us to parse again. Not efficient, but easy.
-        if (dx.quotednewline):
-            raise UnclosedQuote("Logical record is: " + s)
-        else:
-            syntaxError(s, i, tokens[-1],
-                "Unresolved quote (expected '%s')" % (pendingQuote), strict=dx.strict)
-        syntaxError(s, i, tokens[-1], "Unclosed quote", strict=dx.strict)
+    return tokens, pendingQuote, i
 
-    if (len(tokens) < dx.minsplit+1):
-        syntaxError(
-            s, i, tokens[i-1] if 1<=i<=len(tokens) else "",
-            "min %d fields needed, but found %d" % (dx.minsplit, len(tokens)),
-            strict=dx.strict)
+class CompiledSplitter:
+    """A faster engine for fsplit(), compiled once per CompiledDialectX
+    (which see). Rather than visiting every character,
+    it searches for the next escape, entity, quote, or delimiter with a single
+    precompiled regex, and copies the text in between by slicing.
+    Escapes and entities still go through Escaping.decodeEscape() and
+    parseEntity(), and errors are reported at the same offsets with the
+    same messages, so the tokens are identical to splitByChars().
 
-    # Apply normalizers, defaults, typecasting, constraint checks, etc.
-    if (schema):
-        schema.handleRecord(tokens)
-    elif (dx.autotype):
-        for i, token in enumerate(tokens):
-            _typ, val = dtHandler.guessType(token)
-            tokens[i] = val
+    Regex and cycling delimiters are not handled; canCompile() says so, and
+    fsplit() falls back to splitByChars() for those.
+    """
+    def __init__(self, dx:'CompiledDialectX'):
+        assert CompiledSplitter.canCompile(dx)
+        self.dx = dx
+        self.delimiter = dx.delimiter
+        self.escapechar = dx.escapechar or None
+        self.quoteMap = dx.quoteMap
+
+        # Same priority as the tests in splitByChars().
+        alts = []
+        if (self.escapechar):
+            alts.append("(?P<esc>%s)" % (re.escape(self.escapechar)))
+        if (dx.entities):
+            alts.append("(?P<ent>&)")
+        if (self.quoteMap):
+            alts.append("(?P<quo>[%s])" % (
+                "".join(re.escape(q) for q in self.quoteMap.keys())))
+        dlmExpr = re.escape(self.delimiter)
+        if (dx.delimiterrepeat): dlmExpr = "(?:%s)+" % (dlmExpr)
+        alts.append("(?P<dlm>%s)" % (dlmExpr))
+        self.outsideExpr = re.compile("|".join(alts))
+
+        # Inside quotes only the escapechar and the matching close quote matter.
+        self.insideExprs = {}
+        for closer in set(self.quoteMap.values()):
+            self.insideExprs[closer] = re.compile(
+                "[%s]" % (re.escape((self.escapechar or "") + closer)))
 
-    return tokens
+    @staticmethod
+    def canCompile(dx:DialectX) -> bool:
+        return (isinstance(dx.delimiter, str) and dx.delimiter != "")
+
+    def split(self, s:str) -> (List, str, int):
+        """Same contract as splitByChars().
+        """
+        dx = self.dx
+        sLen = len(s)
+        tokens = []
+        cur = []  # Pieces of the current token
+        pendingQuote = None
+        pos = 0
+        iEnd = None
+        while (pos < sLen):
+            if (pendingQuote):
+                mat = self.insideExprs[pendingQuote].search(s, pos)
+                if (not mat):
+                    cur.append(s[pos:])
+                    pos = sLen
+                    break
+                i = mat.start()
+                if (i > pos): cur.append(s[pos:i])
+                if (s[i] == self.escapechar):
+                    escResult, escLength = Escaping.decodeEscape(
+                        s, i, "".join(cur), dx=dx)
+                    cur.append(escResult)
+                    pos = i + escLength
+                elif (dx.doublequote and sLen > i+1 and s[i+1] == pendingQuote):
+                    cur.append(pendingQuote)
+                    pos = i + 2
+                else:
+                    pendingQuote = None
+                    pos = i + 1
+                continue
+
+            mat = self.outsideExpr.search(s, pos)
+            if (not mat):
+                cur.append(s[pos:])
+                pos = sLen
+                break
+            i = mat.start()
+            if (i > pos): cur.append(s[pos:i])
+            kind = mat.lastgroup
+            if (kind == "esc"):
+                escResult, escLength = Escaping.decodeEscape(
+                    s, i, "".join(cur), dx=dx)
+                cur.append(escResult)
+                pos = i + escLength
+            elif (kind == "ent"):
+                entExpansion, charsUsed = parseEntity(s[i:])
+                if (entExpansion is not None):
+                    cur.append(entExpansion)
+                    pos = i + charsUsed
+                else:
+                    syntaxError(s, i, "".join(cur),
+                        "Ill-formed character reference", strict=dx.strict)
+                    pos = i + 1
+            elif (kind == "quo"):
+                if (any(cur)):
+                    syntaxError(s, i, "".join(cur),
+                        "quote not at start of field", strict=dx.strict)
+                pendingQuote = self.quoteMap[s[i]]
+                pos = i + 1
+            else:
+                pos = mat.end()
+                if (dx.maxsplit and len(tokens) + 1 > dx.maxsplit):
+                    iEnd = pos - 1
+                    syntaxError(s, iEnd, "".join(cur),
+                        "maxsplit (%d) exceeded." % (dx.maxsplit), strict=dx.strict)
+                    tokens.append("".join(cur))
+                    cur = [ s[iEnd+len(self.delimiter):] ]
+                    break
+                tokens.append("".join(cur))
+                cur = []
+
+        tokens.append("".join(cur))
+        if (iEnd is None): iEnd = pos
+        return tokens, pendingQuote, iEnd
 
 def currentDelim(dx:DialectX, fieldNum:int) -> str:
     """Return the delimiter string currently expected. This can be weird, given
@@ -3025,7 +3988,7 @@ def currentDelim(dx:DialectX, fieldNum:int) -> str:
     long since have been split into a real list.
     TODO: Move into DialectX?
     """
-    if (isinstance(dx.delimiter, list)):
+    if (isinstance(dx.delimiter, (list, tuple))):
         return dx.delimiter[(fieldNum-1) % len(dx.delimiter)]
     else:
         return dx.delimiter
@@ -3297,6 +4260,7 @@ if __name__ == "__main__":
         testDatatyping()
         testHeaders(theDialect=theDialect)
         testErrors()
+        testEngines()
 
     def testBasics():
         s0 = ""
@@ -3452,6 +4416,36 @@ if __name__ == "__main__":
                 xescapes=True, uescapes=True, entities=True, strict=True)
         return
 
+    def testEngines():
+        """Make sure the compiled and loop engines agree.
+        """
+        phead("Engines")
+        samples = [
+            "", "a,b,c", ",,", 'a,"b,c",d', 'a,"b""c",d', '"",x,""""',
+            "a\\,b,c", "x&amp;y,&#65;,z", "lorem##ipsum####dolor", "a,'b,c',d",
+            'wee fish$ewe$"a mare"$egrets$"moo$e"',
+        ]
+        optionSets = [
+            {}, { "delimiter":"##" }, { "delimiter":"#", "delimiterrepeat":True },
+            { "escapechar":"\\", "doublequote":False }, { "entities":True },
+            { "quotechar":"BOTH" }, { "delimiter":"$" },
+        ]
+        dialects = list(predefinedDialects.values())
+        for opts in optionSets:
+            dialects.append(DialectX("engineTest", **opts))
+        for dx0 in dialects:
+            for s0 in samples:
+                results = []
+                for eng in DialectX.engines:
+                    dx1 = DialectX("engineTest", dialect=dx0, engine=eng)
+                    try:
+                        results.append(fsplit(s0, dx1))
+                    except ValueError as e:
+                        results.append(str(e))
+                if (results[0] != results[1]):
+                    cprint("    ******* Engines differ on %s:\n    %s" %
+                        (dquote(s0, args.visible), results))
+
     def processOptions():
         try:
             from BlockFormatter import BlockFormatter
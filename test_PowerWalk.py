@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+#
+import unittest
+import os
+import io
+import json
+import shutil
+import tarfile
+import zipfile
+import tempfile
+import subprocess
+from PowerWalk import (PowerWalk, PWType, PWDisp, getFileInfo,
+    getGitStatus, GitStatusCache, JsonEventWriter, ManifestEntry, itemCopy)
+
+def makeTree(root:str, files:dict) -> None:
+    """Make files (path relative to root -> content) under root.
+    """
+    for rel, content in files.items():
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as ofh:
+            ofh.write(content)
+
+def haveGit() -> bool:
+    try:
+        subprocess.run([ "git", "--version" ], check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return True
+
+def events(pw:PowerWalk, root:str) -> list:
+    """Return (path relative to root, PWType name) for each event.
+    """
+    return [ (os.path.relpath(path, root), what.name)
+        for path, _fh, what in pw.traverse() ]
+
+def leafPaths(pw:PowerWalk, root:str) -> list:
+    return [ os.path.relpath(path, root) for path, _fh, what in pw.traverse()
+        if what == PWType.LEAF ]
+
+class TestEngines(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        makeTree(self.root, { "a/1.txt": "1", "a/b/2.txt": "22",
+            "c/3.txt": "333", "top.txt": "t", "a/.hid": "h" })
+        os.symlink("3.txt", os.path.join(self.root, "c", "link3"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_scandir_matches_listdir(self):
+        for opts in [ {}, { "hidden": True },
+            { "followLinks": PWDisp.RETURN, "sort": "size" } ]:
+            opts = dict({ "recursive": True, "sort": "name" }, **opts)
+            scanned = events(PowerWalk(self.root, engine="scandir", **opts), self.root)
+            listed = events(PowerWalk(self.root, engine="listdir", **opts), self.root)
+            self.assertEqual(scanned, listed)
+            self.assertIn(("a/b/2.txt", "LEAF"), scanned)
+
+class TestThreads(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        makeTree(self.root, { "d%d/s%d/f%d.txt" % (i, j, k): "x" * k
+            for i in range(4) for j in range(3) for k in range(3) })
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_threaded_matches_serial(self):
+        serial = events(PowerWalk(self.root, recursive=True, sort="name"), self.root)
+        for nThreads in (1, 4):
+            pw = PowerWalk(self.root, recursive=True, sort="name", threads=nThreads)
+            self.assertEqual(events(pw, self.root), serial)
+            self.assertGreater(pw.getStat("dirsPrefetched"), 0)
+
+    def test_unordered_has_same_items(self):
+        serial = events(PowerWalk(self.root, recursive=True), self.root)
+        pw = PowerWalk(self.root, recursive=True, threads=4, unordered=True)
+        self.assertEqual(sorted(events(pw, self.root)), sorted(serial))
+
+class TestCycles(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        makeTree(self.root, { "a/1.txt": "1", "c/3.txt": "3" })
+        os.symlink("..", os.path.join(self.root, "a", "up"))
+        os.symlink("../a", os.path.join(self.root, "c", "alias"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_up_link_is_not_followed(self):
+        pw = PowerWalk(self.root, recursive=True, sort="name")
+        evs = events(pw, self.root)
+        self.assertNotIn("a/up", [ path for path, _what in evs ])
+        self.assertIn(("c/alias/1.txt", "LEAF"), evs)
+        self.assertEqual(pw.getStat("cycles"), 2)  # a/up and c/alias/up
+
+    def test_visitOnce(self):
+        pw = PowerWalk(self.root, recursive=True, sort="name", visitOnce=True)
+        self.assertEqual(leafPaths(pw, self.root), [ "a/1.txt", "c/3.txt" ])
+        self.assertEqual(pw.getStat("ignoredRevisits"), 1)
+
+@unittest.skipUnless(haveGit(), "needs git")
+class TestGitStatus(unittest.TestCase):
+
+    def git(self, *gitArgs) -> None:
+        subprocess.run([ "git", "-C", self.root ] + list(gitArgs),
+            check=True, capture_output=True)
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        makeTree(self.root, { "clean.txt": "1", "mod.txt": "2",
+            "sub/clean2.txt": "3", ".gitignore": "*.log\n" })
+        self.git("init", "-q")
+        self.git("add", ".")
+        self.git("-c", "user.name=t", "-c", "user.email=t@t",
+            "commit", "-qm", "init")
+        makeTree(self.root, { "mod.txt": "changed", "new.txt": "n",
+            "sub/staged.txt": "s", "x.log": "l", "newdir/a.txt": "a" })
+        self.git("add", "sub/staged.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_cache_matches_getGitStatus(self):
+        cache = GitStatusCache()
+        expected = { "clean.txt": " ", "mod.txt": "M", "new.txt": "?",
+            "sub/clean2.txt": " ", "sub/staged.txt": "A", "x.log": "!",
+            "newdir/a.txt": "?" }
+        for rel, code in expected.items():
+            path = os.path.join(self.root, rel)
+            self.assertEqual(getGitStatus(path), code, rel)
+            self.assertEqual(cache.getStatus(path), code, rel)
+        self.assertEqual(len(cache.statusMaps), 1)
+
+    def test_filter(self):
+        pw = PowerWalk(self.root, recursive=True, sort="name", gitStatus="MA")
+        self.assertEqual(leafPaths(pw, self.root), [ "mod.txt", "sub/staged.txt" ])
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.dbPath = os.path.join(tempfile.mkdtemp(), "manifest.db")
+        makeTree(self.root, { "a/keep.txt": "k", "a/mod.txt": "m",
+            "a/gone.txt": "g", "old/x.txt": "x", "top.txt": "t" })
+        list(PowerWalk(self.root, recursive=True, manifest=self.dbPath).traverse())
+        with open(os.path.join(self.root, "a", "mod.txt"), "a") as ofh:
+            ofh.write("ore")
+        os.remove(os.path.join(self.root, "a", "gone.txt"))
+        shutil.rmtree(os.path.join(self.root, "old"))
+        makeTree(self.root, { "a/new.txt": "n", "new/sub/y.txt": "y" })
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        shutil.rmtree(os.path.dirname(self.dbPath))
+
+    def changes(self, rescan:str) -> list:
+        pw = PowerWalk(self.root, recursive=True, sort="name",
+            manifest=self.dbPath, rescan=rescan)
+        return sorted((rel, what) for rel, what in events(pw, self.root)
+            if what in ("ADDED", "MODIFIED", "REMOVED"))
+
+    def test_rescan_files(self):
+        self.assertEqual(self.changes("files"), [ ("a/gone.txt", "REMOVED"),
+            ("a/mod.txt", "MODIFIED"), ("a/new.txt", "ADDED"),
+            ("new", "ADDED"), ("old", "REMOVED") ])
+        self.assertEqual(self.changes("files"), [])
+
+    def test_rescan_dirs(self):
+        # "a" changed (entries came and went), so is listed and checked.
+        self.assertIn(("a/mod.txt", "MODIFIED"), self.changes("dirs"))
+        # But a rewrite in place doesn't change its directory's mtime.
+        with open(os.path.join(self.root, "a", "keep.txt"), "a") as ofh:
+            ofh.write("eep")
+        self.assertEqual(self.changes("dirs"), [])
+        self.assertEqual(self.changes("files"), [ ("a/keep.txt", "MODIFIED") ])
+
+class TestArchives(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        # Members of "d" are not listed together.
+        self.members = [ ("d/1.txt", "one"), ("top.txt", "t"),
+            ("d/e/2.txt", "two"), ("d/3.txt", "three") ]
+        with tarfile.open(os.path.join(self.root, "a.tgz"), "w:gz") as tf:
+            for name, content in self.members:
+                data = content.encode("utf-8")
+                ti = tarfile.TarInfo(name)
+                ti.size = len(data)
+                tf.addfile(ti, io.BytesIO(data))
+        with zipfile.ZipFile(os.path.join(self.root, "z.zip"), "w") as zf:
+            for name, content in self.members:
+                zf.writestr(name, content)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def check(self, arcName:str, option:str) -> None:
+        pw = PowerWalk(os.path.join(self.root, arcName), **{ option: True })
+        evs = []
+        for path, fh, what in pw.traverse():
+            rel = os.path.relpath(path, self.root)
+            evs.append((rel, what.name))
+            if (what == PWType.LEAF):
+                self.assertEqual(fh.read().decode("utf-8"),
+                    dict(self.members)[rel[len(arcName)+1:]])
+        self.assertEqual(evs, [ (arcName, "OPEN"),
+            (arcName + "/d", "OPEN"), (arcName + "/d/1.txt", "LEAF"),
+            (arcName + "/d/e", "OPEN"), (arcName + "/d/e/2.txt", "LEAF"),
+            (arcName + "/d/e", "CLOSE"), (arcName + "/d/3.txt", "LEAF"),
+            (arcName + "/d", "CLOSE"), (arcName + "/top.txt", "LEAF"),
+            (arcName, "CLOSE") ])
+
+    def test_tar(self):
+        self.check("a.tgz", "openTar")
+
+    def test_zip(self):
+        self.check("z.zip", "openZip")
+
+    def test_maxDepth_as_for_dirs(self):
+        # The same files in a real directory give the same events (but
+        # sorted by name, not in archive order).
+        dirRoot = os.path.join(self.root, "plain")
+        makeTree(os.path.join(dirRoot, "z.zip"), dict(self.members))
+        for maxDepth in (1, 2, 3):
+            fromZip = events(PowerWalk(os.path.join(self.root, "z.zip"),
+                openZip=True, maxDepth=maxDepth), self.root)
+            fromDir = events(PowerWalk(os.path.join(dirRoot, "z.zip"),
+                recursive=True, sort="name", maxDepth=maxDepth), dirRoot)
+            self.assertEqual(sorted(fromZip), sorted(fromDir), maxDepth)
+
+class TestItemCopy(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        makeTree(self.root, { "src/f.txt": "data", "tgt/.keep": "" })
+        self.src = os.path.join(self.root, "src", "f.txt")
+        self.tgtDir = os.path.join(self.root, "tgt")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_serialFormat(self):
+        itemCopy(self.src, self.tgtDir, serialFormat="_%02d", serial=7)
+        with open(os.path.join(self.tgtDir, "f_07.txt")) as ifh:
+            self.assertEqual(ifh.read(), "data")
+        with self.assertRaises(FileExistsError):
+            itemCopy(self.src, self.tgtDir, serialFormat="_%02d", serial=7)
+
+    def test_failed_copy_leaves_no_target(self):
+        missing = os.path.join(self.root, "src", "gone.txt")
+        with self.assertRaises(FileNotFoundError):
+            itemCopy(missing, self.tgtDir)
+        self.assertFalse(os.path.exists(os.path.join(self.tgtDir, "gone.txt")))
+        makeTree(self.root, { "src/gone.txt": "back" })
+        itemCopy(missing, self.tgtDir)
+
+class TestFileInfos(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        makeTree(self.root, { "a/f1.txt": "hello\n" })
+        os.symlink("f1.txt", os.path.join(self.root, "a", "link1"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_symlink_not_cached_as_target(self):
+        # `file` describes the link itself, so it mustn't share a cache
+        # entry with its target.
+        path = os.path.join(self.root, "a", "f1.txt")
+        self.assertIn("ASCII", getFileInfo(path))
+        pw = PowerWalk(os.path.join(self.root, "a"), includeFileInfos="ASCII")
+        self.assertEqual(leafPaths(pw, self.root), [ "a/f1.txt" ])
+
+class TestJsonOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        makeTree(self.root, { "d/x.txt": "abc\n", "y.txt": "hi\n" })
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def writeEvents(self, isArray:bool) -> str:
+        buf = io.StringIO()
+        jw = JsonEventWriter(buf, "name,what,depth,size", isArray=isArray)
+        jw.start()
+        pw = PowerWalk(self.root, recursive=True, sort="name")
+        for path, _fh, what in pw.traverse():
+            if (what == PWType.CLOSE): continue
+            jw.write(path, what, pw.travState.depth, pw.travState.entry)
+        jw.finish()
+        return buf.getvalue()
+
+    def checkRecords(self, recs:list) -> None:
+        self.assertEqual([ (r["name"], r["what"], r["size"]) for r in recs[2:] ],
+            [ ("x.txt", "LEAF", 4), ("y.txt", "LEAF", 3) ])
+        self.assertEqual([ r["what"] for r in recs[0:2] ], [ "OPEN", "OPEN" ])
+        self.assertEqual([ r["depth"] for r in recs ], [ 0, 1, 2, 1 ])
+
+    def test_ndjson(self):
+        lines = self.writeEvents(isArray=False).splitlines()
+        self.checkRecords([ json.loads(line) for line in lines ])
+
+    def test_jsonArray(self):
+        self.checkRecords(json.loads(self.writeEvents(isArray=True)))
+
+    def test_stat_from_entry(self):
+        # The entry's (cached) stat is used; the path isn't statted again.
+        st = os.stat_result((0o100644, 1, 1, 1, 0, 0, 12345, 0, 0, 0))
+        buf = io.StringIO()
+        jw = JsonEventWriter(buf, "path,size")
+        jw.write("/no/such/file", PWType.LEAF, 1,
+            ManifestEntry("/no/such/file", st))
+        self.assertEqual(json.loads(buf.getvalue())["size"], 12345)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,9 +14,10 @@ from typing import List  # Callable, Iterable, IO, Dict, Union
 import time
 import gc
 import random
+import re
 import logging
 
-from strbuf import StrBuf
+from strbuf import StrBuf, FenwickTree, PartRope, Utf8Part
 import array
 from basedomtypes import SIO
 # from io import StringIO
@@ -494,6 +495,200 @@ class testStrBuf(unittest.TestCase):
 
 
 
+###############################################################################
+#
+class testFenwick(unittest.TestCase):
+    def testPrefixAndFind(self):
+        lens = [ random.randint(0, 9) for _ in range(200) ]
+        ft = FenwickTree(lens)
+        self.assertEqual(ft.total, sum(lens))
+        for i in range(len(lens) + 1):
+            self.assertEqual(ft.prefix(i), sum(lens[0:i]))
+        for k in range(50):
+            i = random.randint(0, len(lens) - 1)
+            lens[i] = random.randint(0, 9)
+            ft.set(i, lens[i])
+            self.assertEqual(ft.prefix(i + 1), sum(lens[0:i + 1]))
+        ft.insert(3, 7)
+        lens.insert(3, 7)
+        ft.delete(10, 20)
+        del lens[10:20]
+        self.assertEqual(ft.total, sum(lens))
+        for offset in range(sum(lens)):
+            pnum, off = ft.find(offset, inclusive=True)
+            self.assertEqual(ft.prefix(pnum) + off, offset)
+            self.assertLess(off, lens[pnum])
+
+    def testStrBufEdits(self):
+        plain = w1
+        sb = StrBuf(w1)
+        sb.setSizes(partMax=200)
+        for k in range(300):
+            pos = random.randint(0, len(plain))
+            if (k % 3 == 2 and pos < len(plain)):
+                end = min(len(plain), pos + random.randint(1, 100))
+                plain = plain[0:pos] + plain[end:]
+                sb.delete(pos, end, inplace=True)
+            else:
+                plain = plain[0:pos] + "<%d>" % (k) + plain[pos:]
+                sb.insert(pos, "<%d>" % (k))
+            self.assertEqual(len(sb), len(plain))
+        self.assertEqual(str(sb), plain)
+        for i in range(0, len(plain), 7):
+            self.assertEqual(sb[i], plain[i])
+        for pnum in range(len(sb.parts)):
+            self.assertEqual(sb.local2global(pnum, 0),
+                sum(len(p) for p in sb.parts[0:pnum]))
+
+
+###############################################################################
+#
+class testPartRope(unittest.TestCase):
+    def assertSame(self, rope, ref:List):
+        rope.check()
+        self.assertEqual(list(rope), ref)
+        self.assertEqual(len(rope), len(ref))
+        self.assertEqual(rope.total, sum(len(part) for part in ref))
+        ft = FenwickTree(len(part) for part in ref)
+        for i in range(len(ref)):
+            self.assertEqual(rope[i], ref[i])
+            self.assertEqual(rope.prefix(i), ft.prefix(i))
+        for offset in range(0, rope.total, 5):
+            self.assertEqual(rope.find(offset), ft.find(offset))
+
+    def testEdits(self):
+        ref = [ "p%d" % (i) for i in range(500) ]
+        rope = PartRope(ref)
+        snap = rope.copy()
+        for k in range(300):
+            i = random.randint(0, len(ref))
+            if k % 3 == 0:
+                rope.insert(i, "new%d" % (k))
+                ref.insert(i, "new%d" % (k))
+            elif k % 3 == 1 and i < len(ref):
+                rope[i] = "chg"
+                ref[i] = "chg"
+            else:
+                j = min(len(ref), i + random.randint(0, 100))
+                del rope[i:j]
+                del ref[i:j]
+        self.assertSame(rope, ref)
+        self.assertSame(snap, [ "p%d" % (i) for i in range(500) ])
+
+    def testSliceAndJoin(self):
+        ref = [ "x" * (i % 7) for i in range(1000) ]
+        rope = PartRope(ref)
+        sl = rope.slice(100, 900)
+        self.assertSame(sl, ref[100:900])
+        sl.extend(rope)
+        self.assertSame(sl, ref[100:900] + ref)
+        self.assertSame(rope, ref)
+
+    def testStrBufAsRope(self):
+        plain = w1 * 20
+        sb = StrBuf(plain)
+        sb.setSizes(partMax=200, ropeParts=0)
+        self.assertTrue(sb.isRope())
+        snap = sb.copy()
+        for k in range(200):
+            pos = random.randint(0, len(plain))
+            plain = plain[0:pos] + "<%d>" % (k) + plain[pos:]
+            sb.insert(pos, "<%d>" % (k))
+        self.assertEqual(str(sb), plain)
+        self.assertEqual(str(snap), w1 * 20)
+        self.assertEqual(str(sb[1000:5000]), plain[1000:5000])
+        sb += snap
+        self.assertEqual(str(sb), plain + w1 * 20)
+        sb.parts.check()
+
+
+###############################################################################
+#
+class testWindowedSearch(unittest.TestCase):
+    """Compare the windowed searches to str, with tiny windows so that
+    targets cross part and window boundaries.
+    """
+    def setUp(self):
+        self.saveWindow = StrBuf.WINDOW
+        StrBuf.WINDOW = 50
+        self.plain = "".join(random.choice("ab \n\r") for _ in range(3000))
+        self.sb = StrBuf(self.plain)
+        self.sb.setSizes(partMax=200)
+
+    def tearDown(self):
+        StrBuf.WINDOW = self.saveWindow
+
+    def testFind(self):
+        for sub in [ "", "a", "ab", "b a", "aab\nb", "xyz" ]:
+            for st, fin in [ (None, None), (10, 2000), (-500, None), (2000, 10) ]:
+                self.assertEqual(self.sb.find(sub, st, fin), self.plain.find(sub, st, fin))
+                self.assertEqual(self.sb.rfind(sub, st, fin), self.plain.rfind(sub, st, fin))
+                self.assertEqual(self.sb.count(sub, st, fin), self.plain.count(sub, st, fin))
+        self.assertTrue("b a" in self.sb)
+        self.assertFalse("xyz" in self.sb)
+
+    def testSplit(self):
+        for sep in [ "a", "ab", "b a", "\r\n" ]:
+            for maxsplit in [ -1, 0, 1, 10 ]:
+                self.assertEqual(self.sb.split(sep, maxsplit),
+                    self.plain.split(sep, maxsplit))
+        for maxsplit in [ -1, 0, 1, 10 ]:
+            self.assertEqual(self.sb.split(None, maxsplit), self.plain.split(None, maxsplit))
+        self.assertEqual(self.sb.splitlines(), self.plain.splitlines())
+        self.assertEqual(self.sb.splitlines(keepends=True),
+            self.plain.splitlines(keepends=True))
+        self.assertEqual(next(self.sb.itersplit("b")), self.plain.split("b")[0])
+
+    def testFinditer(self):
+        for pat in [ r"a+b", r"b*", r"(?m)^a\s", r"(?<=b)a" ]:
+            got = [ (st, fin) for st, fin, _mat in self.sb.finditer(pat, maxLen=20) ]
+            self.assertEqual(got, [ mat.span() for mat in re.finditer(pat, self.plain) ])
+
+
+###############################################################################
+#
+class testCompact(unittest.TestCase):
+    def testPacking(self):
+        self.assertEqual(Utf8Part.pack("plain"), "plain")
+        self.assertEqual(Utf8Part.pack("caf\u00e9 " * 100), "caf\u00e9 " * 100)
+        packed = Utf8Part.pack("\u201cquoted\u201d text " * 100)
+        self.assertIsInstance(packed, Utf8Part)
+        self.assertEqual(len(packed), len("\u201cquoted\u201d text " * 100))
+        self.assertEqual(Utf8Part.unpack(packed), "\u201cquoted\u201d text " * 100)
+
+    def testEdits(self):
+        plain = ("abc \u201cdef\u201d \U0001F600 " * 200)
+        for ropeParts in [ 0, 1000000 ]:
+            sb = StrBuf(plain)
+            sb.setSizes(partMax=200, ropeParts=ropeParts)
+            before = sb.getMemory()
+            sb.setCompact(True)
+            self.assertLess(sb.getMemory(), before)
+            ref = plain
+            for k in range(200):
+                pos = random.randint(0, len(ref))
+                ref = ref[0:pos] + "\u00e9%d\U0001F600" % (k) + ref[pos:]
+                sb.insert(pos, "\u00e9%d\U0001F600" % (k))
+            sb.delete(100, 900, inplace=True)
+            ref = ref[0:100] + ref[900:]
+            self.assertEqual(str(sb), ref)
+            self.assertEqual(str(sb.copy()), ref)
+            self.assertEqual(sb[-5], ref[-5])
+            self.assertEqual(sb.find("\u201cdef"), ref.find("\u201cdef"))
+            sb.setCompact(False)
+            self.assertEqual(str(sb), ref)
+
+    def testAdaptive(self):
+        sb = StrBuf()
+        sb.setSizes(partMax=1000, adaptive=True)
+        for i in range(20000): sb.append("word%d " % (i))
+        self.assertEqual(sb.partFill, 1000)
+        sb = StrBuf()
+        sb.setSizes(partMax=1000, adaptive=True)
+        for i in range(20000): sb.insert(random.randint(0, len(sb)), "word%d " % (i))
+        self.assertLess(sb.partFill, 750)
+
+
 ###############################################################################
 #
 class testSomeMore(unittest.TestCase):
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+#
+import unittest
+import unicodedata
+import itertools
+from Tokenizer import (SimpleTokenizer, NLTKTokenizerPlus, HeavyTokenizer,
+    BatchTokenizer, spanKind)
+
+def haveNLTK() -> bool:
+    try:
+        import nltk
+        nltk.word_tokenize("a b")
+    except (ImportError, LookupError):
+        return False
+    return True
+
+class TestSimpleSpans(unittest.TestCase):
+
+    def setUp(self):
+        self.tok = SimpleTokenizer()
+
+    def spanTexts(self, s:str) -> list:
+        return [ s[st:en] for st, en, _kind in self.tok.tokenizeSpans(s) ]
+
+    def test_fullwidth_punct(self):
+        # NFKD makes these ASCII punctuation, which splits them off.
+        self.assertEqual(self.tok.tokenize("a， b"), [ "a", ",", "b" ])
+        self.assertEqual(self.spanTexts("a， b"), [ "a", "，", "b" ])
+        self.assertEqual(self.spanTexts("（a）"), [ "（", "a", "）" ])
+
+    def test_spans_match_normalized_tokens(self):
+        for s in [ "a， b", "（a）", "co\u00ADop x", "ﬁne.", "été, ok",
+            '"Hi," she said.', "x…y", "can't stop" ]:
+            self.assertEqual(
+                [ unicodedata.normalize("NFKD", t).replace("\u00AD", "")
+                    for t in self.spanTexts(s) ],
+                [ t for t in self.tok.tokenize(s) if t ])
+
+    def test_no_normalize(self):
+        tok = SimpleTokenizer(normalize=None)
+        spans = tok.tokenizeSpans("a， b")
+        self.assertEqual([ sp[0:2] for sp in spans ], [ (0, 2), (3, 4) ])
+
+@unittest.skipUnless(haveNLTK(), "needs nltk with punkt data")
+class TestNLTKSpans(unittest.TestCase):
+
+    def setUp(self):
+        self.tok = NLTKTokenizerPlus()
+        self.tok.options = {
+            "unicodePunct": False, "expandLigatures": False, "normalize": "NFKC" }
+
+    def test_expanded_char_is_one_span(self):
+        # NFKC turns each of these into several chars, which NLTK may split.
+        for s, i in [ ("see ⑴ here", 4), ("I ate ½ a pie.", 6) ]:
+            spans = list(self.tok.tokenizeSpans(s))
+            self.assertEqual(len(spans), len(set(spans)))
+            self.assertEqual([ sp[0:2] for sp in spans if sp[0] <= i < sp[1] ],
+                [ (i, i+1) ])
+
+    def test_spans_in_order(self):
+        spans = list(self.tok.tokenizeSpans("a⑴b ⑵. ¼½"))
+        for prev, cur in zip(spans, spans[1:]):
+            self.assertLessEqual(prev[1], cur[0])
+
+class TestHeavySpans(unittest.TestCase):
+
+    def test_spans_match_tokenize(self):
+        tok = HeavyTokenizer()
+        for s in [ ",X", " ,X", "a ,X", "X, ", "  a b  ", "(hello) world." ]:
+            spans = tok.tokenizeSpans(s)
+            self.assertEqual([ s[st:en] for st, en, _kind in spans ],
+                [ t for t in tok.tokenize(s) if t ])
+
+    def test_space_option_splits(self):
+        tok = HeavyTokenizer()
+        tok.setOption("Po", "space")
+        s = "a,b;c"
+        self.assertEqual(tok.tokenize(s), [ "a", "b", "c" ])
+        self.assertEqual([ s[st:en] for st, en, _kind in tok.tokenizeSpans(s) ],
+            [ "a", "b", "c" ])
+
+    def test_delete_option_shrinks_spans(self):
+        tok = HeavyTokenizer()
+        tok.setOption("Lu", "delete")
+        s = "Hello World"
+        self.assertEqual(tok.tokenize(s), [ "ello", "orld" ])
+        self.assertEqual([ sp[0:2] for sp in tok.tokenizeSpans(s) ],
+            [ (1, 5), (7, 11) ])
+
+    def test_uri_with_final_dot(self):
+        s = "See http://a.com/x. now"
+        self.assertIn((4, 19, "T_URI"), list(HeavyTokenizer().tokenizeSpans(s)))
+        self.assertEqual(spanKind("Mr.", 0, 3), "WORD")
+
+class TestNormPlan(unittest.TestCase):
+
+    def normalized(self, s:str, **options) -> str:
+        tok = HeavyTokenizer()
+        for name, value in options.items(): tok.setOption(name, value)
+        return tok.normalize(s)
+
+    def test_unify(self):
+        self.assertEqual(self.normalized("a\tb", Control_0="unify"), "a b")
+        tok = HeavyTokenizer()
+        tok.setOption("T_EMAIL", "unify")
+        self.assertEqual(tok.nonWordTokens("mail x@y.org now"),
+            "mail u@nine.com now")
+
+    def test_delete(self):
+        self.assertEqual(self.normalized("$5 or €6", Sc="delete"), "5 or 6")
+
+    def test_space(self):
+        self.assertEqual(self.normalized("a\u2013b-c", Pd="space"), "a b c")
+
+    def test_strip(self):
+        self.assertEqual(self.normalized("Café Ñu", Ll="strip"), "Cafe Ñu")
+
+    def test_value(self):
+        self.assertEqual(self.normalized("½ or \u0663", No="value", Nd="value"),
+            "0.5 or 3")
+
+    def test_upper(self):
+        self.assertEqual(self.normalized("abC dé", Ll="upper"), "ABC DÉ")
+
+    def test_lower(self):
+        self.assertEqual(self.normalized("abC DÉ", Lu="lower"), "abc dé")
+
+    def test_decompose(self):
+        self.assertEqual(self.normalized("ﬁné", Ll="decompose"), "fine\u0301")
+
+    def test_first_option_wins(self):
+        # Each char is mapped once: "É" is lowered by Lu, and the result
+        # isn't then stripped by Ll.
+        self.assertEqual(self.normalized("É", Lu="lower", Ll="strip"), "é")
+
+    def test_ascii_only(self):
+        # Other char-class options are ignored.
+        self.assertEqual(self.normalized("Añb Ünï!", Ascii_Only=1, Lu="delete"),
+            "Ab n!")
+        tok = HeavyTokenizer()
+        tok.setOption("Ascii_Only", 1)
+        self.assertEqual([ s for s in tok.tokenize("naïve café") if s ],
+            [ "nave", "caf" ])
+
+    def test_plans_shared_and_reset(self):
+        tok1, tok2 = HeavyTokenizer(), HeavyTokenizer()
+        for tok in (tok1, tok2): tok.setOption("Sc", "delete")
+        self.assertIs(tok1.getPlan(), tok2.getPlan())
+        tok1.setOption("Sc", "keep")
+        self.assertEqual(tok1.normalize("$5"), "$5")
+        self.assertEqual(tok2.normalize("$5"), "5")
+
+class TestBatchTokenizer(unittest.TestCase):
+
+    texts = [ "Text %d: see ﬁg. %d, (ok)?" % (i, i * 7) for i in range(57) ]
+
+    def test_parallel_matches_serial(self):
+        for cls in (SimpleTokenizer, HeavyTokenizer):
+            for spans in (False, True):
+                serial = list(BatchTokenizer(cls, workers=0, spans=spans)
+                    .tokenizeAll(self.texts))
+                self.assertEqual(len(serial), len(self.texts))
+                par = BatchTokenizer(cls, workers=2, chunkSize=5, spans=spans)
+                self.assertEqual(list(par.tokenizeAll(self.texts)), serial,
+                    (cls.__name__, spans))
+
+    def test_options_reach_workers(self):
+        opts = { "Ll": "upper" }
+        serial = list(BatchTokenizer(HeavyTokenizer, options=opts, workers=0)
+            .tokenizeAll(self.texts[0:3]))
+        self.assertEqual(serial[0][0:5], [ "TEXT", "0", ":", "SEE", "FIG." ])
+        par = BatchTokenizer(HeavyTokenizer, options=opts, workers=2, chunkSize=1)
+        self.assertEqual(list(par.tokenizeAll(self.texts[0:3])), serial)
+
+    def test_stop_early(self):
+        # Input is only read a bounded way ahead, and stopping doesn't
+        # wait for (or need) the rest of an endless input.
+        nRead = [ 0 ]
+        def endless():
+            for i in itertools.count():
+                nRead[0] += 1
+                yield "text %d" % i
+        bt = BatchTokenizer(workers=2, chunkSize=4, maxPending=3)
+        gen = bt.tokenizeAll(endless())
+        first = list(itertools.islice(gen, 10))
+        gen.close()
+        self.assertEqual(first[9], [ "text", "9" ])
+        self.assertLessEqual(nRead[0], 10 + 4 * 3 + 4)
+
+if __name__ == '__main__':
+    unittest.main()
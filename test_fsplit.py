@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+#
+import unittest
+import io
+import math
+import array
+import os
+import pickle
+import tempfile
+from fsplit import (reader, FieldSchema, DialectX, fsplit, predefinedDialects,
+    readPhysicalLines, CompiledDialectX, DictWriter)
+
+def writeTemp(text:str) -> str:
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    with os.fdopen(fd, "w", encoding="utf-8") as ofh:
+        ofh.write(text)
+    return path
+
+class TestEngines(unittest.TestCase):
+
+    samples = [
+        "", "a,b,c", ",,", 'a,"b,c",d', 'a,"b""c",d', '"",x,""""',
+        "a\\,b,c", "x&amp;y,&#65;,z", "lorem##ipsum####dolor", "a,'b,c',d",
+        'wee fish$ewe$"a mare"$egrets$"moo$e"', " a , b ", "a,b,",
+    ]
+    optionSets = [
+        {}, { "delimiter":"##" }, { "delimiter":"#", "delimiterrepeat":True },
+        { "escapechar":"\\", "doublequote":False }, { "entities":True },
+        { "quotechar":"BOTH" }, { "delimiter":"$" }, { "skipinitialspace":True },
+    ]
+
+    def split(self, s:str, dx:DialectX, engine:str):
+        try:
+            return fsplit(s, DialectX("engineTest", dialect=dx, engine=engine))
+        except ValueError as e:
+            return str(e)
+
+    def test_compiled_matches_loop(self):
+        dialects = list(predefinedDialects.values())
+        for opts in self.optionSets:
+            dialects.append(DialectX("engineTest", **opts))
+        for dx in dialects:
+            for s in self.samples:
+                self.assertEqual(self.split(s, dx, "compiled"),
+                    self.split(s, dx, "loop"), (dx.dialectName, s))
+        self.assertEqual(self.split('a,"b,c",d', DialectX("csv"), "compiled"),
+            [ "a", "b,c", "d" ])
+
+class TestCompiledDialectX(unittest.TestCase):
+
+    def setUp(self):
+        self.savedMax = CompiledDialectX.cacheMax
+        CompiledDialectX.cache.clear()
+
+    def tearDown(self):
+        CompiledDialectX.cacheMax = self.savedMax
+
+    def test_kept_until_option_set(self):
+        dx = DialectX("semi", delimiter=";")
+        cdx = dx.freeze()
+        self.assertIs(dx.freeze(), cdx)
+        self.assertEqual(fsplit("a;b", dx), [ "a", "b" ])
+        dx.delimiter = "|"
+        self.assertEqual(dx.freeze().delimiter, "|")
+        self.assertEqual(fsplit("a;b|c", dx), [ "a;b", "c" ])
+        with self.assertRaises(AttributeError):
+            cdx.delimiter = ","
+
+    def test_freeze_with_kwargs(self):
+        dx = DialectX("csv")
+        cdx = dx.freeze(delimiter="\t")
+        self.assertEqual(cdx.delimiter, "\t")
+        self.assertEqual(dx.delimiter, ",")
+        self.assertIs(cdx.freeze(), cdx)
+        self.assertIs(dx.freeze(delimiter="\t"), cdx)
+        self.assertEqual(pickle.loads(pickle.dumps(cdx)), cdx)
+
+    def test_name_is_part_of_key(self):
+        c1 = DialectX("one").freeze()
+        c2 = DialectX("two").freeze()
+        self.assertEqual((c1.dialectName, c2.dialectName), ("one", "two"))
+        self.assertEqual(c2.thaw().dialectName, "two")
+
+    def test_lru(self):
+        CompiledDialectX.cacheMax = 2
+        a = DialectX("lru", delimiter="a").freeze()
+        DialectX("lru", delimiter="b").freeze()
+        self.assertIs(DialectX("lru", delimiter="a").freeze(), a)
+        DialectX("lru", delimiter="c").freeze()  # Evicts "b", not "a"
+        self.assertEqual(len(CompiledDialectX.cache), 2)
+        self.assertIs(DialectX("lru", delimiter="a").freeze(), a)
+        self.assertNotIn("b",
+            [ cdx.delimiter for cdx in CompiledDialectX.cache.values() ])
+
+class TestStreaming(unittest.TestCase):
+
+    data = ('a,b\n"one\ntwo",x\r\n3,"y\n\n""z"""\n'
+        '# not a comment here\n"last\nline",\n')
+
+    def test_physical_lines(self):
+        for bufferSize in (1, 2, 5, 1<<16):
+            self.assertEqual(list(readPhysicalLines(io.StringIO("a\r\nb\rc\n\nd"),
+                bufferSize)), [ "a\r\n", "b\rc\n", "\n", "d" ])
+
+    def test_buffer_sizes(self):
+        dx = DialectX("csv")
+        dx.quotednewline = True
+        expected = list(reader(io.StringIO(self.data), dialect=dx))
+        self.assertEqual(len(expected), 5)
+        self.assertEqual(expected[1][0], "one\ntwo")
+        for bufferSize in (1, 2, 3, 7, 16):
+            rdr = reader(io.StringIO(self.data), dialect=dx, bufferSize=bufferSize)
+            self.assertEqual(list(rdr), expected, bufferSize)
+            self.assertEqual(rdr.line_num, 9)
+            self.assertEqual(rdr.rec_num, 5)
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+        # Every third record has a quoted field spanning lines, so many
+        # range cuts land inside quotes.
+        recs = [ '%d,"%s",z' % (i, "q\n,%d\n" % i if i % 3 == 0 else "p%d" % i)
+            for i in range(300) ]
+        self.body = "\n".join(recs) + "\n"
+        self.paths = []
+
+    def tearDown(self):
+        for path in self.paths: os.remove(path)
+
+    def compare(self, text:str, **dxOptions) -> list:
+        path = writeTemp(text)
+        self.paths.append(path)
+        dx = DialectX("csv")
+        for k, v in dxOptions.items(): setattr(dx, k, v)
+        ser = list(reader(path, dialect=dx))
+        for chunkBytes in (16, 100, 1<<20):
+            rdr = reader(path, dialect=dx, workers=3, chunkBytes=chunkBytes)
+            self.assertEqual(list(rdr), ser, chunkBytes)
+            self.assertEqual(rdr.line_num, text.count("\n"))
+        return ser
+
+    def test_with_header(self):
+        ser = self.compare("n,s,t\n" + self.body, header=True, quotednewline=True)
+        self.assertEqual(len(ser), 300)
+        self.assertEqual(ser[3][1], "q\n,3\n")
+
+    def test_without_header(self):
+        ser = self.compare(self.body, header=False, quotednewline=True)
+        self.assertEqual(len(ser), 300)
+
+    def test_file_handle_and_fallback(self):
+        path = writeTemp(self.body)
+        self.paths.append(path)
+        dx = DialectX("csv")
+        dx.quotednewline = True
+        with open(path, encoding="utf-8", newline="") as ifh:
+            fromHandle = list(reader(ifh, dialect=dx))
+        self.assertEqual(list(reader(path, dialect=dx, workers=2)), fromHandle)
+        with self.assertLogs(level="WARNING"):
+            fromStream = list(reader(io.StringIO(self.body), dialect=dx, workers=2))
+        self.assertEqual(fromStream, fromHandle)
+
+class TestBatches(unittest.TestCase):
+
+    def makeSchema(self):
+        schema = FieldSchema()
+        schema.append(fname="n", ftype=int)
+        schema.append(fname="x", ftype=float)
+        schema.append(fname="s", ftype=str)
+        return schema
+
+    def test_column_types_stable_across_batches(self):
+        # Only the second batch has a blank and a bad value.
+        data = "1,1.5,a\n2,2.5,b\n3,,c\n,x,d\n"
+        schema = self.makeSchema()
+        rdr = reader(io.StringIO(data), schema=schema)
+        with self.assertLogs(level="WARNING"):
+            b1, b2 = list(rdr.batches(2))
+
+        for b in (b1, b2):
+            self.assertIsInstance(b[0], list)
+            self.assertIsInstance(b[1], array.array)
+            self.assertEqual(b[1].typecode, "d")
+        self.assertEqual(b1[0], [ 1, 2 ])
+        self.assertEqual(list(b1[1]), [ 1.5, 2.5 ])
+        self.assertEqual(b2[0], [ 3, None ])
+        self.assertTrue(math.isnan(b2[1][0]))
+        self.assertTrue(math.isnan(b2[1][1]))
+
+        # Only 'x' failed to cast; the blanks were just missing.
+        self.assertEqual(schema.theFieldInfos[0].fbadCount, 0)
+        self.assertEqual(schema.theFieldInfos[1].fbadCount, 1)
+
+    def test_bad_int_is_counted(self):
+        schema = self.makeSchema()
+        rdr = reader(io.StringIO("1,1,a\nx,2,b\n"), schema=schema)
+        with self.assertLogs(level="WARNING"):
+            (b1,) = list(rdr.batches(10))
+        self.assertEqual(b1[0], [ 1, None ])
+        self.assertEqual(list(b1[1]), [ 1.0, 2.0 ])
+        self.assertEqual(schema.theFieldInfos[0].fbadCount, 1)
+
+class TestAutotype(unittest.TestCase):
+
+    def setUp(self):
+        # Column b turns from int to float late in the file, so ranges
+        # typed on their own would disagree.
+        recs = [ "%d,%s,x%d" % (i, i if i < 1500 else "%d.5" % i, i)
+            for i in range(2000) ]
+        self.path = writeTemp("a,b,c\n" + "\n".join(recs) + "\n")
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_parallel_matches_serial(self):
+        dx = DialectX("csv")
+        dx.autotype = True
+        dx.header = True
+        with open(self.path, encoding="utf-8") as ifh:
+            ser = list(reader(ifh, dialect=dx))
+        par = list(reader(self.path, dialect=dx, workers=3, chunkBytes=2000))
+        self.assertEqual(par, ser)
+        self.assertEqual(ser[0][0:2], [ 0, 0 ])
+        self.assertEqual(ser[-1][0:2], [ 1999, 1999.5 ])
+
+class TestDictWriter(unittest.TestCase):
+
+    def write(self, rows:list, **kwargs) -> str:
+        buf = io.StringIO()
+        dw = DictWriter(buf, **kwargs)
+        dw.writeheader()
+        for row in rows: dw.writerow(row)
+        return buf.getvalue()
+
+    def test_formatters(self):
+        schema = FieldSchema()
+        schema.append(fname="name", ftype=str)
+        schema.append(fname="n", ftype=int, fformat="%03d")
+        schema.append(fname="x", ftype=float, fformat=lambda v: "<%s>" % v)
+        out = self.write([ { "name":"a", "n":7, "x":1.5 }, { "name":"b" } ],
+            fieldNames=schema, restval=None)
+        self.assertEqual(out.splitlines(),
+            [ '"name","n","x"', '"a",007,<1.5>', '"b",[none],<None>' ])
+        out = self.write([ { "x":2.25, "n":3 } ], fieldNames=[ "n", "x" ],
+            fieldformats=[ "%4.1f", "%6.3f" ])
+        self.assertEqual(out.splitlines()[1], " 3.0, 2.250")
+
+    def test_writerows_matches_writerow(self):
+        rows = [ { "k":"r%d" % i, "v":i } for i in range(50) ]
+        expected = self.write(rows, fieldNames=[ "k", "v" ])
+        for flushSize in (1, 40, 1<<16):
+            buf = io.StringIO()
+            dw = DictWriter(buf, fieldNames=[ "k", "v" ], flushSize=flushSize)
+            dw.writeheader()
+            self.assertEqual(dw.writerows(iter(rows)), 50)
+            self.assertEqual(buf.getvalue(), expected)
+
+    def test_quoting_round_trips(self):
+        for dx in [ DialectX("dq"), DialectX("sq", quotechar="'"),
+            DialectX("esc", escapechar="\\", doublequote=False) ]:
+            names = [ 'say "hi"', "it's", "a,b", "back\\slash" ]
+            out = self.write([ dict(zip(names, names)) ], fieldNames=names,
+                dialect=dx)
+            for line in out.splitlines():
+                self.assertEqual(fsplit(line, dx), names, dx.dialectName)
+
+    def test_extrasaction(self):
+        with self.assertRaises(ValueError):
+            self.write([ { "a":1, "zz":2 } ], fieldNames=[ "a" ])
+        out = self.write([ { "a":"1", "zz":2 } ], fieldNames=[ "a" ],
+            extrasaction="ignore")
+        self.assertEqual(out.splitlines(), [ '"a"', '"1"' ])
+        with self.assertRaises(ValueError):
+            DictWriter(io.StringIO(), fieldNames=[ "a" ], extrasaction="warn")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -89,6 +89,7 @@ system, even if its directory is in scope for one.
 * 2022-09-29: Written by Steven J. DeRose.
 * 2024-03-19: Add --help-codes, --head. Catch FileNotFoundError.
 Identify a couple more VCS systems, clean up how it's done.
+* 2026-10-16: Add findVCSRoot() (used by PowerWalk's batched git status).
 
 =Rights=
 
@@ -259,6 +260,12 @@ def anyParentHasThis(path:str, keyDirName:str) -> bool:
     """Scan upwards from a starting file or dir, seeing if it (if a dir) or
     any containing dir, contains a dir named by keyDirName.
     """
+    return findVCSRoot(path, keyDirName) is not None
+
+def findVCSRoot(path:str, keyDirName:str=".git") -> str:
+    """Like anyParentHasThis(), but return the (working copy root) directory
+    that contains keyDirName, or None.
+    """
     fullPath = os.path.abspath(path)
     if (not os.path.isdir(fullPath)):
         curPath, _tail = os.path.split(fullPath)
@@ -268,9 +275,9 @@ def anyParentHasThis(path:str, keyDirName:str) -> bool:
     while (curPath):
         tgt = os.path.join(curPath, keyDirName)
         lg.info("    Try: %s\n", tgt)
-        if (os.path.isdir(tgt)): return True
+        if (os.path.isdir(tgt)): return curPath
         curPath = re.sub(r"/[^/]*$", "", curPath)
-    return False
+    return None
 
 def doCmd(s:str, _path:str) -> str:
     try: